@@ -19,7 +19,9 @@
         'base',
         'hr',
         'mail',
+        'bus',
         'web',
+        'web_hierarchy',
         'portal',
     ],
     'data': [
@@ -37,9 +39,20 @@
         'views/training_enrollment_views.xml',
         'views/training_certificate_views.xml',
         'views/training_menus.xml',
+        'views/training_compliance_views.xml',
+        'views/training_department_kpi_views.xml',
+        'views/training_session_conflict_views.xml',
+        'views/training_archive_views.xml',
+        'views/training_outbox_views.xml',
         'views/training_dashboard_views.xml',
         'views/training_portal_templates.xml',
         
+        # Wizards
+        'wizard/training_session_reschedule_views.xml',
+        'wizard/training_session_close_out_views.xml',
+        'wizard/training_renewal_planner_views.xml',
+        'wizard/training_history_import_views.xml',
+        
         # Reports
         'report/training_certificate_report.xml',
         'report/training_certificate_template.xml',
@@ -2,3 +2,6 @@
 
 from . import portal
 from . import dashboard
+from . import export
+from . import compliance
+from . import api
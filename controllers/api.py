@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.http import request
+from odoo.addons.employee_training.models.training_change_feed import CHANGE_FEED_MODELS
+
+
+class TrainingApi(http.Controller):
+
+    @http.route('/training/api/transcripts', type='json', auth='user')
+    def get_transcripts(self, employee_ids=None):
+        """Training transcripts of a batch of employees for HRIS synchronization"""
+        return {
+            'transcripts': request.env['hr.employee'].get_training_transcripts(employee_ids or []),
+        }
+
+    @http.route('/training/api/changes/<string:model>', type='json', auth='user')
+    def get_changes(self, model, cursor=None, limit=1000):
+        """One page of the change feed of a training model"""
+        if model not in CHANGE_FEED_MODELS:
+            return request.not_found()
+        return request.env[model].get_changes(cursor=cursor, limit=limit)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.http import request
+
+from .export import stream_records_csv, make_csv_response
+
+EXPORT_FIELDS = [
+    'employee_id', 'department_id', 'job_id', 'course_id',
+    'certificate_id', 'expiry_date', 'status',
+]
+
+
+class TrainingCompliance(http.Controller):
+
+    @http.route('/training/compliance/export', type='http', auth='user')
+    def export_compliance_gaps(self, status=None, department_id=None, course_id=None, job_id=None, **kw):
+        """Stream the compliance matrix as CSV, one chunk at a time"""
+        if not request.env.user.has_group('hr.group_hr_manager'):
+            return request.not_found()
+
+        request.env['training.compliance.gap']._refresh_matrix()
+
+        domain = []
+        if status:
+            domain.append(('status', 'in', status.split(',')))
+        if department_id:
+            domain.append(('department_id', '=', int(department_id)))
+        if course_id:
+            domain.append(('course_id', '=', int(course_id)))
+        if job_id:
+            domain.append(('job_id', '=', int(job_id)))
+
+        stream = stream_records_csv(
+            request.env.registry, request.env.uid, dict(request.env.context),
+            'training.compliance.gap', domain, EXPORT_FIELDS
+        )
+        return make_csv_response(stream, 'compliance_gaps.csv')
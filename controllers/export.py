@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+import json
+
+from werkzeug.exceptions import BadRequest
+
+from odoo import http, api
+from odoo.http import request
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Exportable models and the fields exported when none are requested
+EXPORT_MODELS = {
+    'training.enrollment': [
+        'name', 'employee_id', 'course_id', 'session_id', 'state',
+        'enrollment_date', 'start_date', 'end_date',
+    ],
+    'training.certificate': [
+        'name', 'employee_id', 'course_id', 'issue_date', 'expiry_date', 'state',
+    ],
+}
+
+
+def _format_value(field_type, value, selection=None):
+    if field_type == 'many2one':
+        return value.display_name or ''
+    if field_type in ('one2many', 'many2many'):
+        return ', '.join(value.mapped('display_name'))
+    if field_type == 'selection':
+        return selection.get(value, value or '')
+    if field_type == 'boolean':
+        return value
+    return '' if value is False or value is None else value
+
+
+def stream_records_csv(registry, uid, context, model_name, domain, field_names,
+                       chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield CSV chunks of the records matching the domain.
+
+    The request cursor is closed once the response starts streaming, so rows
+    are read from a cursor owned by the generator. Records are paged with a
+    keyset on id and the cache is dropped after every page, which keeps the
+    memory usage constant whatever the size of the export.
+    """
+    with registry.cursor() as cr:
+        env = api.Environment(cr, uid, context)
+        Model = env[model_name]
+        field_info = Model.fields_get(field_names, ['string', 'type', 'selection'])
+        columns = [
+            (name, field_info[name]['type'], dict(field_info[name].get('selection') or []))
+            for name in field_names
+        ]
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([field_info[name]['string'] for name in field_names])
+        # The header is sent even when no record matches
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        last_id = 0
+        while True:
+            records = Model.search(domain + [('id', '>', last_id)], order='id', limit=chunk_size)
+            if not records:
+                break
+            for record in records:
+                writer.writerow([
+                    _format_value(field_type, record[name], selection)
+                    for name, field_type, selection in columns
+                ])
+            last_id = records[-1].id
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            env.invalidate_all()
+
+
+def make_csv_response(stream, filename):
+    headers = [
+        ('Content-Type', 'text/csv; charset=utf-8'),
+        ('Content-Disposition', 'attachment; filename="%s"' % filename),
+    ]
+    return request.make_response(stream, headers=headers)
+
+
+class TrainingExport(http.Controller):
+
+    @http.route('/training/export/<string:model>', type='http', auth='user', methods=['GET', 'POST'])
+    def export_records(self, model, domain='[]', fields=None, **kw):
+        """Stream training enrollments or certificates as CSV.
+
+        :param domain: JSON encoded search domain
+        :param fields: comma separated field names, defaults to a standard set
+        """
+        if model not in EXPORT_MODELS:
+            return request.not_found()
+        Model = request.env[model]
+        Model.check_access('read')
+
+        try:
+            domain = json.loads(domain)
+        except ValueError:
+            raise BadRequest('Invalid domain')
+        if not isinstance(domain, list):
+            raise BadRequest('Invalid domain')
+        field_names = fields.split(',') if fields else EXPORT_MODELS[model]
+        readable = Model.fields_get(field_names, ['type'])
+        unknown = set(field_names) - set(readable)
+        if unknown:
+            raise BadRequest('Unknown fields: %s' % ', '.join(sorted(unknown)))
+        # Validate the domain before the response starts streaming
+        Model.search_count(domain, limit=1)
+
+        stream = stream_records_csv(
+            request.env.registry, request.env.uid, dict(request.env.context), model, domain, field_names
+        )
+        return make_csv_response(stream, '%s.csv' % model.replace('.', '_'))
@@ -14,12 +14,12 @@ class TrainingPortal(CustomerPortal):
         
         if 'enrollment_count' in counters:
             values['enrollment_count'] = request.env['training.enrollment'].search_count([
-                ('employee_id.user_id', '=', request.env.user.id)
+                ('owner_user_id', '=', request.env.user.id)
             ])
         
         if 'certificate_count' in counters:
             values['certificate_count'] = request.env['training.certificate'].search_count([
-                ('employee_id.user_id', '=', request.env.user.id)
+                ('owner_user_id', '=', request.env.user.id)
             ])
         
         return values
@@ -30,7 +30,7 @@ class TrainingPortal(CustomerPortal):
         values = self._prepare_portal_layout_values()
         TrainingEnrollment = request.env['training.enrollment']
         
-        domain = [('employee_id.user_id', '=', request.env.user.id)]
+        domain = [('owner_user_id', '=', request.env.user.id)]
         
         # Count for pager
         enrollment_count = TrainingEnrollment.search_count(domain)
@@ -65,7 +65,7 @@ class TrainingPortal(CustomerPortal):
         enrollment = request.env['training.enrollment'].browse(enrollment_id)
         
         # Check access
-        if enrollment.employee_id.user_id != request.env.user:
+        if enrollment.owner_user_id != request.env.user:
             return request.redirect('/my')
         
         values = {
@@ -81,7 +81,7 @@ class TrainingPortal(CustomerPortal):
         values = self._prepare_portal_layout_values()
         TrainingCertificate = request.env['training.certificate']
         
-        domain = [('employee_id.user_id', '=', request.env.user.id)]
+        domain = [('owner_user_id', '=', request.env.user.id)]
         
         # Count for pager
         certificate_count = TrainingCertificate.search_count(domain)
@@ -116,7 +116,7 @@ class TrainingPortal(CustomerPortal):
         certificate = request.env['training.certificate'].browse(certificate_id)
         
         # Check access
-        if certificate.employee_id.user_id != request.env.user:
+        if certificate.owner_user_id != request.env.user:
             return request.redirect('/my')
         
         values = {
@@ -132,7 +132,7 @@ class TrainingPortal(CustomerPortal):
         certificate = request.env['training.certificate'].browse(certificate_id)
         
         # Check access
-        if certificate.employee_id.user_id != request.env.user:
+        if certificate.owner_user_id != request.env.user:
             return request.redirect('/my')
         
         # Generate PDF
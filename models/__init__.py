@@ -1,6 +1,20 @@
 # -*- coding: utf-8 -*-
 
+from . import training_bulk
+from . import training_export
+from . import training_change_feed
 from . import training_course
 from . import training_session
+from . import training_session_conflict
 from . import training_enrollment
 from . import training_certificate
+from . import training_snapshot_state
+from . import training_compliance_gap
+from . import training_department_kpi
+from . import training_archive
+from . import training_outbox
+from . import training_dashboard
+from . import hr_job
+from . import hr_department
+from . import hr_employee
+from . import ir_websocket
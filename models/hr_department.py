@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class HrDepartment(models.Model):
+    _inherit = 'hr.department'
+
+    required_course_ids = fields.Many2many(
+        comodel_name='training.course',
+        relation='hr_department_training_course_rel',
+        column1='department_id',
+        column2='course_id',
+        string='Required Trainings',
+        help='Courses every employee of this department and its sub-departments '
+             'must be certified for'
+    )
+
+    def write(self, vals):
+        """Drop the cached compliance matrix and KPI rollups when the tree changes"""
+        res = super().write(vals)
+        if 'required_course_ids' in vals or 'parent_id' in vals:
+            self.env['training.compliance.gap']._invalidate_matrix()
+        if 'parent_id' in vals or 'active' in vals:
+            self.env['training.department.kpi']._invalidate_kpis()
+        return res
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, exceptions, _
+
+MAX_TRANSCRIPT_BATCH = 5000
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    def write(self, vals):
+        # The incremental KPI refresh only sees the department an employee
+        # is in now, not the one they left or were archived from
+        changed_department = 'department_id' in vals and any(
+            employee.department_id.id != (vals['department_id'] or False) for employee in self
+        )
+        moved = changed_department or ('active' in vals and any(
+            employee.active != bool(vals['active']) for employee in self
+        ))
+        res = super().write(vals)
+        if 'user_id' in vals:
+            self._sync_training_owner()
+        if moved:
+            self.env['training.department.kpi']._invalidate_kpis()
+        if changed_department:
+            # The expiry forecast can be filtered by department
+            self.env['training.certificate']._invalidate_expiry_forecast()
+        return res
+
+    def _sync_training_owner(self):
+        """Propagate the user of the employees to their enrollments and certificates.
+
+        One UPDATE per table instead of recomputing the denormalized owner
+        record by record.
+        """
+        self.flush_recordset(['user_id'])
+        for model_name in ('training.enrollment', 'training.certificate'):
+            model = self.env[model_name]
+            model.flush_model(['employee_id', 'owner_user_id'])
+            self.env.cr.execute("""
+                UPDATE {table} r
+                   SET owner_user_id = e.user_id,
+                       write_uid = %(uid)s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM hr_employee e
+                 WHERE e.id = r.employee_id
+                   AND r.employee_id IN %(ids)s
+                   AND r.owner_user_id IS DISTINCT FROM e.user_id
+            """.format(table=model._table), {'uid': self.env.uid, 'ids': tuple(self.ids)})
+            model.invalidate_model(['owner_user_id', 'write_uid', 'write_date'])
+
+    @api.model
+    def get_training_transcripts(self, employee_ids):
+        """Full training transcripts for a batch of employees.
+
+        Built from three queries whatever the batch size: employees,
+        enrollments and certificates, the latter two including the archive.
+        """
+        if not self.env.su and not self.env.user.has_group('hr.group_hr_manager'):
+            raise exceptions.AccessError(_('Only training managers can read transcripts.'))
+        employee_ids = [int(employee_id) for employee_id in employee_ids or []]
+        if len(employee_ids) > MAX_TRANSCRIPT_BATCH:
+            raise exceptions.UserError(_(
+                'At most %s employees can be requested at once.', MAX_TRANSCRIPT_BATCH
+            ))
+        if not employee_ids:
+            return []
+
+        self.env.flush_all()
+        params = {
+            'ids': tuple(employee_ids),
+            'company_ids': tuple(self.env.companies.ids),
+        }
+        self.env.cr.execute("""
+            SELECT e.id, e.name, e.job_title, d.complete_name
+              FROM hr_employee e
+         LEFT JOIN hr_department d ON d.id = e.department_id
+             WHERE e.id IN %(ids)s
+               AND e.company_id IN %(company_ids)s
+          ORDER BY e.id
+        """, params)
+        transcripts = {
+            employee_id: {
+                'employee_id': employee_id,
+                'name': name,
+                'job_title': job_title or '',
+                'department': department or '',
+                'enrollments': [],
+                'certificates': [],
+            }
+            for employee_id, name, job_title, department in self.env.cr.fetchall()
+        }
+        if not transcripts:
+            return []
+        params['ids'] = tuple(transcripts)
+
+        self.env.cr.execute("""
+            SELECT en.employee_id, en.id, en.name, en.course_id, c.name, en.session_id, s.name,
+                   en.state, en.enrollment_date, en.start_date, en.end_date, false
+              FROM training_enrollment en
+              JOIN training_course c ON c.id = en.course_id
+              JOIN training_session s ON s.id = en.session_id
+             WHERE en.employee_id IN %(ids)s
+         UNION ALL
+            SELECT a.employee_id, a.original_id, a.name, a.course_id, c.name, NULL, a.session_name,
+                   a.state, a.enrollment_date, a.start_date, a.end_date, true
+              FROM training_enrollment_archive a
+         LEFT JOIN training_course c ON c.id = a.course_id
+             WHERE a.employee_id IN %(ids)s
+          ORDER BY 10 DESC NULLS LAST, 2 DESC
+        """, params)
+        for (employee_id, enrollment_id, reference, course_id, course, session_id, session,
+             state, enrollment_date, start_date, end_date, archived) in self.env.cr.fetchall():
+            transcripts[employee_id]['enrollments'].append({
+                'id': enrollment_id,
+                'reference': reference,
+                'course_id': course_id,
+                'course': course,
+                'session_id': session_id,
+                'session': session,
+                'state': state,
+                'enrollment_date': fields.Date.to_string(enrollment_date),
+                'start_date': fields.Date.to_string(start_date),
+                'end_date': fields.Date.to_string(end_date),
+                'archived': archived,
+            })
+
+        self.env.cr.execute("""
+            SELECT ce.employee_id, ce.id, ce.name, ce.course_id, c.name,
+                   ce.issue_date, ce.expiry_date, ce.state, false
+              FROM training_certificate ce
+              JOIN training_course c ON c.id = ce.course_id
+             WHERE ce.employee_id IN %(ids)s
+         UNION ALL
+            SELECT a.employee_id, a.original_id, a.name, a.course_id, c.name,
+                   a.issue_date, a.expiry_date, 'expired', true
+              FROM training_certificate_archive a
+         LEFT JOIN training_course c ON c.id = a.course_id
+             WHERE a.employee_id IN %(ids)s
+          ORDER BY 6 DESC, 2 DESC
+        """, params)
+        for (employee_id, certificate_id, number, course_id, course,
+             issue_date, expiry_date, state, archived) in self.env.cr.fetchall():
+            transcripts[employee_id]['certificates'].append({
+                'id': certificate_id,
+                'number': number,
+                'course_id': course_id,
+                'course': course,
+                'issue_date': fields.Date.to_string(issue_date),
+                'expiry_date': fields.Date.to_string(expiry_date),
+                'state': state,
+                'archived': archived,
+            })
+
+        today = fields.Date.to_string(fields.Date.context_today(self))
+        for transcript in transcripts.values():
+            # Certificates are sorted newest first: the first one per course is current
+            current = {}
+            for certificate in transcript['certificates']:
+                current.setdefault(certificate['course_id'], certificate)
+            transcript['status'] = {
+                'courses_attended': len({
+                    enrollment['course_id'] for enrollment in transcript['enrollments']
+                    if enrollment['state'] == 'attended'
+                }),
+                'upcoming_sessions': sum(
+                    1 for enrollment in transcript['enrollments']
+                    if enrollment['state'] in ('draft', 'confirmed')
+                    and (enrollment['start_date'] or '') >= today
+                ),
+                'certifications': [{
+                    'course_id': certificate['course_id'],
+                    'course': certificate['course'],
+                    'certificate_id': certificate['id'],
+                    'state': certificate['state'],
+                    'expiry_date': certificate['expiry_date'],
+                } for certificate in current.values()],
+            }
+        return list(transcripts.values())
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class HrJob(models.Model):
+    _inherit = 'hr.job'
+
+    required_course_ids = fields.Many2many(
+        comodel_name='training.course',
+        relation='hr_job_training_course_rel',
+        column1='job_id',
+        column2='course_id',
+        string='Required Trainings',
+        help='Courses every employee holding this job position must be certified for'
+    )
+
+    def write(self, vals):
+        """Drop the cached compliance matrix when requirements change"""
+        res = super().write(vals)
+        if 'required_course_ids' in vals:
+            self.env['training.compliance.gap']._invalidate_matrix()
+        return res
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+from .training_dashboard import DASHBOARD_BUS_CHANNEL
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Only training managers may listen to the dashboard updates"""
+        if DASHBOARD_BUS_CHANNEL in channels and not self.env.user.has_group('hr.group_hr_manager'):
+            channels = [channel for channel in channels if channel != DASHBOARD_BUS_CHANNEL]
+        return super()._build_bus_channel_list(channels)
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from dateutil.relativedelta import relativedelta
+from odoo import models, fields, api
+
+DEFAULT_RETENTION_MONTHS = 36
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_MAX_BATCHES = 20
+
+
+class TrainingArchive(models.AbstractModel):
+    _name = 'training.archive'
+    _description = 'Training History Archiver'
+
+    @api.model
+    def _get_archive_settings(self):
+        params = self.env['ir.config_parameter'].sudo()
+        return (
+            int(params.get_param('employee_training.archive_retention_months', DEFAULT_RETENTION_MONTHS)),
+            int(params.get_param('employee_training.archive_batch_size', DEFAULT_BATCH_SIZE)),
+            int(params.get_param('employee_training.archive_max_batches', DEFAULT_MAX_BATCHES)),
+        )
+
+    @api.model
+    def _cron_archive_history(self):
+        """Cron job moving old enrollments and certificates to the archive.
+
+        Records are moved in chunked batches, each committed on its own so a
+        failure only rolls back the current batch and locks are released
+        between batches; when the per-run batch budget is exhausted the cron
+        is re-triggered to continue with the backlog.
+        """
+        retention_months, batch_size, max_batches = self._get_archive_settings()
+        if retention_months <= 0:
+            return True
+        cutoff = fields.Date.context_today(self) - relativedelta(months=retention_months)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        self.env.flush_all()
+
+        done = True
+        for archiver in (
+            self.env['training.enrollment.archive']._archive_enrollments,
+            self.env['training.certificate.archive']._archive_certificates,
+        ):
+            for __ in range(max_batches):
+                moved = archiver(cutoff, batch_size)
+                if auto_commit:
+                    self.env.cr.commit()
+                if moved < batch_size:
+                    break
+            else:
+                done = False
+
+        self.env['training.enrollment'].invalidate_model()
+        self.env['training.certificate'].invalidate_model()
+        if not done:
+            self.env.ref('employee_training.ir_cron_archive_history')._trigger()
+        return True
+
+    @api.model
+    def _cleanup_moved_records(self, model_name, record_ids):
+        """Drop the chatter, followers and activities of records moved to the archive.
+
+        Moved records left the hot table, so the change feed reports them as
+        deleted.
+        """
+        if not record_ids:
+            return
+        self.env['training.tombstone']._record_deletions(model_name, record_ids)
+        self.env.cr.execute("""
+            DELETE FROM mail_followers
+             WHERE res_model = %(model)s AND res_id IN %(ids)s
+        """, {'model': model_name, 'ids': tuple(record_ids)})
+        self.env.cr.execute("""
+            DELETE FROM mail_activity
+             WHERE res_model = %(model)s AND res_id IN %(ids)s
+        """, {'model': model_name, 'ids': tuple(record_ids)})
+        self.env.cr.execute("""
+            DELETE FROM mail_tracking_value
+             WHERE mail_message_id IN (
+                    SELECT id FROM mail_message
+                     WHERE model = %(model)s AND res_id IN %(ids)s
+                   )
+        """, {'model': model_name, 'ids': tuple(record_ids)})
+        self.env.cr.execute("""
+            DELETE FROM mail_message
+             WHERE model = %(model)s AND res_id IN %(ids)s
+        """, {'model': model_name, 'ids': tuple(record_ids)})
+        self.env['mail.message'].invalidate_model()
+
+
+class TrainingEnrollmentArchive(models.Model):
+    _name = 'training.enrollment.archive'
+    _description = 'Archived Training Enrollment'
+    _order = 'start_date desc, id desc'
+    _log_access = False
+
+    original_id = fields.Integer(
+        string='Original ID',
+        readonly=True,
+        index=True
+    )
+    name = fields.Char(
+        string='Reference',
+        readonly=True
+    )
+    employee_id = fields.Many2one(
+        comodel_name='hr.employee',
+        string='Employee',
+        ondelete='set null',
+        readonly=True,
+        index=True
+    )
+    course_id = fields.Many2one(
+        comodel_name='training.course',
+        string='Course',
+        ondelete='set null',
+        readonly=True,
+        index=True
+    )
+    session_name = fields.Char(
+        string='Training Session',
+        readonly=True
+    )
+    state = fields.Selection([
+        ('attended', 'Attended'),
+        ('no_show', 'No Show'),
+        ('cancelled', 'Cancelled'),
+    ], string='Status', readonly=True)
+    enrollment_date = fields.Date(
+        string='Enrollment Date',
+        readonly=True
+    )
+    start_date = fields.Date(
+        string='Start Date',
+        readonly=True
+    )
+    end_date = fields.Date(
+        string='End Date',
+        readonly=True
+    )
+    company_id = fields.Many2one(
+        comodel_name='res.company',
+        string='Company',
+        readonly=True
+    )
+    archive_date = fields.Date(
+        string='Archived On',
+        readonly=True
+    )
+
+    @api.model
+    def _archive_enrollments(self, cutoff, batch_size):
+        """Move one batch of finished enrollments older than the cutoff"""
+        Session = self.env['training.session']
+        self.env.cr.execute("""
+            WITH moved AS (
+                DELETE FROM training_enrollment e
+                 WHERE e.id IN (
+                        SELECT id
+                          FROM training_enrollment
+                         WHERE state IN ('attended', 'no_show', 'cancelled')
+                           AND COALESCE(end_date, enrollment_date) < %(cutoff)s
+                      ORDER BY id
+                         LIMIT %(limit)s
+                 )
+             RETURNING e.id, e.name, e.employee_id, e.course_id, e.session_id, e.state,
+                       e.enrollment_date, e.start_date, e.end_date, e.company_id
+            ), archived AS (
+                INSERT INTO training_enrollment_archive
+                       (original_id, name, employee_id, course_id, session_name, state,
+                        enrollment_date, start_date, end_date, company_id, archive_date)
+                SELECT m.id, m.name, m.employee_id, m.course_id, s.name, m.state,
+                       m.enrollment_date, m.start_date, m.end_date, m.company_id, %(today)s
+                  FROM moved m
+             LEFT JOIN training_session s ON s.id = m.session_id
+            )
+            SELECT id, session_id FROM moved
+        """, {
+            'cutoff': cutoff,
+            'limit': batch_size,
+            'today': fields.Date.context_today(self),
+        })
+        rows = self.env.cr.fetchall()
+        moved_ids = [enrollment_id for enrollment_id, __ in rows]
+        self.env['training.archive']._cleanup_moved_records('training.enrollment', moved_ids)
+        # The stored seat counters of the sessions depend on their enrollments
+        sessions = Session.browse({session_id for __, session_id in rows if session_id})
+        sessions.invalidate_recordset(['enrollment_ids'])
+        sessions.modified(['enrollment_ids'])
+        sessions.flush_recordset(['enrolled_count', 'available_seats'])
+        return len(moved_ids)
+
+
+class TrainingCertificateArchive(models.Model):
+    _name = 'training.certificate.archive'
+    _description = 'Archived Training Certificate'
+    _order = 'issue_date desc, id desc'
+    _log_access = False
+
+    original_id = fields.Integer(
+        string='Original ID',
+        readonly=True,
+        index=True
+    )
+    name = fields.Char(
+        string='Certificate Number',
+        readonly=True,
+        index=True
+    )
+    employee_id = fields.Many2one(
+        comodel_name='hr.employee',
+        string='Employee',
+        ondelete='set null',
+        readonly=True,
+        index=True
+    )
+    course_id = fields.Many2one(
+        comodel_name='training.course',
+        string='Course',
+        ondelete='set null',
+        readonly=True,
+        index=True
+    )
+    company_id = fields.Many2one(
+        comodel_name='res.company',
+        string='Company',
+        readonly=True
+    )
+    issue_date = fields.Date(
+        string='Issue Date',
+        readonly=True
+    )
+    expiry_date = fields.Date(
+        string='Expiry Date',
+        readonly=True
+    )
+    archive_date = fields.Date(
+        string='Archived On',
+        readonly=True
+    )
+
+    @api.model
+    def _archive_certificates(self, cutoff, batch_size):
+        """Move one batch of certificates expired before the cutoff"""
+        self.env.cr.execute("""
+            WITH moved AS (
+                DELETE FROM training_certificate c
+                 WHERE c.id IN (
+                        SELECT id
+                          FROM training_certificate
+                         WHERE expiry_date < %(cutoff)s
+                      ORDER BY id
+                         LIMIT %(limit)s
+                 )
+             RETURNING c.id, c.name, c.employee_id, c.course_id, c.company_id,
+                       c.issue_date, c.expiry_date
+            )
+            INSERT INTO training_certificate_archive
+                   (original_id, name, employee_id, course_id, company_id,
+                    issue_date, expiry_date, archive_date)
+            SELECT m.id, m.name, m.employee_id, m.course_id, m.company_id,
+                   m.issue_date, m.expiry_date, %(today)s
+              FROM moved m
+         RETURNING original_id
+        """, {
+            'cutoff': cutoff,
+            'limit': batch_size,
+            'today': fields.Date.context_today(self),
+        })
+        moved_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.env['training.archive']._cleanup_moved_records('training.certificate', moved_ids)
+        if moved_ids:
+            self.env['training.certificate']._invalidate_expiry_forecast()
+        return len(moved_ids)
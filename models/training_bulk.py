@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+from odoo import models, api, exceptions, _
+
+# Context keys switching off per-record tracking, logging and subscriptions
+BULK_CONTEXT = {
+    'training_bulk': True,
+    'tracking_disable': True,
+    'mail_notrack': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_auto_subscribe_no_notify': True,
+}
+
+
+def format_id_ranges(ids):
+    """Compact a list of ids into ranges, e.g. ``[1, 2, 3, 7]`` -> ``1-3, 7``"""
+    ranges = []
+    for record_id in sorted(set(ids)):
+        if ranges and ranges[-1][1] == record_id - 1:
+            ranges[-1][1] = record_id
+        else:
+            ranges.append([record_id, record_id])
+    return ', '.join(
+        str(start) if start == end else f'{start}-{end}' for start, end in ranges
+    )
+
+
+class TrainingBulkMixin(models.AbstractModel):
+    _name = 'training.bulk.mixin'
+    _description = 'Training Bulk Operations'
+
+    def with_bulk_mode(self):
+        """Return the records in bulk mode: no tracking and no chatter noise"""
+        return self.with_context(**BULK_CONTEXT)
+
+    def _is_bulk_mode(self):
+        return bool(self.env.context.get('training_bulk'))
+
+    def _training_message_post(self, **kwargs):
+        """Post a chatter message, skipped in bulk mode"""
+        if self._is_bulk_mode():
+            return self.env['mail.message']
+        return self.message_post(**kwargs)
+
+    def _get_bulk_audit_parent(self):
+        """Record receiving the audit summary of a bulk operation"""
+        self.ensure_one()
+        return self
+
+    def _post_bulk_audit(self, operation):
+        """Log one compact summary per parent record of a bulk operation"""
+        ids_per_parent = defaultdict(list)
+        for record in self:
+            ids_per_parent[record._get_bulk_audit_parent()].append(record.id)
+        description = self.env['ir.model']._get(self._name).name
+        for parent, record_ids in ids_per_parent.items():
+            if not parent:
+                continue
+            parent.with_context(training_bulk=False).message_post(body=_(
+                'Bulk %(operation)s by %(user)s: %(count)s %(model)s record(s) (IDs: %(ids)s).',
+                operation=operation,
+                user=self.env.user.name,
+                count=len(record_ids),
+                model=description,
+                ids=format_id_ranges(record_ids),
+            ))
+
+    @api.model
+    def bulk_create(self, vals_list):
+        """Create records in bulk mode and log one audit summary per parent"""
+        records = self.with_bulk_mode().create(vals_list)
+        records._post_bulk_audit(_('creation'))
+        return records.with_env(self.env)
+
+    def bulk_write(self, vals):
+        """Write records in bulk mode and log one audit summary per parent"""
+        self.with_bulk_mode().write(vals)
+        self._post_bulk_audit(_('update of %s', ', '.join(sorted(vals))))
+        return True
+
+    def bulk_action(self, action_name):
+        """Run a workflow action in bulk mode and log one audit summary per parent"""
+        if not action_name.startswith('action_') or not hasattr(self, action_name):
+            raise exceptions.UserError(_('Invalid bulk action: %s', action_name))
+        result = getattr(self.with_bulk_mode(), action_name)()
+        self._post_bulk_audit(action_name.removeprefix('action_').replace('_', ' '))
+        return result
@@ -1,13 +1,35 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
+from datetime import timedelta
 from dateutil.relativedelta import relativedelta
-from odoo import models, fields, api, _
+from odoo import models, fields, api, exceptions, tools, _
+from odoo.tools import format_date, split_every
+
+FORECAST_FIELDS = {'issue_date', 'course_id', 'company_id', 'is_superseded'}
+STATE_FIELDS = {'issue_date', 'course_id', 'is_superseded'}
+STATUS_REFRESH_CHUNK = 10000
+EXPIRING_SOON_DAYS = 30
+# 'activity' schedules one activity per certificate and recipient, 'digest'
+# sends one consolidated notification per recipient and run
+NOTIFICATION_MODE_PARAM = 'employee_training.expiry_notification_mode'
+# Expiry emails rendered per template call, and queued per cron run
+EXPIRY_MAIL_RENDER_BATCH = 100
+DEFAULT_EXPIRY_MAIL_LIMIT = 500
+# Minutes between two runs queuing expiry emails, which spreads the backlog
+EXPIRY_MAIL_INTERVAL_PARAM = 'employee_training.expiry_mail_interval'
+DEFAULT_EXPIRY_MAIL_INTERVAL = 10
+# Version of the certificate data in the forecast cache key. A PostgreSQL
+# sequence is shared by all workers and bumping it does not clear the other
+# ormcaches, unlike a config parameter or a registry cache clear.
+FORECAST_VERSION_SEQUENCE = 'training_certificate_forecast_version_seq'
 
 
 class TrainingCertificate(models.Model):
     _name = 'training.certificate'
     _description = 'Training Certificate'
-    _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin', 'training.bulk.mixin',
+                'training.export.mixin', 'training.change.feed.mixin']
     _order = 'issue_date desc'
 
     name = fields.Char(
@@ -25,6 +47,14 @@ class TrainingCertificate(models.Model):
         tracking=True,
         index=True
     )
+    owner_user_id = fields.Many2one(
+        comodel_name='res.users',
+        string='Owner',
+        compute='_compute_owner_user_id',
+        store=True,
+        index=True,
+        help='User of the employee, filtered on by record rules and portal pages'
+    )
     course_id = fields.Many2one(
         comodel_name='training.course',
         string='Course',
@@ -71,7 +101,23 @@ class TrainingCertificate(models.Model):
         ('valid', 'Valid'),
         ('expiring_soon', 'Expiring Soon'),
         ('expired', 'Expired'),
+        ('superseded', 'Superseded'),
     ], string='Status', compute='_compute_state', store=True, index=True)
+
+    # Renewal chain
+    previous_certificate_id = fields.Many2one(
+        comodel_name='training.certificate',
+        string='Renewed From',
+        ondelete='set null',
+        copy=False,
+        index=True
+    )
+    is_superseded = fields.Boolean(
+        string='Superseded',
+        default=False,
+        copy=False,
+        help='Set when the certificate has been replaced by a renewal'
+    )
     
     # For notifications
     expiry_notified = fields.Boolean(
@@ -79,14 +125,79 @@ class TrainingCertificate(models.Model):
         default=False,
         help='Whether expiry notification has been sent'
     )
+    expiry_mail_sent = fields.Boolean(
+        string='Expiry Email Sent',
+        default=False,
+        copy=False,
+        help='Whether the expiry email has been queued for the employee'
+    )
 
     @api.model_create_multi
     def create(self, vals_list):
         """Override create to generate certificate number"""
-        for vals in vals_list:
-            if vals.get('name', 'New') == 'New':
-                vals['name'] = self.env['ir.sequence'].next_by_code('training.certificate') or 'New'
-        return super().create(vals_list)
+        pending = [vals for vals in vals_list if vals.get('name', 'New') == 'New']
+        if pending:
+            numbers = self._reserve_certificate_numbers(len(pending))
+            for vals, number in zip(pending, numbers):
+                vals['name'] = number
+        certificates = super().create(vals_list)
+        self._invalidate_expiry_forecast()
+        self.env['training.outbox.event']._emit('certificate.issued', certificates)
+        certificates._notify_dashboard({})
+        return certificates
+
+    def write(self, vals):
+        previous_states = {}
+        if STATE_FIELDS.intersection(vals):
+            previous_states = {certificate.id: certificate.state for certificate in self}
+        res = super().write(vals)
+        if FORECAST_FIELDS.intersection(vals):
+            self._invalidate_expiry_forecast()
+        if previous_states:
+            changed = self.filtered(lambda c: c.state != previous_states[c.id])
+            self.env['training.outbox.event']._emit('certificate.state_changed', changed, extra={
+                certificate.id: {'previous_state': previous_states[certificate.id]}
+                for certificate in changed
+            })
+            changed._notify_dashboard(previous_states)
+        return res
+
+    def _notify_dashboard(self, previous_states):
+        """Publish certificate state changes to the live dashboards"""
+        self.env['training.dashboard']._notify([{
+            'type': 'certificate',
+            'id': certificate.id,
+            'previous_state': previous_states.get(certificate.id),
+            'state': certificate.state,
+        } for certificate in self])
+
+    def unlink(self):
+        res = super().unlink()
+        self._invalidate_expiry_forecast()
+        self.env['training.department.kpi']._invalidate_kpis()
+        return res
+
+    def init(self):
+        super().init()
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % FORECAST_VERSION_SEQUENCE)
+
+    @api.model
+    def _reserve_certificate_numbers(self, count):
+        """Reserve a block of certificate numbers in one round trip"""
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'training.certificate'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return ['New'] * count
+        if sequence.implementation == 'standard' and not sequence.use_date_range:
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ('ir_sequence_%03d' % sequence.id, count)
+            )
+            return [sequence.get_next_char(row[0]) for row in self.env.cr.fetchall()]
+        # No-gap and date range sequences must go through the regular API
+        return [sequence.next_by_id() for __ in range(count)]
 
     def _compute_access_url(self):
         """Compute portal access URL"""
@@ -94,12 +205,22 @@ class TrainingCertificate(models.Model):
         for certificate in self:
             certificate.access_url = f'/my/certificates/{certificate.id}'
 
+    # User changes are propagated in bulk by hr.employee, see
+    # _sync_training_owner, hence no dependency on employee_id.user_id.
+    @api.depends('employee_id')
+    def _compute_owner_user_id(self):
+        for certificate in self:
+            certificate.owner_user_id = certificate.employee_id.user_id
+
+    # Validity changes are propagated in bulk by training.course, see
+    # _recompute_certificate_expiry, hence no dependency on validity_months.
     @api.depends('issue_date', 'course_id', 'course_id.is_certification')
     def _compute_expiry_date(self):
-        """Auto-calculate expiry date (+2 years for certification courses)"""
+        """Auto-calculate expiry date from the course validity period"""
         for certificate in self:
-            if certificate.course_id.is_certification and certificate.issue_date:
-                certificate.expiry_date = certificate.issue_date + relativedelta(years=2)
+            course = certificate.course_id
+            if course.is_certification and course.validity_months > 0 and certificate.issue_date:
+                certificate.expiry_date = certificate.issue_date + relativedelta(months=course.validity_months)
             else:
                 certificate.expiry_date = False
 
@@ -121,51 +242,321 @@ class TrainingCertificate(models.Model):
             else:
                 certificate.days_until_expiry = 0
 
-    @api.depends('expiry_date', 'is_expired', 'days_until_expiry')
+    @api.depends('expiry_date', 'is_expired', 'days_until_expiry', 'is_superseded')
     def _compute_state(self):
         for certificate in self:
-            if not certificate.expiry_date:
+            if certificate.is_superseded:
+                certificate.state = 'superseded'
+            elif not certificate.expiry_date:
                 certificate.state = 'valid'
             elif certificate.is_expired:
                 certificate.state = 'expired'
-            elif certificate.days_until_expiry <= 30:
+            elif certificate.days_until_expiry <= EXPIRING_SOON_DAYS:
                 certificate.state = 'expiring_soon'
             else:
                 certificate.state = 'valid'
 
     def action_renew_certificate(self):
-        """Create a new certificate with updated dates"""
-        self.ensure_one()
-        new_cert = self.copy({
-            'issue_date': fields.Date.context_today(self),
-            'expiry_notified': False,
-        })
+        """Renew the selected certificates and open the renewals"""
+        renewals = self._renew_certificates()
+        if len(renewals) == 1:
+            return {
+                'name': _('Renewed Certificate'),
+                'type': 'ir.actions.act_window',
+                'res_model': 'training.certificate',
+                'res_id': renewals.id,
+                'view_mode': 'form',
+                'target': 'current',
+            }
         return {
-            'name': _('Renewed Certificate'),
+            'name': _('Renewed Certificates'),
             'type': 'ir.actions.act_window',
             'res_model': 'training.certificate',
-            'res_id': new_cert.id,
-            'view_mode': 'form',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', renewals.ids)],
             'target': 'current',
         }
 
+    def _renew_certificates(self, issue_date=None):
+        """Renew certificates in bulk.
+
+        All renewals are created with a single create call, numbered from a
+        reserved sequence block and linked to their predecessor, which are
+        then marked as superseded in one write.
+        """
+        superseded = self.filtered('is_superseded')
+        if superseded:
+            raise exceptions.UserError(_(
+                'Certificates already renewed cannot be renewed again: %s',
+                ', '.join(superseded.mapped('name'))
+            ))
+        if not self:
+            return self
+        issue_date = issue_date or fields.Date.context_today(self)
+        renewals = self.with_bulk_mode().create([{
+            'employee_id': certificate.employee_id.id,
+            'course_id': certificate.course_id.id,
+            'company_id': certificate.company_id.id,
+            'issue_date': issue_date,
+            'previous_certificate_id': certificate.id,
+        } for certificate in self])
+        self.with_bulk_mode().write({'is_superseded': True})
+        renewals = renewals.with_env(self.env)
+        renewals._post_bulk_audit(_('renewal'))
+        return renewals
+
+    def _get_bulk_audit_parent(self):
+        return self.course_id
+
+    def _get_outbox_payload(self):
+        self.ensure_one()
+        return {
+            'id': self.id,
+            'number': self.name,
+            'employee_id': self.employee_id.id,
+            'employee': self.employee_id.name,
+            'course_id': self.course_id.id,
+            'course': self.course_id.name,
+            'issue_date': fields.Date.to_string(self.issue_date),
+            'expiry_date': fields.Date.to_string(self.expiry_date),
+            'state': self.state,
+        }
+
     @api.model
-    def _cron_check_expiring_certificates(self):
-        """Cron job to check for expiring certificates and send notifications"""
+    def _get_expiring_domain(self):
+        """Certificates expiring within 30 days that haven't been notified"""
         today = fields.Date.context_today(self)
-        expiry_threshold = today + relativedelta(days=30)
-        
-        # Find certificates expiring within 30 days that haven't been notified
-        expiring_certs = self.search([
+        expiry_threshold = today + relativedelta(days=EXPIRING_SOON_DAYS)
+        return [
             ('expiry_date', '<=', expiry_threshold),
             ('expiry_date', '>=', today),
             ('expiry_notified', '=', False),
-        ])
-        
-        for cert in expiring_certs:
-            cert._send_expiry_notification()
-            cert.expiry_notified = True
-        
+            ('is_superseded', '=', False),
+        ]
+
+    @api.model
+    def _cron_check_expiring_certificates(self):
+        """Cron job to check for expiring certificates and send notifications"""
+        expiring_certs = self.search(self._get_expiring_domain())
+        expiring_certs._process_expiry_notifications()
+        return True
+
+    def _process_expiry_notifications(self):
+        """Notify and flag the given expiring certificates"""
+        mode = self.env['ir.config_parameter'].sudo().get_param(NOTIFICATION_MODE_PARAM, 'activity')
+        if mode == 'digest':
+            self._send_expiry_digests()
+            self.write({'expiry_notified': True})
+        else:
+            for cert in self:
+                cert._send_expiry_notification()
+                cert.expiry_notified = True
+        if self:
+            self._schedule_expiry_emails()
+
+    @api.model
+    def _schedule_expiry_emails(self):
+        """Schedule the next run queuing expiry emails, after the configured interval"""
+        cron = self.env.ref('employee_training.ir_cron_send_expiry_emails', raise_if_not_found=False)
+        if not cron:
+            return
+        interval = int(self.env['ir.config_parameter'].sudo().get_param(
+            EXPIRY_MAIL_INTERVAL_PARAM, DEFAULT_EXPIRY_MAIL_INTERVAL
+        ))
+        cron._trigger(at=fields.Datetime.now() + timedelta(minutes=max(interval, 0)))
+
+    @api.model
+    def _cron_send_expiry_emails(self):
+        """Queue the expiry email of notified certificates, throttled per run.
+
+        The template is rendered for many certificates per call and the mails
+        are queued for the mail scheduler rather than sent synchronously. While
+        certificates are left, the next run is scheduled after the configured
+        interval rather than right away.
+        """
+        limit = int(self.env['ir.config_parameter'].sudo().get_param(
+            'employee_training.expiry_mail_limit', DEFAULT_EXPIRY_MAIL_LIMIT
+        ))
+        template = self.env.ref('employee_training.mail_template_certificate_expiry', raise_if_not_found=False)
+        if not template or limit <= 0:
+            return True
+        certificates = self.search([
+            ('expiry_notified', '=', True),
+            ('expiry_mail_sent', '=', False),
+            ('is_superseded', '=', False),
+            ('expiry_date', '>=', fields.Date.context_today(self)),
+            ('employee_id.work_email', '!=', False),
+        ], order='expiry_date, id', limit=limit + 1)
+        remaining = certificates[limit:]
+        for batch in split_every(EXPIRY_MAIL_RENDER_BATCH, certificates[:limit].ids, self.browse):
+            template.send_mail_batch(batch.ids, force_send=False)
+            batch.write({'expiry_mail_sent': True})
+            self.env.invalidate_all()
+        if remaining:
+            self._schedule_expiry_emails()
+        return True
+
+    def _send_expiry_digests(self):
+        """Send one consolidated expiry notification per recipient.
+
+        Recipients are collected with a single query: employees get their own
+        certificates, managers those of their direct reports grouped by
+        employee.
+        """
+        if not self:
+            return
+        self.flush_recordset(['name', 'employee_id', 'course_id', 'expiry_date'])
+        self.env['hr.employee'].flush_model(['name', 'user_id', 'parent_id'])
+        self.env.cr.execute("""
+            SELECT u.partner_id, false, e.name, c.name, tc.name, c.expiry_date
+              FROM training_certificate c
+              JOIN hr_employee e ON e.id = c.employee_id
+              JOIN training_course tc ON tc.id = c.course_id
+              JOIN res_users u ON u.id = e.user_id AND u.active
+             WHERE c.id IN %(ids)s
+         UNION ALL
+            SELECT u.partner_id, true, e.name, c.name, tc.name, c.expiry_date
+              FROM training_certificate c
+              JOIN hr_employee e ON e.id = c.employee_id
+              JOIN hr_employee m ON m.id = e.parent_id
+              JOIN training_course tc ON tc.id = c.course_id
+              JOIN res_users u ON u.id = m.user_id AND u.active
+             WHERE c.id IN %(ids)s
+          ORDER BY 1, 2, 3, 6
+        """, {'ids': tuple(self.ids)})
+        digests = defaultdict(lambda: {'own': [], 'team': defaultdict(list)})
+        for partner_id, team, employee, number, course, expiry_date in self.env.cr.fetchall():
+            line = {
+                'number': number,
+                'course': course,
+                'expiry_date': format_date(self.env, expiry_date),
+            }
+            if team:
+                digests[partner_id]['team'][employee].append(line)
+            else:
+                digests[partner_id]['own'].append(line)
+
+        for partner_id, digest in digests.items():
+            body = self.env['ir.qweb']._render('employee_training.certificate_expiry_digest', {
+                'own': digest['own'],
+                'team': list(digest['team'].items()),
+            })
+            self.env['mail.thread'].message_notify(
+                partner_ids=[partner_id],
+                subject=_('Certificates Expiring Soon'),
+                body=body,
+                email_layout_xmlid='mail.mail_notification_light',
+            )
+
+    @api.model
+    def _sql_recompute_expiry(self, certificate_ids):
+        """Recompute expiry data of certificates with set-based SQL.
+
+        Mirrors the expiry/state computes without going through the ORM. The
+        expiry notification flag is reset for certificates that left the
+        notification window so they get notified again later. Callers are
+        responsible for flushing before and invalidating the cache after.
+        """
+        if not certificate_ids:
+            return
+        self.env.cr.execute("""
+            UPDATE training_certificate c
+               SET expiry_date = CASE
+                       WHEN tc.is_certification AND tc.validity_months > 0
+                       THEN (c.issue_date + make_interval(months => tc.validity_months))::date
+                   END,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM training_course tc
+             WHERE tc.id = c.course_id
+               AND c.id IN %(ids)s
+        """, {'uid': self.env.uid, 'ids': tuple(certificate_ids)})
+        self._sql_refresh_expiry_status(certificate_ids)
+        self.env.cr.execute("""
+            UPDATE training_certificate
+               SET expiry_notified = false,
+                   expiry_mail_sent = false
+             WHERE id IN %(ids)s
+               AND expiry_notified
+               AND (expiry_date IS NULL OR expiry_date > %(threshold)s)
+        """, {
+            'ids': tuple(certificate_ids),
+            'threshold': fields.Date.context_today(self) + relativedelta(days=EXPIRING_SOON_DAYS),
+        })
+
+    @api.model
+    def _sql_refresh_expiry_status(self, certificate_ids):
+        """Refresh days until expiry, expired flag and state from expiry_date.
+
+        Status transitions are stamped in write_date and published to the
+        outbox; rows without a previous state (bulk imports) are not.
+        """
+        if not certificate_ids:
+            return
+        self.env.cr.execute("""
+            UPDATE training_certificate c
+               SET days_until_expiry = n.days_until_expiry,
+                   is_expired = n.is_expired,
+                   state = n.state,
+                   write_uid = CASE WHEN c.state IS DISTINCT FROM n.state THEN %(uid)s ELSE c.write_uid END,
+                   write_date = CASE WHEN c.state IS DISTINCT FROM n.state
+                                     THEN (now() at time zone 'UTC') ELSE c.write_date END
+              FROM (
+                    SELECT id,
+                           state AS previous_state,
+                           COALESCE(expiry_date - %(today)s, 0) AS days_until_expiry,
+                           COALESCE(expiry_date < %(today)s, false) AS is_expired,
+                           CASE
+                               WHEN is_superseded THEN 'superseded'
+                               WHEN expiry_date IS NULL THEN 'valid'
+                               WHEN expiry_date < %(today)s THEN 'expired'
+                               WHEN expiry_date - %(today)s <= %(soon)s THEN 'expiring_soon'
+                               ELSE 'valid'
+                           END AS state
+                      FROM training_certificate
+                     WHERE id IN %(ids)s
+                   ) n
+             WHERE c.id = n.id
+         RETURNING c.id, n.previous_state, c.state
+        """, {
+            'today': fields.Date.context_today(self),
+            'soon': EXPIRING_SOON_DAYS,
+            'uid': self.env.uid,
+            'ids': tuple(certificate_ids),
+        })
+        transitions = {
+            certificate_id: previous_state
+            for certificate_id, previous_state, state in self.env.cr.fetchall()
+            if previous_state and previous_state != state
+        }
+        if transitions:
+            changed = self.browse(list(transitions))
+            changed.invalidate_recordset([
+                'expiry_date', 'days_until_expiry', 'is_expired', 'state', 'write_uid', 'write_date',
+            ])
+            self.env['training.outbox.event']._emit('certificate.state_changed', changed, extra={
+                certificate_id: {'previous_state': previous_state}
+                for certificate_id, previous_state in transitions.items()
+            })
+            changed._notify_dashboard(transitions)
+
+    @api.model
+    def _cron_refresh_expiry_status(self):
+        """Cron job moving certificates to expiring soon / expired as days pass"""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT id
+              FROM training_certificate
+             WHERE expiry_date IS NOT NULL
+               AND NOT is_superseded
+               AND (state != 'expired' OR days_until_expiry != expiry_date - %s)
+          ORDER BY id
+        """, [fields.Date.context_today(self)])
+        certificate_ids = [row[0] for row in self.env.cr.fetchall()]
+        for chunk in split_every(STATUS_REFRESH_CHUNK, certificate_ids):
+            self._sql_refresh_expiry_status(chunk)
+        self.invalidate_model(['days_until_expiry', 'is_expired', 'state', 'write_uid', 'write_date'])
+        self._invalidate_expiry_forecast()
         return True
 
     def _send_expiry_notification(self):
@@ -204,10 +595,109 @@ class TrainingCertificate(models.Model):
             )
         
         # Log in chatter
-        self.message_post(
+        self._training_message_post(
             body=_("Expiry notification sent. Certificate expires on %s", self.expiry_date)
         )
 
+    @api.model
+    def get_expiry_forecast(self, months=12, course_ids=None, department_ids=None):
+        """Weekly certificate expiry counts per course for the next months.
+
+        Returns chart-ready series: the list of week start dates and, per
+        course, the number of certificates expiring in each of those weeks.
+        """
+        months = min(max(int(months), 6), 24)
+        today = fields.Date.context_today(self)
+        self.env.cr.execute("SELECT last_value FROM %s" % FORECAST_VERSION_SEQUENCE)
+        rows = self._get_expiry_forecast(
+            self.env.cr.fetchone()[0],
+            months,
+            tuple(sorted(course_ids or ())),
+            today,
+            tuple(sorted(self.env.companies.ids)),
+            tuple(sorted(department_ids or ())),
+        )
+
+        first_week = today - relativedelta(days=today.weekday())
+        end_date = today + relativedelta(months=months)
+        weeks = []
+        week = first_week
+        while week < end_date:
+            weeks.append(week)
+            week += relativedelta(weeks=1)
+        week_index = {week: index for index, week in enumerate(weeks)}
+
+        series = {}
+        totals = [0] * len(weeks)
+        for course_id, course_name, week, count in rows:
+            course_series = series.setdefault(course_id, {
+                'course_id': course_id,
+                'course_name': course_name,
+                'counts': [0] * len(weeks),
+                'total': 0,
+            })
+            index = week_index[week]
+            course_series['counts'][index] += count
+            course_series['total'] += count
+            totals[index] += count
+
+        return {
+            'weeks': [fields.Date.to_string(week) for week in weeks],
+            'series': sorted(series.values(), key=lambda s: -s['total']),
+            'totals': totals,
+        }
+
+    @api.model
+    @tools.ormcache('version', 'months', 'course_ids', 'today', 'company_ids', 'department_ids')
+    def _get_expiry_forecast(self, version, months, course_ids, today, company_ids, department_ids=()):
+        """Aggregate expiries per course and week in a single query (cached)"""
+        self.env['training.certificate'].flush_model(['expiry_date', 'course_id', 'company_id', 'employee_id'])
+        self.env['hr.employee'].flush_model(['department_id'])
+        query = """
+            SELECT c.course_id, tc.name,
+                   date_trunc('week', c.expiry_date)::date AS week,
+                   count(*)
+              FROM training_certificate c
+              JOIN training_course tc ON tc.id = c.course_id
+             WHERE c.expiry_date >= %(today)s
+               AND c.expiry_date < %(end_date)s
+               AND c.company_id IN %(company_ids)s
+               AND NOT c.is_superseded
+        """
+        params = {
+            'today': today,
+            'end_date': today + relativedelta(months=months),
+            'company_ids': company_ids,
+        }
+        if course_ids:
+            query += " AND c.course_id IN %(course_ids)s"
+            params['course_ids'] = course_ids
+        if department_ids:
+            query += """
+               AND c.employee_id IN (SELECT id FROM hr_employee WHERE department_id IN %(department_ids)s)
+            """
+            params['department_ids'] = department_ids
+        query += " GROUP BY c.course_id, tc.name, week"
+        self.env.cr.execute(query, params)
+        return tuple(self.env.cr.fetchall())
+
+    @api.model
+    def _invalidate_expiry_forecast(self):
+        """Retire the cached forecast series once certificates change.
+
+        The version is bumped right away for this transaction and again after
+        commit, so that a worker reading the new version before the commit
+        cannot keep a forecast computed from the previous data.
+        """
+        self.env.cr.execute("SELECT nextval(%s)", [FORECAST_VERSION_SEQUENCE])
+        if not self.env.cr.postcommit.data.get(FORECAST_VERSION_SEQUENCE):
+            self.env.cr.postcommit.data[FORECAST_VERSION_SEQUENCE] = True
+            self.env.cr.postcommit.add(self._bump_forecast_version)
+
+    def _bump_forecast_version(self):
+        with self.env.registry.cursor() as cr:
+            cr.execute("SELECT nextval(%s)", [FORECAST_VERSION_SEQUENCE])
+
     def action_print_certificate(self):
         """Print certificate PDF"""
         self.ensure_one()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import json
+from datetime import datetime, timedelta
+
+from odoo import models, fields, api, exceptions, _
+from odoo.tools.sql import create_index
+
+CHANGE_FEED_MODELS = (
+    'training.course',
+    'training.session',
+    'training.enrollment',
+    'training.certificate',
+)
+CHANGE_FEED_MAX_LIMIT = 5000
+DEFAULT_TOMBSTONE_RETENTION_DAYS = 90
+# Transactions stamp write_date with their start time, so rows written by a
+# transaction still running can appear "in the past" once it commits. Rows
+# more recent than this lag are held back until the next call.
+DEFAULT_CHANGE_FEED_LAG_SECONDS = 30
+
+
+class TrainingTombstone(models.Model):
+    _name = 'training.tombstone'
+    _description = 'Deleted Training Record'
+    _order = 'deleted_date, id'
+    _log_access = False
+
+    res_model = fields.Char(
+        string='Model',
+        required=True,
+        readonly=True
+    )
+    res_id = fields.Integer(
+        string='Record ID',
+        required=True,
+        readonly=True
+    )
+    deleted_date = fields.Datetime(
+        string='Deleted On',
+        required=True,
+        readonly=True
+    )
+
+    def init(self):
+        create_index(
+            self._cr, 'training_tombstone_model_deleted_date_id_idx',
+            self._table, ['res_model', 'deleted_date', 'id']
+        )
+
+    @api.model
+    def _record_deletions(self, model_name, record_ids):
+        """Store tombstones for records deleted, with or without the ORM"""
+        if not record_ids:
+            return
+        self.env.cr.execute("""
+            INSERT INTO training_tombstone (res_model, res_id, deleted_date)
+            SELECT %s, unnest(%s), (now() at time zone 'UTC')
+        """, (model_name, list(record_ids)))
+
+    @api.model
+    def _cron_purge_tombstones(self):
+        """Drop tombstones older than the retention period"""
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'employee_training.tombstone_retention_days', DEFAULT_TOMBSTONE_RETENTION_DAYS
+        ))
+        self.env.cr.execute(
+            "DELETE FROM training_tombstone WHERE deleted_date < %s",
+            [fields.Datetime.now() - timedelta(days=retention_days)]
+        )
+        return True
+
+
+class TrainingChangeFeedMixin(models.AbstractModel):
+    _name = 'training.change.feed.mixin'
+    _description = 'Training Change Feed'
+
+    def init(self):
+        super().init()
+        if self._auto:
+            create_index(
+                self._cr, '%s_write_date_id_idx' % self._table,
+                self._table, ['write_date', 'id']
+            )
+
+    def unlink(self):
+        record_ids = self.ids
+        res = super().unlink()
+        self.env['training.tombstone']._record_deletions(self._name, record_ids)
+        return res
+
+    @api.model
+    def _get_change_feed_fields(self):
+        """Stored fields returned for changed rows"""
+        return [
+            name for name, field in self._fields.items()
+            if field.store and field.type not in ('binary', 'one2many', 'many2many')
+            and not name.startswith('message_') and not name.startswith('activity_')
+            and name not in ('access_token',)
+        ]
+
+    @api.model
+    def get_changes(self, cursor=None, limit=1000):
+        """One page of the change feed of the model.
+
+        :param cursor: opaque token returned by the previous call, None for a
+            full initial sync
+        :return: dict with the changed ``records``, the ids ``deleted`` since
+            the cursor, the ``cursor`` to pass to the next call and
+            ``has_more`` telling whether another page is already available
+
+        Changed rows and tombstones are paged with (write_date, id) and
+        (deleted_date, id) keysets backed by indexes, so a call costs time
+        proportional to the page, not to the table.
+        """
+        if self._name not in CHANGE_FEED_MODELS:
+            raise exceptions.UserError(_('No change feed for %s.', self._name))
+        if not self.env.su and not self.env.user.has_group('hr.group_hr_manager'):
+            raise exceptions.AccessError(_('Only training managers can read the change feed.'))
+        limit = min(max(int(limit), 1), CHANGE_FEED_MAX_LIMIT)
+        position = self._decode_change_cursor(cursor)
+
+        params = self.env['ir.config_parameter'].sudo()
+        lag = int(params.get_param('employee_training.change_feed_lag', DEFAULT_CHANGE_FEED_LAG_SECONDS))
+        retention_days = int(params.get_param(
+            'employee_training.tombstone_retention_days', DEFAULT_TOMBSTONE_RETENTION_DAYS
+        ))
+        now = self.env.cr.now()
+        upper = now - timedelta(seconds=lag)
+        if position['deleted_date'] is None:
+            # Initial sync: rows deleted before it started are simply absent
+            position['deleted_date'] = upper
+        elif position['deleted_date'] < now - timedelta(days=retention_days):
+            raise exceptions.UserError(_('The cursor has expired, a full synchronization is required.'))
+
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT id, write_date
+              FROM %s
+             WHERE (write_date, id) > (%%(write_date)s, %%(id)s)
+               AND write_date <= %%(upper)s
+          ORDER BY write_date, id
+             LIMIT %%(limit)s
+        """ % self._table, {
+            'write_date': position['write_date'],
+            'id': position['id'],
+            'upper': upper,
+            'limit': limit + 1,
+        })
+        changed = self.env.cr.fetchall()
+        self.env.cr.execute("""
+            SELECT id, res_id, deleted_date
+              FROM training_tombstone
+             WHERE res_model = %(model)s
+               AND (deleted_date, id) > (%(deleted_date)s, %(id)s)
+               AND deleted_date <= %(upper)s
+          ORDER BY deleted_date, id
+             LIMIT %(limit)s
+        """, {
+            'model': self._name,
+            'deleted_date': position['deleted_date'],
+            'id': position['tombstone_id'],
+            'upper': upper,
+            'limit': limit + 1,
+        })
+        tombstones = self.env.cr.fetchall()
+
+        changed_more = len(changed) > limit
+        tombstones_more = len(tombstones) > limit
+        has_more = changed_more or tombstones_more
+        changed, tombstones = changed[:limit], tombstones[:limit]
+        if changed:
+            position['id'], position['write_date'] = changed[-1]
+        if tombstones:
+            position['tombstone_id'], __, position['deleted_date'] = tombstones[-1]
+        if not tombstones_more and position['deleted_date'] < upper:
+            # Every tombstone up to the upper bound has been seen
+            position['deleted_date'], position['tombstone_id'] = upper, 0
+
+        records = self.browse([record_id for record_id, __ in changed])
+        return {
+            'records': records.read(self._get_change_feed_fields()) if records else [],
+            'deleted': [res_id for __, res_id, __ in tombstones],
+            'cursor': self._encode_change_cursor(position),
+            'has_more': has_more,
+        }
+
+    @api.model
+    def _decode_change_cursor(self, cursor):
+        if not cursor:
+            return {'write_date': datetime(1970, 1, 1), 'id': 0, 'deleted_date': None, 'tombstone_id': 0}
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return {
+                # Keep microseconds, fields.Datetime would truncate them
+                'write_date': datetime.fromisoformat(data['w']),
+                'id': int(data['i']),
+                'deleted_date': datetime.fromisoformat(data['d']) if data.get('d') else None,
+                'tombstone_id': int(data['t']),
+            }
+        except (ValueError, KeyError, TypeError):
+            raise exceptions.UserError(_('Invalid change feed cursor.'))
+
+    @api.model
+    def _encode_change_cursor(self, position):
+        data = {
+            'w': position['write_date'].isoformat(sep=' '),
+            'i': position['id'],
+            'd': position['deleted_date'].isoformat(sep=' ') if position['deleted_date'] else None,
+            't': position['tombstone_id'],
+        }
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
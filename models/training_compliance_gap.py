@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+from dateutil.relativedelta import relativedelta
+from odoo import models, fields, api
+
+MATRIX_SNAPSHOT = 'compliance_gap'
+
+
+class TrainingComplianceGap(models.Model):
+    _name = 'training.compliance.gap'
+    _description = 'Training Compliance Gap'
+    _order = 'status, employee_id, course_id'
+    _log_access = False
+
+    employee_id = fields.Many2one(
+        comodel_name='hr.employee',
+        string='Employee',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    course_id = fields.Many2one(
+        comodel_name='training.course',
+        string='Required Course',
+        required=True,
+        ondelete='cascade',
+        index=True
+    )
+    department_id = fields.Many2one(
+        comodel_name='hr.department',
+        string='Department',
+        index=True
+    )
+    job_id = fields.Many2one(
+        comodel_name='hr.job',
+        string='Job Position',
+        index=True
+    )
+    company_id = fields.Many2one(
+        comodel_name='res.company',
+        string='Company'
+    )
+    certificate_id = fields.Many2one(
+        comodel_name='training.certificate',
+        string='Latest Certificate',
+        ondelete='set null'
+    )
+    expiry_date = fields.Date(
+        string='Expiry Date'
+    )
+    status = fields.Selection([
+        ('missing', 'Missing'),
+        ('expiring', 'Expiring'),
+        ('valid', 'Valid'),
+    ], string='Status', required=True, index=True)
+    snapshot_date = fields.Date(
+        string='Computed On'
+    )
+
+    @api.model
+    def _refresh_matrix(self, force=False):
+        """Rebuild the employee x required course coverage matrix.
+
+        The matrix is computed with a single set-based query and cached for
+        the day; it is only rebuilt when the cached snapshot is from an
+        earlier day, when requirements changed, or when forced.
+        """
+        today = fields.Date.context_today(self)
+        State = self.env['training.snapshot.state']
+        if not force and State._get_state(MATRIX_SNAPSHOT)[1] == today:
+            return False
+
+        self.env.flush_all()
+        self.env.cr.execute("DELETE FROM training_compliance_gap")
+        self.env.cr.execute("""
+            WITH requirement AS (
+                SELECT e.id AS employee_id, r.course_id
+                  FROM hr_employee e
+                  JOIN hr_job_training_course_rel r ON r.job_id = e.job_id
+                 WHERE e.active
+                 UNION
+                SELECT e.id, r.course_id
+                  FROM hr_employee e
+                  JOIN hr_department d ON d.id = e.department_id
+                  JOIN hr_department rd ON d.parent_path LIKE rd.parent_path || '%%'
+                  JOIN hr_department_training_course_rel r ON r.department_id = rd.id
+                 WHERE e.active
+            ), latest AS (
+                SELECT DISTINCT ON (c.employee_id, c.course_id)
+                       c.employee_id, c.course_id, c.id, c.expiry_date
+                  FROM training_certificate c
+                  JOIN requirement q
+                    ON q.employee_id = c.employee_id AND q.course_id = c.course_id
+              ORDER BY c.employee_id, c.course_id, c.expiry_date DESC NULLS FIRST, c.id DESC
+            )
+            INSERT INTO training_compliance_gap
+                   (employee_id, course_id, department_id, job_id, company_id,
+                    certificate_id, expiry_date, status, snapshot_date)
+            SELECT q.employee_id, q.course_id, e.department_id, e.job_id, e.company_id,
+                   l.id, l.expiry_date,
+                   CASE
+                       WHEN l.id IS NULL OR l.expiry_date < %(today)s THEN 'missing'
+                       WHEN l.expiry_date <= %(threshold)s THEN 'expiring'
+                       ELSE 'valid'
+                   END,
+                   %(today)s
+              FROM requirement q
+              JOIN hr_employee e ON e.id = q.employee_id
+              JOIN training_course tc ON tc.id = q.course_id AND tc.active
+         LEFT JOIN latest l
+                ON l.employee_id = q.employee_id AND l.course_id = q.course_id
+        """, {
+            'today': today,
+            'threshold': today + relativedelta(days=30),
+        })
+        State._set_state(MATRIX_SNAPSHOT, refresh_date=self.env.cr.now(), full_refresh_date=today)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def _invalidate_matrix(self):
+        """Force the next access to rebuild the matrix"""
+        self.env['training.snapshot.state']._set_state(MATRIX_SNAPSHOT, full_refresh_date=None)
+
+    @api.model
+    def _cron_refresh_matrix(self):
+        """Cron job to rebuild the compliance matrix once a day"""
+        self._refresh_matrix(force=True)
+        return True
+
+    @api.model
+    def action_open_matrix(self):
+        """Open the compliance matrix, rebuilding it first if it is stale"""
+        self._refresh_matrix()
+        return self.env['ir.actions.act_window']._for_xml_id(
+            'employee_training.action_training_compliance_gap'
+        )
+
+    @api.model
+    def action_refresh_matrix(self):
+        """Rebuild the matrix on demand"""
+        self._refresh_matrix(force=True)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'reload',
+        }
+
+    @api.model
+    def action_export_matrix(self):
+        """Download the full matrix through the streaming CSV export"""
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/training/compliance/export',
+            'target': 'self',
+        }
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, exceptions, _
+from odoo.tools import split_every
+
+EXPIRY_RECOMPUTE_CHUNK = 10000
 
 
 class TrainingCourse(models.Model):
     _name = 'training.course'
     _description = 'Training Course'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'training.bulk.mixin', 'training.change.feed.mixin']
     _order = 'name'
 
     name = fields.Char(
@@ -29,6 +32,13 @@ class TrainingCourse(models.Model):
         tracking=True,
         help='If checked, a certificate will be issued upon course completion'
     )
+    validity_months = fields.Integer(
+        string='Certificate Validity (Months)',
+        default=24,
+        tracking=True,
+        help='Number of months a certificate for this course stays valid. '
+             'Use 0 for certificates that never expire.'
+    )
     active = fields.Boolean(
         string='Active',
         default=True
@@ -70,6 +80,60 @@ class TrainingCourse(models.Model):
         for course in self:
             course.certificate_count = len(course.certificate_ids)
 
+    @api.constrains('validity_months')
+    def _check_validity_months(self):
+        for course in self:
+            if course.validity_months < 0:
+                raise exceptions.ValidationError(
+                    'Certificate validity cannot be negative.'
+                )
+
+    def write(self, vals):
+        previous_validity = {}
+        if 'validity_months' in vals:
+            previous_validity = {course.id: course.validity_months for course in self}
+        res = super().write(vals)
+        changed = self.filtered(lambda course: course.id in previous_validity
+                                and course.validity_months != previous_validity[course.id])
+        if changed:
+            changed._recompute_certificate_expiry()
+        return res
+
+    def _recompute_certificate_expiry(self):
+        """Recompute expiry data of all certificates of the courses.
+
+        Certificates are updated with set-based SQL in chunks instead of
+        through the per-record ORM computes, then re-evaluated for expiry
+        notifications.
+        """
+        Certificate = self.env['training.certificate']
+        self.flush_recordset(['validity_months', 'is_certification'])
+        Certificate.flush_model()
+        self.env.cr.execute(
+            "SELECT id FROM training_certificate WHERE course_id IN %s ORDER BY id",
+            [tuple(self.ids)]
+        )
+        certificate_ids = [row[0] for row in self.env.cr.fetchall()]
+        for chunk in split_every(EXPIRY_RECOMPUTE_CHUNK, certificate_ids):
+            Certificate._sql_recompute_expiry(chunk)
+        Certificate.invalidate_model([
+            'expiry_date', 'days_until_expiry', 'is_expired', 'state',
+            'expiry_notified', 'expiry_mail_sent', 'write_uid', 'write_date',
+        ])
+        Certificate._invalidate_expiry_forecast()
+        self.env['training.compliance.gap']._invalidate_matrix()
+
+        Certificate.search(
+            Certificate._get_expiring_domain() + [('course_id', 'in', self.ids)]
+        )._process_expiry_notifications()
+
+        for course in self:
+            course._training_message_post(body=_(
+                'Certificate validity set to %(months)s month(s); expiry dates recomputed.',
+                months=course.validity_months,
+            ))
+        return len(certificate_ids)
+
     def action_view_sessions(self):
         """Smart button action to view course sessions"""
         self.ensure_one()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+from collections import Counter
+
+from odoo import models, fields, api
+
+DASHBOARD_BUS_CHANNEL = 'employee_training.dashboard'
+DASHBOARD_BUS_NOTIFICATION = 'training_dashboard/update'
+DASHBOARD_DELTAS_KEY = 'employee_training.dashboard_deltas'
+
+
+class TrainingDashboard(models.AbstractModel):
+    _name = 'training.dashboard'
+    _description = 'Training Dashboard Live Updates'
+
+    @api.model
+    def _notify(self, deltas):
+        """Queue dashboard deltas for the current transaction.
+
+        Deltas are merged and published as a single bus message right before
+        commit, so a workflow action on many records sends one compact
+        message and a rolled back transaction sends nothing.
+
+        Supported deltas:
+        - ``{'type': 'enrollment', 'month', 'state', 'delta'}``
+        - ``{'type': 'enrollment_created'}`` for enrollments of this month
+        - ``{'type': 'seats', 'session_id'}``
+        - ``{'type': 'session', 'id', 'previous_state', 'state'}``
+        - ``{'type': 'certificate', 'id', 'previous_state', 'state'}``
+        """
+        if not deltas:
+            return
+        data = self.env.cr.precommit.data
+        if DASHBOARD_DELTAS_KEY not in data:
+            data[DASHBOARD_DELTAS_KEY] = []
+            self.env.cr.precommit.add(self.sudo()._send_deltas)
+        data[DASHBOARD_DELTAS_KEY].extend(deltas)
+
+    def _send_deltas(self):
+        deltas = self.env.cr.precommit.data.pop(DASHBOARD_DELTAS_KEY, [])
+        trend = Counter()
+        created = 0
+        session_ids = []
+        transitions = {'session': {}, 'certificate': {}}
+        for delta in deltas:
+            if delta['type'] == 'enrollment':
+                trend[delta['month'], delta['state']] += delta['delta']
+            elif delta['type'] == 'enrollment_created':
+                created += 1
+            elif delta['type'] == 'seats':
+                session_ids.append(delta['session_id'])
+            else:
+                # Keep the first previous state and the last state of a record
+                previous, __ = transitions[delta['type']].get(delta['id'], (delta['previous_state'], None))
+                transitions[delta['type']][delta['id']] = (previous, delta['state'])
+
+        message = [
+            {'type': 'enrollment', 'month': month, 'state': state, 'delta': delta}
+            for (month, state), delta in trend.items() if delta
+        ]
+        if created:
+            message.append({'type': 'enrollment_created', 'count': created})
+        for session in self.env['training.session'].browse(list(dict.fromkeys(session_ids))).exists():
+            message.append({
+                'type': 'seats',
+                'session_id': session.id,
+                'available_seats': session.available_seats,
+                'capacity': session.capacity,
+                'state': session.state,
+            })
+        for model_type, records in transitions.items():
+            message += [
+                {'type': model_type, 'id': record_id, 'previous_state': previous, 'state': state}
+                for record_id, (previous, state) in records.items() if previous != state
+            ]
+        self._add_certificate_lines(message)
+        if message:
+            self.env['bus.bus']._sendone(DASHBOARD_BUS_CHANNEL, DASHBOARD_BUS_NOTIFICATION, {
+                'deltas': message,
+            })
+
+    def _add_certificate_lines(self, message):
+        """Attach the list line of certificates entering the expiring list"""
+        entering = {
+            delta['id']: delta for delta in message
+            if delta['type'] == 'certificate' and delta['state'] == 'expiring_soon'
+        }
+        today = fields.Date.context_today(self)
+        for certificate in self.env['training.certificate'].browse(list(entering)).exists():
+            if certificate.expiry_date and certificate.expiry_date >= today:
+                entering[certificate.id]['line'] = {
+                    'id': certificate.id,
+                    'name': certificate.name,
+                    'employee_name': certificate.employee_id.name,
+                    'course_name': certificate.course_id.name,
+                    'expiry_date': certificate.expiry_date.strftime('%Y-%m-%d'),
+                    'days_until_expiry': certificate.days_until_expiry,
+                }
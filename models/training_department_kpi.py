@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+from odoo import models, fields, api
+
+KPI_SNAPSHOT = 'department_kpi'
+TRAINING_HOURS_PER_DAY = 8
+# Changes committed by transactions still running at the previous refresh
+# carry an earlier write_date, the incremental window overlaps to catch them
+KPI_REFRESH_OVERLAP = timedelta(minutes=5)
+KPI_COUNTERS = ('employee_count', 'enrolled_count', 'attended_count', 'overdue_count', 'training_hours')
+
+
+class TrainingDepartmentKpi(models.Model):
+    _name = 'training.department.kpi'
+    _description = 'Department Training KPIs'
+    _order = 'parent_path'
+    _rec_name = 'department_id'
+    _log_access = False
+
+    department_id = fields.Many2one(
+        comodel_name='hr.department',
+        string='Department',
+        required=True,
+        ondelete='cascade',
+        readonly=True
+    )
+    parent_id = fields.Many2one(
+        comodel_name='training.department.kpi',
+        string='Parent Department',
+        ondelete='set null',
+        readonly=True,
+        index=True
+    )
+    child_ids = fields.One2many(
+        comodel_name='training.department.kpi',
+        inverse_name='parent_id',
+        string='Sub-departments'
+    )
+    parent_path = fields.Char(
+        readonly=True,
+        index=True
+    )
+    company_id = fields.Many2one(
+        comodel_name='res.company',
+        string='Company',
+        readonly=True
+    )
+    direct_employee_count = fields.Integer(string='Employees', readonly=True)
+    total_employee_count = fields.Integer(string='Employees (Rollup)', readonly=True)
+    direct_enrolled_count = fields.Integer(string='Enrollments', readonly=True)
+    total_enrolled_count = fields.Integer(string='Enrollments (Rollup)', readonly=True)
+    direct_attended_count = fields.Integer(string='Attended', readonly=True)
+    total_attended_count = fields.Integer(string='Attended (Rollup)', readonly=True)
+    direct_completion_rate = fields.Float(string='Completion Rate (%)', digits=(5, 1), readonly=True)
+    total_completion_rate = fields.Float(string='Completion Rate (Rollup, %)', digits=(5, 1), readonly=True)
+    direct_overdue_count = fields.Integer(
+        string='Overdue Certificates',
+        readonly=True,
+        help='Expired certificates that have not been renewed'
+    )
+    total_overdue_count = fields.Integer(string='Overdue Certificates (Rollup)', readonly=True)
+    direct_training_hours = fields.Float(
+        string='Training Hours',
+        readonly=True,
+        help='Attended course days, including archived history, at %s hours per day' % TRAINING_HOURS_PER_DAY
+    )
+    total_training_hours = fields.Float(string='Training Hours (Rollup)', readonly=True)
+    snapshot_date = fields.Datetime(
+        string='Computed On',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('department_unique', 'UNIQUE(department_id)', 'A department has a single KPI snapshot.'),
+    ]
+
+    @api.model
+    def _refresh_kpis(self, full=False):
+        """Refresh the department KPI snapshot.
+
+        Direct figures are aggregated with set-based SQL, then rolled up along
+        the department tree with a prefix join on ``parent_path``. A full
+        rebuild runs once a day or when forced; in between only departments
+        of employees whose enrollments, certificates or records changed or
+        were archived since the previous refresh are recomputed, with their
+        ancestors' rollups. Deletions and employees changing department or
+        archived force the next refresh to be a full one.
+        """
+        self.env.flush_all()
+        State = self.env['training.snapshot.state']
+        now = self.env.cr.now()
+        today = fields.Date.context_today(self)
+        since, full_date = State._get_state(KPI_SNAPSHOT)
+        full = full or not since or full_date != today
+
+        department_ids = None
+        if not full:
+            department_ids = self._get_changed_departments(since - KPI_REFRESH_OVERLAP)
+            if not department_ids:
+                State._set_state(KPI_SNAPSHOT, refresh_date=now)
+                return False
+        else:
+            self.env.cr.execute("""
+                DELETE FROM training_department_kpi k
+                 USING hr_department d
+                 WHERE d.id = k.department_id AND NOT d.active
+            """)
+
+        self._upsert_direct_kpis(department_ids, now)
+        self._rollup_kpis(department_ids)
+        if full:
+            State._set_state(KPI_SNAPSHOT, refresh_date=now, full_refresh_date=today)
+        else:
+            State._set_state(KPI_SNAPSHOT, refresh_date=now)
+        self.invalidate_model()
+        return True
+
+    @api.model
+    def _get_changed_departments(self, since):
+        self.env.cr.execute("""
+            SELECT e.department_id
+              FROM training_enrollment en
+              JOIN hr_employee e ON e.id = en.employee_id
+             WHERE en.write_date > %(since)s
+             UNION
+            SELECT e.department_id
+              FROM training_certificate c
+              JOIN hr_employee e ON e.id = c.employee_id
+             WHERE c.write_date > %(since)s
+             UNION
+            SELECT department_id
+              FROM hr_employee
+             WHERE write_date > %(since)s
+             UNION
+            SELECT e.department_id
+              FROM training_tombstone t
+              JOIN training_enrollment_archive a ON a.original_id = t.res_id
+              JOIN hr_employee e ON e.id = a.employee_id
+             WHERE t.res_model = 'training.enrollment' AND t.deleted_date > %(since)s
+             UNION
+            SELECT e.department_id
+              FROM training_tombstone t
+              JOIN training_certificate_archive a ON a.original_id = t.res_id
+              JOIN hr_employee e ON e.id = a.employee_id
+             WHERE t.res_model = 'training.certificate' AND t.deleted_date > %(since)s
+             UNION
+            SELECT d.id
+              FROM hr_department d
+         LEFT JOIN training_department_kpi k ON k.department_id = d.id
+             WHERE d.active AND k.id IS NULL
+        """, {'since': since})
+        return tuple(row[0] for row in self.env.cr.fetchall() if row[0])
+
+    @api.model
+    def _upsert_direct_kpis(self, department_ids, now):
+        """Aggregate the direct figures of the departments, all when None"""
+        department_filter = "IS NOT NULL" if department_ids is None else "IN %(department_ids)s"
+        self.env.cr.execute("""
+            WITH employees AS (
+                SELECT department_id, count(*) AS employee_count
+                  FROM hr_employee
+                 WHERE active AND department_id {department_filter}
+              GROUP BY department_id
+            ), enrollments AS (
+                SELECT e.department_id,
+                       count(*) FILTER (WHERE en.state IN ('confirmed', 'attended', 'no_show')) AS enrolled_count,
+                       count(*) FILTER (WHERE en.state = 'attended') AS attended_count,
+                       COALESCE(sum(tc.duration_days) FILTER (WHERE en.state = 'attended'), 0)
+                           * %(hours_per_day)s AS training_hours
+                  FROM (
+                        SELECT employee_id, course_id, state FROM training_enrollment
+                         UNION ALL
+                        SELECT employee_id, course_id, state FROM training_enrollment_archive
+                       ) en
+                  JOIN hr_employee e ON e.id = en.employee_id
+                  JOIN training_course tc ON tc.id = en.course_id
+                 WHERE e.active AND e.department_id {department_filter}
+              GROUP BY e.department_id
+            ), overdue AS (
+                SELECT e.department_id, count(*) AS overdue_count
+                  FROM training_certificate c
+                  JOIN hr_employee e ON e.id = c.employee_id
+                 WHERE c.state = 'expired' AND e.active AND e.department_id {department_filter}
+              GROUP BY e.department_id
+            )
+            INSERT INTO training_department_kpi
+                   (department_id, company_id, parent_path, direct_employee_count, direct_enrolled_count,
+                    direct_attended_count, direct_completion_rate, direct_overdue_count,
+                    direct_training_hours, snapshot_date)
+            SELECT d.id, d.company_id, d.parent_path,
+                   COALESCE(em.employee_count, 0),
+                   COALESCE(en.enrolled_count, 0),
+                   COALESCE(en.attended_count, 0),
+                   CASE WHEN en.enrolled_count > 0
+                        THEN round(en.attended_count * 100.0 / en.enrolled_count, 1) ELSE 0 END,
+                   COALESCE(ov.overdue_count, 0),
+                   COALESCE(en.training_hours, 0),
+                   %(now)s
+              FROM hr_department d
+         LEFT JOIN employees em ON em.department_id = d.id
+         LEFT JOIN enrollments en ON en.department_id = d.id
+         LEFT JOIN overdue ov ON ov.department_id = d.id
+             WHERE d.active AND d.id {department_filter}
+                ON CONFLICT (department_id) DO UPDATE
+               SET company_id = EXCLUDED.company_id,
+                   parent_path = EXCLUDED.parent_path,
+                   direct_employee_count = EXCLUDED.direct_employee_count,
+                   direct_enrolled_count = EXCLUDED.direct_enrolled_count,
+                   direct_attended_count = EXCLUDED.direct_attended_count,
+                   direct_completion_rate = EXCLUDED.direct_completion_rate,
+                   direct_overdue_count = EXCLUDED.direct_overdue_count,
+                   direct_training_hours = EXCLUDED.direct_training_hours,
+                   snapshot_date = EXCLUDED.snapshot_date
+        """.format(department_filter=department_filter), {
+            'department_ids': department_ids,
+            'hours_per_day': TRAINING_HOURS_PER_DAY,
+            'now': now,
+        })
+
+    @api.model
+    def _rollup_kpis(self, department_ids):
+        """Roll direct figures up to the ancestors of the departments, all when None"""
+        self.env.cr.execute("""
+            UPDATE training_department_kpi k
+               SET parent_id = p.id
+              FROM hr_department d
+         LEFT JOIN training_department_kpi p ON p.department_id = d.parent_id
+             WHERE d.id = k.department_id
+               AND k.parent_id IS DISTINCT FROM p.id
+        """)
+        if department_ids is None:
+            scope = "TRUE"
+        else:
+            # The departments and every ancestor of them
+            scope = """a.id IN (
+                SELECT anc.id
+                  FROM training_department_kpi anc
+                  JOIN training_department_kpi k ON k.parent_path LIKE anc.parent_path || '%%'
+                 WHERE k.department_id IN %(department_ids)s
+            )"""
+        self.env.cr.execute("""
+            UPDATE training_department_kpi t
+               SET {assignments},
+                   total_completion_rate = CASE WHEN s.enrolled_count > 0
+                        THEN round(s.attended_count * 100.0 / s.enrolled_count, 1) ELSE 0 END
+              FROM (
+                    SELECT a.id, {sums}
+                      FROM training_department_kpi a
+                      JOIN training_department_kpi b ON b.parent_path LIKE a.parent_path || '%%'
+                     WHERE {scope}
+                  GROUP BY a.id
+                   ) s
+             WHERE t.id = s.id
+        """.format(
+            assignments=', '.join('total_%s = s.%s' % (name, name) for name in KPI_COUNTERS),
+            sums=', '.join('sum(b.direct_%s) AS %s' % (name, name) for name in KPI_COUNTERS),
+            scope=scope,
+        ), {'department_ids': department_ids})
+
+    @api.model
+    def _invalidate_kpis(self):
+        """Force the next refresh to rebuild the whole snapshot"""
+        self.env['training.snapshot.state']._set_state(KPI_SNAPSHOT, full_refresh_date=None)
+
+    @api.model
+    def _cron_refresh_kpis(self):
+        """Cron job refreshing the snapshot, fully once a day"""
+        self._refresh_kpis()
+        return True
+
+    @api.model
+    def action_open_report(self):
+        """Open the KPI report, refreshing the snapshot first"""
+        self._refresh_kpis()
+        return self.env['ir.actions.act_window']._for_xml_id(
+            'employee_training.action_training_department_kpi'
+        )
+
+    @api.model
+    def action_refresh_kpis(self):
+        """Rebuild the whole snapshot on demand"""
+        self._refresh_kpis(full=True)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'reload',
+        }
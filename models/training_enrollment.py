@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
 from odoo import models, fields, api, exceptions, _
+from odoo.tools import format_date
+from odoo.tools.sql import create_index
 
 
 class TrainingEnrollment(models.Model):
     _name = 'training.enrollment'
     _description = 'Training Enrollment'
-    _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin', 'training.bulk.mixin',
+                'training.export.mixin', 'training.change.feed.mixin']
     _order = 'create_date desc'
 
     name = fields.Char(
@@ -22,6 +26,14 @@ class TrainingEnrollment(models.Model):
         tracking=True,
         index=True
     )
+    owner_user_id = fields.Many2one(
+        comodel_name='res.users',
+        string='Owner',
+        compute='_compute_owner_user_id',
+        store=True,
+        index=True,
+        help='User of the employee, filtered on by record rules and portal pages'
+    )
     session_id = fields.Many2one(
         comodel_name='training.session',
         string='Training Session',
@@ -41,6 +53,7 @@ class TrainingEnrollment(models.Model):
         ('draft', 'Draft'),
         ('confirmed', 'Confirmed'),
         ('attended', 'Attended'),
+        ('no_show', 'No Show'),
         ('cancelled', 'Cancelled'),
     ], string='Status', default='draft', required=True, tracking=True, index=True)
     
@@ -69,6 +82,25 @@ class TrainingEnrollment(models.Model):
         related='session_id.end_date',
         store=True
     )
+    has_schedule_conflict = fields.Boolean(
+        string='Schedule Conflict',
+        compute='_compute_has_schedule_conflict',
+        help='The employee is confirmed in another session over overlapping dates'
+    )
+
+    def init(self):
+        super().init()
+        # Overlap lookups per employee: btree_gist lets one GiST index serve
+        # both the equality on the employee and the overlap (&&) of the
+        # booked periods, without scanning the employee's whole history.
+        # btree_gist is a trusted extension, the database owner can create it.
+        self._cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        self._cr.execute("DROP INDEX IF EXISTS training_enrollment_employee_period_idx")
+        create_index(
+            self._cr, 'training_enrollment_employee_period_gist_idx', self._table,
+            ['employee_id', "daterange(start_date, end_date, '[]')"], method='gist',
+            where="state IN ('confirmed', 'attended')"
+        )
 
     @api.depends('employee_id', 'session_id')
     def _compute_name(self):
@@ -78,6 +110,19 @@ class TrainingEnrollment(models.Model):
             else:
                 enrollment.name = 'New Enrollment'
 
+    # User changes are propagated in bulk by hr.employee, see
+    # _sync_training_owner, hence no dependency on employee_id.user_id.
+    @api.depends('employee_id')
+    def _compute_owner_user_id(self):
+        for enrollment in self:
+            enrollment.owner_user_id = enrollment.employee_id.user_id
+
+    @api.depends('employee_id', 'start_date', 'end_date', 'state')
+    def _compute_has_schedule_conflict(self):
+        conflicts = self.filtered('id')._get_schedule_conflicts()
+        for enrollment in self:
+            enrollment.has_schedule_conflict = enrollment.id in conflicts
+
     def _compute_access_url(self):
         """Compute portal access URL"""
         super()._compute_access_url()
@@ -110,35 +155,176 @@ class TrainingEnrollment(models.Model):
                         f"Cannot confirm enrollment. Session capacity ({enrollment.session_id.capacity}) has been reached."
                     )
 
+    @api.constrains('employee_id', 'session_id', 'state')
+    def _check_schedule_conflicts(self):
+        """Prevent an employee from being booked in overlapping sessions"""
+        booked = self.filtered(lambda e: e.state in ('confirmed', 'attended'))
+        for enrollment_id, other_id in booked._get_schedule_conflicts().items():
+            enrollment, other = self.browse(enrollment_id), self.browse(other_id)
+            raise exceptions.ValidationError(_(
+                '%(employee)s is already booked in "%(other)s", which overlaps "%(session)s".',
+                employee=enrollment.employee_id.name,
+                other=other.session_id.name,
+                session=enrollment.session_id.name,
+            ))
+
+    def _get_schedule_conflicts(self):
+        """Map enrollments to an overlapping booked enrollment of the same employee.
+
+        Booked enrollments are confirmed or attended, the lookup is served
+        by the partial ``training_enrollment_employee_period_gist_idx`` index.
+        Cancelled enrollments and no-shows never conflict.
+        """
+        if not self.ids:
+            return {}
+        self.flush_model(['employee_id', 'session_id', 'start_date', 'end_date', 'state'])
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (a.id) a.id, b.id
+              FROM training_enrollment a
+              JOIN training_enrollment b
+                ON b.employee_id = a.employee_id
+               AND b.state IN ('confirmed', 'attended')
+               AND daterange(b.start_date, b.end_date, '[]') && daterange(a.start_date, a.end_date, '[]')
+               AND b.session_id != a.session_id
+             WHERE a.id IN %s
+               AND a.state NOT IN ('cancelled', 'no_show')
+          ORDER BY a.id, b.start_date
+        """, [tuple(self.ids)])
+        return dict(self.env.cr.fetchall())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        enrollments = super().create(vals_list)
+        enrollments._notify_dashboard({})
+        return enrollments
+
+    def write(self, vals):
+        previous_states = {}
+        previous_sessions = self.env['training.session']
+        if 'state' in vals or 'session_id' in vals:
+            previous_states = {enrollment.id: enrollment.state for enrollment in self}
+            previous_sessions = self.session_id
+        res = super().write(vals)
+        if previous_states:
+            self._notify_dashboard(previous_states, previous_sessions)
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        # Deleted rows leave no trace the incremental KPI refresh could follow
+        self.env['training.department.kpi']._invalidate_kpis()
+        return res
+
+    def _notify_dashboard(self, previous_states, previous_sessions=None):
+        """Publish trend, statistics and seat deltas to the live dashboards"""
+        month_start = fields.Date.context_today(self).replace(day=1)
+        deltas = []
+        for enrollment in self:
+            previous_state = previous_states.get(enrollment.id)
+            if previous_state is None and enrollment.enrollment_date >= month_start:
+                deltas.append({'type': 'enrollment_created'})
+            if previous_state == enrollment.state:
+                continue
+            month = enrollment.enrollment_date.strftime('%b %Y')
+            if previous_state:
+                deltas.append({'type': 'enrollment', 'month': month, 'state': previous_state, 'delta': -1})
+            deltas.append({'type': 'enrollment', 'month': month, 'state': enrollment.state, 'delta': 1})
+        sessions = self.session_id | (previous_sessions or self.env['training.session'])
+        deltas += [{'type': 'seats', 'session_id': session.id} for session in sessions]
+        self.env['training.dashboard']._notify(deltas)
+
+    def _get_bulk_audit_parent(self):
+        return self.session_id
+
+    def _get_outbox_payload(self):
+        self.ensure_one()
+        return {
+            'id': self.id,
+            'reference': self.name,
+            'employee_id': self.employee_id.id,
+            'employee': self.employee_id.name,
+            'session_id': self.session_id.id,
+            'course_id': self.course_id.id,
+            'course': self.course_id.name,
+            'state': self.state,
+            'start_date': fields.Date.to_string(self.start_date),
+            'end_date': fields.Date.to_string(self.end_date),
+        }
+
     def action_confirm(self):
-        """Confirm enrollment"""
+        """Confirm enrollment
+
+        Enrollments overlapping another booked session of the employee, or
+        another enrollment of the same batch, are rejected. In bulk mode
+        they are left in draft and reported instead, the rest is confirmed.
+        """
+        conflicts = self._get_schedule_conflicts()
+        batch_periods = defaultdict(list)
         for enrollment in self:
+            if enrollment.id in conflicts:
+                continue
+            periods = batch_periods[enrollment.employee_id]
+            other = next((
+                other for other in periods
+                if other.start_date <= enrollment.end_date and other.end_date >= enrollment.start_date
+            ), None)
+            if other:
+                conflicts[enrollment.id] = other.id
+            else:
+                periods.append(enrollment)
+        conflicting = self.browse(list(conflicts))
+        if conflicting and not self._is_bulk_mode():
+            raise exceptions.UserError(_(
+                'Schedule conflict, the employees are already booked over these dates: %s',
+                ', '.join(conflicting.mapped('name'))
+            ))
+
+        confirmed = self - conflicting
+        for enrollment in confirmed:
             if enrollment.session_id.available_seats <= 0:
                 raise exceptions.UserError(
                     f"No available seats. Capacity: {enrollment.session_id.capacity}, "
                     f"Enrolled: {enrollment.session_id.enrolled_count}"
                 )
             enrollment.state = 'confirmed'
-            enrollment.message_post(
+            enrollment._training_message_post(
                 body=_("Enrollment confirmed for %s", enrollment.employee_id.name)
             )
+        self.env['training.outbox.event']._emit('enrollment.confirmed', confirmed)
+        if conflicting:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'type': 'warning',
+                    'sticky': True,
+                    'title': _('Schedule conflicts'),
+                    'message': _(
+                        '%(count)s enrollment(s) left in draft, the employees are already booked '
+                        'over these dates: %(names)s',
+                        count=len(conflicting),
+                        names=', '.join(conflicting.mapped('name')),
+                    ),
+                },
+            }
 
     def action_mark_attended(self):
         """Mark enrollment as attended and generate certificate if applicable"""
         for enrollment in self:
             enrollment.state = 'attended'
-            enrollment.message_post(
+            enrollment._training_message_post(
                 body=_("%s attended the training", enrollment.employee_id.name)
             )
             # Generate certificate if certification course
             if enrollment.course_id.is_certification:
                 enrollment._generate_certificate()
+        self.env['training.outbox.event']._emit('enrollment.attended', self)
 
     def action_cancel(self):
         """Cancel enrollment"""
         for enrollment in self:
             enrollment.state = 'cancelled'
-            enrollment.message_post(
+            enrollment._training_message_post(
                 body=_("Enrollment cancelled for %s", enrollment.employee_id.name)
             )
 
@@ -146,6 +332,78 @@ class TrainingEnrollment(models.Model):
         """Reset to draft"""
         self.write({'state': 'draft'})
 
+    def _reenroll(self, next_sessions):
+        """Create draft enrollments of the employees in the next sessions.
+
+        :param next_sessions: dict ``{course: session}``
+        """
+        targets = [
+            (enrollment.employee_id, next_sessions[enrollment.course_id])
+            for enrollment in self if enrollment.course_id in next_sessions
+        ]
+        if not targets:
+            return self.browse()
+        existing = set(self._read_group([
+            ('employee_id', 'in', [employee.id for employee, __ in targets]),
+            ('session_id', 'in', [session.id for __, session in targets]),
+            ('state', '!=', 'cancelled'),
+        ], ['employee_id', 'session_id']))
+        vals_list = [{
+            'employee_id': employee.id,
+            'session_id': session.id,
+        } for employee, session in dict.fromkeys(targets) if (employee, session) not in existing]
+        return self.bulk_create(vals_list)
+
+    def _send_cancellation_notices(self, next_sessions, reenrolled):
+        """Queue one notification per employee for their cancelled enrollments.
+
+        :param next_sessions: dict ``{course: session}`` offered instead
+        :param reenrolled: draft enrollments created in the next sessions
+        """
+        reenrolled_keys = {(enrollment.employee_id, enrollment.session_id) for enrollment in reenrolled}
+        notices = defaultdict(list)
+        for enrollment in self:
+            next_session = next_sessions.get(enrollment.course_id)
+            notices[enrollment.employee_id].append({
+                'session': enrollment.session_id.name,
+                'start_date': format_date(self.env, enrollment.start_date),
+                'next_session': next_session.name if next_session else False,
+                'next_start_date': format_date(self.env, next_session.start_date) if next_session else False,
+                'reenrolled': (enrollment.employee_id, next_session) in reenrolled_keys,
+            })
+        for employee, lines in notices.items():
+            partner = employee.user_id.partner_id or employee.work_contact_id
+            if not partner:
+                continue
+            body = self.env['ir.qweb']._render('employee_training.session_cancellation_notice', {
+                'lines': lines,
+            })
+            self.env['mail.thread'].message_notify(
+                partner_ids=partner.ids,
+                subject=_('Training Sessions Cancelled'),
+                body=body,
+                email_layout_xmlid='mail.mail_notification_light',
+                force_send=False,
+            )
+
+    def _issue_certificates(self):
+        """Issue the missing certificates of attended enrollments in bulk"""
+        candidates = self.filtered(lambda e: e.state == 'attended' and e.course_id.is_certification)
+        if not candidates:
+            return self.env['training.certificate']
+        Certificate = self.env['training.certificate']
+        existing = {
+            enrollment.id for [enrollment] in Certificate._read_group(
+                [('enrollment_id', 'in', candidates.ids)], ['enrollment_id']
+            )
+        }
+        certificates = Certificate.bulk_create([{
+            'employee_id': enrollment.employee_id.id,
+            'course_id': enrollment.course_id.id,
+            'enrollment_id': enrollment.id,
+        } for enrollment in candidates if enrollment.id not in existing])
+        return certificates
+
     def _generate_certificate(self):
         """Generate certificate for attended enrollment (if certification course)"""
         self.ensure_one()
@@ -163,7 +421,7 @@ class TrainingEnrollment(models.Model):
                     'course_id': self.course_id.id,
                     'enrollment_id': self.id,
                 })
-                self.message_post(
+                self._training_message_post(
                     body=_("Certificate %s generated", cert.name)
                 )
                 return cert
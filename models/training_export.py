@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+
+import json
+from urllib.parse import urlencode
+from odoo import models
+
+
+class TrainingExportMixin(models.AbstractModel):
+    _name = 'training.export.mixin'
+    _description = 'Training Streaming CSV Export'
+
+    def action_stream_export(self):
+        """Download the selected records through the streaming CSV export.
+
+        A whole-domain selection is exported from its domain rather than from
+        the id list, which keeps the URL short for large selections.
+        """
+        active_domain = self.env.context.get('active_domain')
+        if active_domain is not None and self.search_count(active_domain) == len(self):
+            domain = active_domain
+        else:
+            domain = [('id', 'in', self.ids)]
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/training/export/%s?%s' % (self._name, urlencode({'domain': json.dumps(domain)})),
+            'target': 'self',
+        }
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+
+from odoo import models, fields, api, exceptions, _
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+OUTBOX_EVENT_TYPES = [
+    ('enrollment.confirmed', 'Enrollment Confirmed'),
+    ('enrollment.attended', 'Enrollment Attended'),
+    ('certificate.issued', 'Certificate Issued'),
+    ('certificate.state_changed', 'Certificate Status Changed'),
+]
+MAX_DELIVERY_ATTEMPTS = 8
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 24 * 3600
+MAX_BATCHES_PER_RUN = 50
+SENT_RETENTION_DAYS = 7
+
+
+class TrainingWebhook(models.Model):
+    _name = 'training.webhook'
+    _description = 'Training Webhook'
+    _order = 'name'
+
+    name = fields.Char(
+        string='Name',
+        required=True
+    )
+    url = fields.Char(
+        string='URL',
+        required=True
+    )
+    active = fields.Boolean(
+        string='Active',
+        default=True
+    )
+    event_types = fields.Char(
+        string='Events',
+        help='Comma separated event types to deliver, e.g. "certificate.issued,'
+             'certificate.state_changed". Leave empty to receive every event.'
+    )
+    secret = fields.Char(
+        string='Signing Secret',
+        groups='base.group_system',
+        help='When set, batches are signed with HMAC-SHA256 in the X-Training-Signature header'
+    )
+    batch_size = fields.Integer(
+        string='Batch Size',
+        default=100,
+        required=True
+    )
+    timeout = fields.Integer(
+        string='Timeout (Seconds)',
+        default=10,
+        required=True
+    )
+    delivery_ids = fields.One2many(
+        comodel_name='training.outbox.delivery',
+        inverse_name='webhook_id',
+        string='Deliveries'
+    )
+
+    @api.constrains('url')
+    def _check_url(self):
+        for webhook in self:
+            url = urlsplit(webhook.url or '')
+            if url.scheme not in ('http', 'https') or not url.hostname:
+                raise exceptions.ValidationError(_('The webhook URL must be an http(s) URL with a host.'))
+
+    def _accepts(self, event_type):
+        self.ensure_one()
+        if not self.event_types:
+            return True
+        return event_type in {event.strip() for event in self.event_types.split(',')}
+
+    def _post_batch(self, events):
+        """POST one batch of events, raise on any non-2xx answer"""
+        self.ensure_one()
+        body = json.dumps({'events': events}, default=str)
+        headers = {'Content-Type': 'application/json'}
+        secret = self.sudo().secret
+        if secret:
+            headers['X-Training-Signature'] = hmac.new(
+                secret.encode(), body.encode(), hashlib.sha256
+            ).hexdigest()
+        response = requests.post(self.url, data=body, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+
+    def action_deliver_now(self):
+        # Run the delivery cron, which commits batch by batch, rather than
+        # holding the row locks of the request across HTTP calls
+        self.env.ref('employee_training.ir_cron_deliver_outbox')._trigger()
+        return True
+
+
+class TrainingOutboxEvent(models.Model):
+    _name = 'training.outbox.event'
+    _description = 'Training Outbox Event'
+    _order = 'id'
+
+    event_type = fields.Selection(
+        selection=OUTBOX_EVENT_TYPES,
+        string='Event',
+        required=True,
+        readonly=True
+    )
+    aggregate_key = fields.Char(
+        string='Aggregate',
+        required=True,
+        readonly=True,
+        help='Record the event is about; events of one aggregate are delivered in order'
+    )
+    payload = fields.Json(
+        string='Payload',
+        readonly=True
+    )
+
+    @api.model
+    def _emit(self, event_type, records, extra=None):
+        """Write events for the records in the current transaction.
+
+        One delivery is queued per event and subscribed webhook, nothing is
+        written when no webhook listens to the event type.
+
+        :param extra: optional dict ``{record_id: dict}`` merged in the payloads
+        """
+        if not records:
+            return self
+        webhooks = self.env['training.webhook'].sudo().search([]).filtered(
+            lambda webhook: webhook._accepts(event_type)
+        )
+        if not webhooks:
+            return self
+        extra = extra or {}
+        events = self.sudo().create([{
+            'event_type': event_type,
+            'aggregate_key': '%s,%s' % (record._name, record.id),
+            'payload': dict(record._get_outbox_payload(), **extra.get(record.id, {})),
+        } for record in records])
+        now = fields.Datetime.now()
+        self.env['training.outbox.delivery'].sudo().create([{
+            'event_id': event.id,
+            'webhook_id': webhook.id,
+            'aggregate_key': event.aggregate_key,
+            'next_attempt': now,
+        } for event in events for webhook in webhooks])
+        cron = self.env.ref('employee_training.ir_cron_deliver_outbox', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return events
+
+
+class TrainingOutboxDelivery(models.Model):
+    _name = 'training.outbox.delivery'
+    _description = 'Training Outbox Delivery'
+    _order = 'id'
+
+    event_id = fields.Many2one(
+        comodel_name='training.outbox.event',
+        string='Event',
+        required=True,
+        ondelete='cascade',
+        readonly=True
+    )
+    event_type = fields.Selection(
+        related='event_id.event_type'
+    )
+    webhook_id = fields.Many2one(
+        comodel_name='training.webhook',
+        string='Webhook',
+        required=True,
+        ondelete='cascade',
+        readonly=True,
+        index=True
+    )
+    aggregate_key = fields.Char(
+        string='Aggregate',
+        required=True,
+        readonly=True
+    )
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, readonly=True, index=True)
+    attempts = fields.Integer(
+        string='Attempts',
+        readonly=True
+    )
+    next_attempt = fields.Datetime(
+        string='Next Attempt',
+        readonly=True
+    )
+    sent_date = fields.Datetime(
+        string='Sent On',
+        readonly=True
+    )
+    last_error = fields.Text(
+        string='Last Error',
+        readonly=True
+    )
+
+    _sql_constraints = [
+        ('event_webhook_unique', 'UNIQUE(event_id, webhook_id)',
+         'An event is queued only once per webhook.'),
+    ]
+
+    def init(self):
+        create_index(
+            self._cr, 'training_outbox_delivery_pending_idx', self._table,
+            ['webhook_id', 'aggregate_key', 'id'], where="state = 'pending'"
+        )
+
+    @api.model
+    def _fetch_batch(self, webhook):
+        """Lock the next batch of due deliveries of a webhook.
+
+        A delivery is held back while an earlier delivery of the same
+        aggregate is waiting for a retry, which keeps per-aggregate order.
+        Locked rows are skipped so that concurrent workers never send the
+        same delivery twice.
+        """
+        self.env['training.outbox.event'].flush_model()
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT d.id
+              FROM training_outbox_delivery d
+             WHERE d.webhook_id = %(webhook_id)s
+               AND d.state = 'pending'
+               AND d.next_attempt <= %(now)s
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM training_outbox_delivery p
+                     WHERE p.webhook_id = d.webhook_id
+                       AND p.aggregate_key = d.aggregate_key
+                       AND p.state = 'pending'
+                       AND p.id < d.id
+                       AND p.next_attempt > %(now)s
+               )
+          ORDER BY d.id
+             LIMIT %(limit)s
+               FOR UPDATE SKIP LOCKED
+        """, {
+            'webhook_id': webhook.id,
+            'now': fields.Datetime.now(),
+            'limit': webhook.batch_size,
+        })
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _deliver_pending(self, webhooks=None, auto_commit=False):
+        """Send due deliveries in batches, one POST per batch and webhook.
+
+        :param auto_commit: commit after each batch, which releases the row
+            locks and records the result of the POST before the next one
+        """
+        webhooks = webhooks or self.env['training.webhook'].search([])
+        for webhook in webhooks:
+            for __ in range(MAX_BATCHES_PER_RUN):
+                deliveries = self._fetch_batch(webhook)
+                if not deliveries:
+                    break
+                events = [{
+                    'id': delivery.event_id.id,
+                    'type': delivery.event_id.event_type,
+                    'aggregate': delivery.aggregate_key,
+                    'created': delivery.event_id.create_date,
+                    'payload': delivery.event_id.payload,
+                } for delivery in deliveries]
+                try:
+                    webhook._post_batch(events)
+                except requests.exceptions.RequestException as error:
+                    _logger.warning('Webhook %s delivery failed: %s', webhook.name, error)
+                    deliveries._schedule_retry(str(error))
+                    if auto_commit:
+                        self.env.cr.commit()
+                    break
+                self.env.cr.execute("""
+                    UPDATE training_outbox_delivery
+                       SET state = 'sent',
+                           attempts = attempts + 1,
+                           sent_date = %s,
+                           last_error = NULL,
+                           write_uid = %s,
+                           write_date = (now() at time zone 'UTC')
+                     WHERE id IN %s
+                """, (fields.Datetime.now(), self.env.uid, tuple(deliveries.ids)))
+                deliveries.invalidate_recordset()
+                if auto_commit:
+                    self.env.cr.commit()
+        return True
+
+    def _schedule_retry(self, error):
+        """Exponential backoff, the delivery fails for good after the last attempt"""
+        self.env.cr.execute("""
+            UPDATE training_outbox_delivery
+               SET attempts = attempts + 1,
+                   last_error = %(error)s,
+                   state = CASE WHEN attempts + 1 >= %(max)s THEN 'failed' ELSE 'pending' END,
+                   next_attempt = %(now)s + LEAST(%(base)s * power(2, attempts), %(cap)s) * interval '1 second',
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE id IN %(ids)s
+        """, {
+            'error': error,
+            'max': MAX_DELIVERY_ATTEMPTS,
+            'now': fields.Datetime.now(),
+            'base': BACKOFF_BASE_SECONDS,
+            'cap': BACKOFF_MAX_SECONDS,
+            'uid': self.env.uid,
+            'ids': tuple(self.ids),
+        })
+        self.invalidate_recordset()
+
+    @api.model
+    def _cron_deliver_outbox(self):
+        """Cron job delivering the outbox and purging old sent events"""
+        self._deliver_pending(auto_commit=not getattr(threading.current_thread(), 'testing', False))
+        self.env.cr.execute("""
+            DELETE FROM training_outbox_delivery
+             WHERE state = 'sent' AND sent_date < %s
+        """, [fields.Datetime.now() - timedelta(days=SENT_RETENTION_DAYS)])
+        self.env.cr.execute("""
+            DELETE FROM training_outbox_event e
+             WHERE e.create_date < %s
+               AND NOT EXISTS (SELECT 1 FROM training_outbox_delivery d WHERE d.event_id = e.id)
+        """, [fields.Datetime.now() - timedelta(days=SENT_RETENTION_DAYS)])
+        return True
+
+    def action_retry(self):
+        """Requeue failed deliveries"""
+        self.filtered(lambda delivery: delivery.state == 'failed').write({
+            'state': 'pending',
+            'attempts': 0,
+            'next_attempt': fields.Datetime.now(),
+        })
+        return True
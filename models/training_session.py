@@ -1,12 +1,34 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, exceptions
-from datetime import datetime
+import logging
+import time
+from collections import Counter, defaultdict
+from odoo import models, fields, api, exceptions, tools, _
+from odoo.tools import split_every
+from odoo.tools.sql import create_index
+from datetime import datetime, timedelta
+
+_logger = logging.getLogger(__name__)
+
+SESSION_STATE_CHUNK = 5000
+
+# Dashboard sections, each fetched with its own call
+DASHBOARD_SECTIONS = (
+    'statistics',
+    'upcoming_sessions',
+    'expiring_certificates',
+    'top_courses',
+    'enrollments_per_month',
+    'expiry_forecast',
+)
+# Seconds a computed section is reused for the same user and filters
+DEFAULT_DASHBOARD_CACHE_TTL = 60
+
 
 class TrainingSession(models.Model):
     _name = 'training.session'
     _description = 'Training Session'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'training.bulk.mixin', 'training.change.feed.mixin']
     _order = 'start_date desc'
 
     name = fields.Char(
@@ -43,6 +65,11 @@ class TrainingSession(models.Model):
         string='Location',
         help='Physical or virtual location of the training'
     )
+    is_online = fields.Boolean(
+        string='Online',
+        default=False,
+        help='Online sessions do not book a room, their location is not checked for double bookings'
+    )
     capacity = fields.Integer(
         string='Capacity',
         default=20,
@@ -118,6 +145,103 @@ class TrainingSession(models.Model):
                     'Capacity must be at least 1.'
                 )
 
+    def init(self):
+        super().init()
+        # GiST indexes on the booked period, for overlap (&&) lookups
+        create_index(
+            self._cr, 'training_session_instructor_period_idx', self._table,
+            ["daterange(start_date, end_date, '[]')"], method='gist',
+            where="state != 'cancelled' AND instructor_id IS NOT NULL"
+        )
+        create_index(
+            self._cr, 'training_session_open_period_idx', self._table,
+            ['start_date', 'end_date'], where="state IN ('scheduled', 'ongoing')"
+        )
+        create_index(
+            self._cr, 'training_session_room_period_idx', self._table,
+            ["daterange(start_date, end_date, '[]')"], method='gist',
+            where="state != 'cancelled' AND NOT is_online AND location IS NOT NULL"
+        )
+
+    @api.model
+    def _get_booking_conflicts_query(self, session_ids=None):
+        """SQL listing overlapping sessions sharing an instructor or a room.
+
+        Each row is ``(session_id, conflicting_session_id, conflict_type)``.
+        Without ``session_ids`` every conflicting pair of the calendar is
+        listed once, otherwise the conflicts of the given sessions.
+        """
+        if session_ids is None:
+            scope = "a.id < b.id"
+        else:
+            scope = "a.id != b.id AND a.id IN %(session_ids)s"
+        return """
+            SELECT a.id, b.id, 'instructor'
+              FROM training_session a
+              JOIN training_session b
+                ON b.instructor_id = a.instructor_id
+               AND daterange(b.start_date, b.end_date, '[]') && daterange(a.start_date, a.end_date, '[]')
+               AND b.state != 'cancelled' AND b.instructor_id IS NOT NULL
+             WHERE a.state != 'cancelled' AND a.instructor_id IS NOT NULL
+               AND {scope}
+         UNION ALL
+            SELECT a.id, b.id, 'room'
+              FROM training_session a
+              JOIN training_session b
+                ON lower(btrim(b.location)) = lower(btrim(a.location))
+               AND daterange(b.start_date, b.end_date, '[]') && daterange(a.start_date, a.end_date, '[]')
+               AND b.state != 'cancelled' AND NOT b.is_online AND b.location IS NOT NULL
+             WHERE a.state != 'cancelled' AND NOT a.is_online AND a.location IS NOT NULL
+               AND btrim(a.location) != ''
+               AND {scope}
+        """.format(scope=scope)
+
+    @api.constrains('instructor_id', 'location', 'is_online', 'start_date', 'end_date', 'state')
+    def _check_booking_conflicts(self):
+        """Prevent instructor and room double bookings"""
+        self.flush_model(['instructor_id', 'location', 'is_online', 'start_date', 'end_date', 'state'])
+        self.env.cr.execute(
+            self._get_booking_conflicts_query(self.ids) + " LIMIT 1",
+            {'session_ids': tuple(self.ids)}
+        )
+        conflict = self.env.cr.fetchone()
+        if conflict:
+            session, other = self.browse(conflict[0]), self.browse(conflict[1])
+            if conflict[2] == 'instructor':
+                raise exceptions.ValidationError(_(
+                    '%(instructor)s is already teaching "%(other)s" during "%(session)s".',
+                    instructor=session.instructor_id.name, other=other.name, session=session.name,
+                ))
+            raise exceptions.ValidationError(_(
+                '%(location)s is already booked for "%(other)s" during "%(session)s".',
+                location=session.location, other=other.name, session=session.name,
+            ))
+
+    def _get_bulk_audit_parent(self):
+        return self.course_id
+
+    def write(self, vals):
+        previous_states = {}
+        if 'state' in vals:
+            previous_states = {session.id: session.state for session in self}
+        res = super().write(vals)
+        if 'start_date' in vals or 'end_date' in vals:
+            self.enrollment_ids._check_schedule_conflicts()
+        if previous_states or 'capacity' in vals:
+            self._notify_dashboard(previous_states)
+        return res
+
+    def _notify_dashboard(self, previous_states):
+        """Publish seat and status deltas to the live dashboards"""
+        deltas = [{'type': 'seats', 'session_id': session.id} for session in self]
+        deltas += [{
+            'type': 'session',
+            'id': session.id,
+            'previous_state': previous_states[session.id],
+            'state': session.state,
+        } for session in self if session.id in previous_states]
+        self.env['training.dashboard']._notify(deltas)
+
     def action_confirm_schedule(self):
         """Confirm the session schedule"""
         self.write({'state': 'scheduled'})
@@ -130,9 +254,257 @@ class TrainingSession(models.Model):
         """Complete the session"""
         self.write({'state': 'completed'})
 
-    def action_cancel_session(self):
-        """Cancel the session"""
+    def action_cancel_session(self, reenroll=False):
+        """Cancel the sessions and their open enrollments.
+
+        Draft and confirmed enrollments are cancelled with a single UPDATE
+        and every affected employee gets one notification for all of the
+        cancelled sessions, with the next session of the same course.
+
+        :param reenroll: also create draft enrollments in those next sessions
+        """
+        if not self:
+            return True
+        # The enrollments are cancelled with SQL, which bypasses access rights
+        self.check_access('write')
+        self.enrollment_ids.check_access('write')
+        Enrollment = self.env['training.enrollment']
+        Enrollment.flush_model(['session_id', 'state'])
+        self.env.cr.execute("""
+            UPDATE training_enrollment e
+               SET state = 'cancelled',
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM training_enrollment p
+             WHERE p.id = e.id
+               AND e.session_id IN %(ids)s
+               AND e.state IN ('draft', 'confirmed')
+         RETURNING e.id, p.state
+        """, {'uid': self.env.uid, 'ids': tuple(self.ids)})
+        previous_states = dict(self.env.cr.fetchall())
+        enrollments = Enrollment.browse(list(previous_states))
+        enrollments.invalidate_recordset(['state', 'write_uid', 'write_date'])
+        enrollments.modified(['state'])
         self.write({'state': 'cancelled'})
+        if not enrollments:
+            return True
+
+        enrollments._notify_dashboard(previous_states)
+        enrollments._post_bulk_audit(_('cancellation'))
+        next_sessions = self._get_next_sessions()
+        reenrolled = Enrollment
+        if reenroll:
+            reenrolled = enrollments._reenroll(next_sessions)
+        enrollments._send_cancellation_notices(next_sessions, reenrolled)
+        return True
+
+    def action_cancel_and_reenroll(self):
+        """Cancel the sessions and pre-enroll their employees in the next sessions"""
+        return self.action_cancel_session(reenroll=True)
+
+    def _get_next_sessions(self):
+        """Next open session with seats left of each course, by course"""
+        next_sessions = {}
+        for session in self.search([
+            ('course_id', 'in', self.course_id.ids),
+            ('id', 'not in', self.ids),
+            ('state', 'in', ['draft', 'scheduled']),
+            ('start_date', '>=', fields.Date.context_today(self)),
+            ('available_seats', '>', 0),
+        ], order='start_date, id'):
+            next_sessions.setdefault(session.course_id, session)
+        return next_sessions
+
+    def _sql_update_session_states(self, session_ids, today):
+        """Move sessions to ongoing or completed from their dates.
+
+        The state is updated with one statement per chunk; the transitions
+        are stamped in write_date, published to the dashboards and logged as
+        one summary per course, like a bulk run of the workflow buttons.
+        """
+        self.env.cr.execute("""
+            UPDATE training_session s
+               SET state = CASE WHEN s.end_date < %(today)s THEN 'completed' ELSE 'ongoing' END,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM training_session p
+             WHERE p.id = s.id
+               AND s.id IN %(ids)s
+               AND ((s.state = 'scheduled' AND s.start_date <= %(today)s)
+                    OR (s.state = 'ongoing' AND s.end_date < %(today)s))
+         RETURNING s.id, p.state, s.state
+        """, {'today': today, 'uid': self.env.uid, 'ids': tuple(session_ids)})
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return
+        changed = self.browse([row[0] for row in rows])
+        changed.invalidate_recordset(['state', 'write_uid', 'write_date'])
+        changed._notify_dashboard({session_id: previous_state for session_id, previous_state, __ in rows})
+        started = self.browse([session_id for session_id, __, state in rows if state == 'ongoing'])
+        completed = changed - started
+        if started:
+            started._post_bulk_audit(_('automatic start'))
+        if completed:
+            completed._post_bulk_audit(_('automatic completion'))
+
+    @api.model
+    def _cron_update_session_states(self):
+        """Cron job moving scheduled sessions to ongoing and completed as days pass"""
+        self.flush_model()
+        today = fields.Date.context_today(self)
+        self.env.cr.execute("""
+            SELECT id
+              FROM training_session
+             WHERE (state = 'scheduled' AND start_date <= %(today)s)
+                OR (state = 'ongoing' AND end_date < %(today)s)
+          ORDER BY id
+        """, {'today': today})
+        session_ids = [row[0] for row in self.env.cr.fetchall()]
+        for chunk in split_every(SESSION_STATE_CHUNK, session_ids):
+            self._sql_update_session_states(chunk, today)
+        return True
+
+    def action_open_close_out(self):
+        """Open the close-out wizard of the session"""
+        self.ensure_one()
+        action = self.env['ir.actions.act_window']._for_xml_id(
+            'employee_training.action_training_session_close_out'
+        )
+        action['context'] = {'active_id': self.id, 'active_model': self._name}
+        return action
+
+    def action_close_out(self, attendee_enrollment_ids=None):
+        """Close out sessions: attendance, no-shows and certificates at once.
+
+        Confirmed enrollments of the attendees, or all of them when no list
+        is given, are marked attended and the other confirmed ones no-show;
+        draft enrollments are cancelled. Enrollments of every session are
+        moved with a single UPDATE, certificates are issued with one bulk
+        create and the sessions are completed, so the number of queries
+        does not grow with the size of the sessions.
+
+        :param attendee_enrollment_ids: ids of the attended enrollments
+        """
+        if not self:
+            return True
+        # The enrollments are updated with SQL, which bypasses access rights
+        self.check_access('write')
+        self.enrollment_ids.check_access('write')
+        today = fields.Date.context_today(self)
+        invalid = self.filtered(lambda s: s.state in ('draft', 'cancelled') or s.start_date > today)
+        if invalid:
+            raise exceptions.UserError(_(
+                'Only scheduled, ongoing or completed sessions that have started can be closed out: %s',
+                ', '.join(invalid.mapped('name'))
+            ))
+
+        Enrollment = self.env['training.enrollment']
+        Enrollment.flush_model(['session_id', 'state'])
+        self.env.cr.execute("""
+            UPDATE training_enrollment e
+               SET state = CASE
+                       WHEN e.state = 'draft' THEN 'cancelled'
+                       WHEN %(all)s OR e.id = ANY(%(attendees)s) THEN 'attended'
+                       ELSE 'no_show'
+                   END,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM training_enrollment p
+             WHERE p.id = e.id
+               AND e.session_id IN %(ids)s
+               AND e.state IN ('draft', 'confirmed')
+         RETURNING e.id, p.state, e.state
+        """, {
+            'all': attendee_enrollment_ids is None,
+            'attendees': list(attendee_enrollment_ids or []),
+            'uid': self.env.uid,
+            'ids': tuple(self.ids),
+        })
+        rows = self.env.cr.fetchall()
+        enrollments = Enrollment.browse([row[0] for row in rows])
+        enrollments.invalidate_recordset(['state', 'write_uid', 'write_date'])
+        enrollments.modified(['state'])
+        attended = Enrollment.browse([enrollment_id for enrollment_id, __, state in rows if state == 'attended'])
+
+        if rows:
+            enrollments._notify_dashboard({enrollment_id: previous for enrollment_id, previous, __ in rows})
+            self.env['training.outbox.event']._emit('enrollment.attended', attended)
+            enrollments._post_bulk_audit(_('close-out'))
+        attended._issue_certificates()
+        self.filtered(lambda s: s.state != 'completed').write({'state': 'completed'})
+        return True
+
+    def action_reschedule(self, days):
+        """Shift sessions by a number of days in bulk.
+
+        Session and enrollment dates are moved with set-based SQL updates
+        instead of per-row ORM writes on the stored related dates, and a
+        single summary message is logged per session.
+        """
+        if not self or not days:
+            return True
+        # Dates are shifted with SQL, which bypasses access rights
+        self.check_access('write')
+        self.enrollment_ids.check_access('write')
+        locked = self.filtered(lambda s: s.state in ('completed', 'cancelled'))
+        if locked:
+            raise exceptions.UserError(_(
+                'Completed or cancelled sessions cannot be rescheduled: %s',
+                ', '.join(locked.mapped('name'))
+            ))
+
+        self.flush_model()
+        self.env['training.enrollment'].flush_model(['start_date', 'end_date'])
+        previous_dates = {
+            session.id: (session.start_date, session.end_date) for session in self
+        }
+        params = {'days': days, 'uid': self.env.uid, 'ids': tuple(self.ids)}
+
+        self.env.cr.execute("""
+            UPDATE training_session s
+               SET start_date = s.start_date + %(days)s,
+                   end_date = s.end_date + %(days)s,
+                   name = c.name || ' - ' || (s.start_date + %(days)s)::text,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM training_course c
+             WHERE c.id = s.course_id
+               AND s.id IN %(ids)s
+        """, params)
+        self.env.cr.execute("""
+            UPDATE training_enrollment e
+               SET start_date = s.start_date,
+                   end_date = s.end_date,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM training_session s
+             WHERE s.id = e.session_id
+               AND e.session_id IN %(ids)s
+         RETURNING e.session_id
+        """, params)
+        enrollment_counts = Counter(row[0] for row in self.env.cr.fetchall())
+
+        self.invalidate_recordset(['start_date', 'end_date', 'name', 'write_uid', 'write_date'])
+        self.env['training.enrollment'].invalidate_model(
+            ['start_date', 'end_date', 'write_uid', 'write_date']
+        )
+        self._check_dates()
+        self._check_booking_conflicts()
+        self.enrollment_ids._check_schedule_conflicts()
+
+        for session in self:
+            old_start, old_end = previous_dates[session.id]
+            session._training_message_post(body=_(
+                'Session rescheduled by %(days)s day(s): %(old_start)s - %(old_end)s '
+                'moved to %(start)s - %(end)s (%(count)s enrollment(s) updated).',
+                days=days,
+                old_start=old_start,
+                old_end=old_end,
+                start=session.start_date,
+                end=session.end_date,
+                count=enrollment_counts.get(session.id, 0),
+            ))
+        return True
 
     def action_view_enrollments(self):
         """Smart button action to view session enrollments"""
@@ -147,21 +519,125 @@ class TrainingSession(models.Model):
         }
 
     @api.model
-    def get_dashboard_data(self):
-        """Get all dashboard data for OWL component"""
-        from datetime import datetime, timedelta
-        from collections import defaultdict
-        
-        today = datetime.now().date()
-        
-        # Upcoming sessions
-        sessions = self.search([
-            ('start_date', '>=', today),
+    def get_dashboard_data(self, filters=None):
+        """Get all dashboard data for OWL component in one call"""
+        return {section: self.get_dashboard_section(section, filters) for section in DASHBOARD_SECTIONS}
+
+    @api.model
+    def get_dashboard_section(self, section, filters=None):
+        """Get the data of one dashboard section.
+
+        Sections are fetched independently so that cheap cards are not held
+        back by the heavier charts. Results are cached for a short time per
+        user and filter combination.
+
+        :param filters: optional dict with ``company_ids``, ``department_ids``
+            (sub-departments included), ``course_ids``, ``date_from`` and
+            ``date_to``; the date range applies to enrollment dates
+        """
+        if section not in DASHBOARD_SECTIONS:
+            raise exceptions.UserError(_('Unknown dashboard section: %s', section))
+        filters = self._get_dashboard_filters(filters)
+        ttl = int(self.env['ir.config_parameter'].sudo().get_param(
+            'employee_training.dashboard_cache_ttl', DEFAULT_DASHBOARD_CACHE_TTL
+        ))
+        start = time.perf_counter()
+        if ttl > 0:
+            data = self._get_dashboard_section_cached(section, filters, int(time.time() // ttl))
+        else:
+            data = self._compute_dashboard_section(section, filters)
+        _logger.debug('Dashboard section %s computed in %.3fs', section, time.perf_counter() - start)
+        return data
+
+    @api.model
+    @tools.ormcache('self.env.uid', 'section', 'filters', 'time_bucket')
+    def _get_dashboard_section_cached(self, section, filters, time_bucket):
+        return self._compute_dashboard_section(section, filters)
+
+    @api.model
+    def _compute_dashboard_section(self, section, filters):
+        return getattr(self, '_get_dashboard_%s' % section)(dict(filters))
+
+    @api.model
+    def _get_dashboard_filters(self, filters):
+        """Validate the filters into a hashable, cache friendly tuple"""
+        filters = filters or {}
+        try:
+            company_ids = set(self.env.companies.ids)
+            if filters.get('company_ids'):
+                company_ids &= {int(company_id) for company_id in filters['company_ids']}
+            department_ids = ()
+            if filters.get('department_ids'):
+                department_ids = tuple(sorted(self.env['hr.department'].search([
+                    ('id', 'child_of', [int(department_id) for department_id in filters['department_ids']]),
+                ]).ids)) or (0,)
+            course_ids = tuple(sorted(int(course_id) for course_id in filters.get('course_ids') or ()))
+            date_from = fields.Date.to_date(filters.get('date_from') or False)
+            date_to = fields.Date.to_date(filters.get('date_to') or False)
+        except (TypeError, ValueError):
+            raise exceptions.UserError(_('Invalid dashboard filters.'))
+        return (
+            ('company_ids', tuple(sorted(company_ids)) or (0,)),
+            ('course_ids', course_ids),
+            ('date_from', date_from),
+            ('date_to', date_to),
+            ('department_ids', department_ids),
+        )
+
+    @api.model
+    def _get_dashboard_domain(self, model_name, filters, dated=True):
+        """Domain of a training model restricted to the dashboard filters"""
+        domain = [('company_id', 'in', list(filters['company_ids']) + [False])]
+        if filters['course_ids']:
+            domain.append(('course_id', 'in', filters['course_ids']))
+        if model_name == 'training.session':
+            return domain
+        if filters['department_ids']:
+            domain.append(('employee_id.department_id', 'in', filters['department_ids']))
+        if dated and model_name == 'training.enrollment':
+            if filters['date_from']:
+                domain.append(('enrollment_date', '>=', filters['date_from']))
+            if filters['date_to']:
+                domain.append(('enrollment_date', '<=', filters['date_to']))
+        return domain
+
+    @api.model
+    def _get_dashboard_statistics(self, filters):
+        today = fields.Date.context_today(self)
+        Enrollment = self.env['training.enrollment']
+        enrollment_domain = self._get_dashboard_domain('training.enrollment', filters)
+        state_counts = dict(Enrollment._read_group(
+            enrollment_domain + [('state', 'in', ['confirmed', 'attended'])], ['state'], ['__count']
+        ))
+        total_confirmed = sum(state_counts.values())
+        attended = state_counts.get('attended', 0)
+        return {
+            'total_active_sessions': self.search_count(
+                self._get_dashboard_domain('training.session', filters)
+                + [('state', 'in', ['scheduled', 'ongoing'])]
+            ),
+            'total_enrollments_this_month': Enrollment.search_count(
+                self._get_dashboard_domain('training.enrollment', filters, dated=False)
+                + [('enrollment_date', '>=', today.replace(day=1))]
+            ),
+            'certificates_expiring_soon': self.env['training.certificate'].search_count(
+                self._get_dashboard_domain('training.certificate', filters)
+                + [('state', '=', 'expiring_soon')]
+            ),
+            'completion_rate': round((attended / total_confirmed) * 100, 1) if total_confirmed > 0 else 0,
+            # Raw counts let live updates recompute the completion rate
+            'enrollments_confirmed': total_confirmed,
+            'enrollments_attended': attended,
+        }
+
+    @api.model
+    def _get_dashboard_upcoming_sessions(self, filters):
+        sessions = self.search(self._get_dashboard_domain('training.session', filters) + [
+            ('start_date', '>=', fields.Date.context_today(self)),
             ('state', 'in', ['draft', 'scheduled']),
             ('available_seats', '>', 0),
         ], order='start_date asc', limit=10)
-        
-        upcoming_sessions = [{
+        return [{
             'id': session.id,
             'name': session.name,
             'course_name': session.course_id.name,
@@ -172,18 +648,17 @@ class TrainingSession(models.Model):
             'capacity': session.capacity,
             'instructor': session.instructor_id.name if session.instructor_id else 'TBD',
         } for session in sessions]
-        
-        # Expiring certificates
-        Certificate = self.env['training.certificate']
-        expiry_threshold = today + timedelta(days=30)
-        
-        certificates = Certificate.search([
-            ('expiry_date', '<=', expiry_threshold),
-            ('expiry_date', '>=', today),
-            ('state', '=', 'expiring_soon'),
-        ], order='expiry_date asc', limit=10)
-        
-        expiring_certificates = [{
+
+    @api.model
+    def _get_dashboard_expiring_certificates(self, filters):
+        today = fields.Date.context_today(self)
+        certificates = self.env['training.certificate'].search(
+            self._get_dashboard_domain('training.certificate', filters) + [
+                ('expiry_date', '<=', today + timedelta(days=30)),
+                ('expiry_date', '>=', today),
+                ('state', '=', 'expiring_soon'),
+            ], order='expiry_date asc', limit=10)
+        return [{
             'id': cert.id,
             'name': cert.name,
             'employee_name': cert.employee_id.name,
@@ -191,91 +666,58 @@ class TrainingSession(models.Model):
             'expiry_date': cert.expiry_date.strftime('%Y-%m-%d'),
             'days_until_expiry': cert.days_until_expiry,
         } for cert in certificates]
-        
-        # Top courses
-        Enrollment = self.env['training.enrollment']
-        enrollment_data = Enrollment.read_group(
-            domain=[('state', '=', 'attended')],
-            fields=['course_id'],
-            groupby=['course_id'],
-            orderby='course_id_count desc',
-            limit=5
+
+    @api.model
+    def _get_dashboard_top_courses(self, filters):
+        rows = self.env['training.enrollment']._read_group(
+            self._get_dashboard_domain('training.enrollment', filters) + [('state', '=', 'attended')],
+            ['course_id'], ['__count'], order='__count desc', limit=5,
         )
-        
-        top_courses = []
-        for data in enrollment_data:
-            if data['course_id']:
-                course = self.env['training.course'].browse(data['course_id'][0])
-                top_courses.append({
-                    'id': course.id,
-                    'name': data['course_id'][1],
-                    'count': data['course_id_count'],
-                    'is_certification': course.is_certification,
-                })
-        
-        # Enrollments per month
-        twelve_months_ago = today - timedelta(days=365)
-        enrollments = Enrollment.search([
-            ('enrollment_date', '>=', twelve_months_ago),
-        ])
-        
+        return [{
+            'id': course.id,
+            'name': course.name,
+            'count': count,
+            'is_certification': course.is_certification,
+        } for course, count in rows if course]
+
+    @api.model
+    def _get_dashboard_enrollments_per_month(self, filters):
+        """Enrollments per month and state over the date range, last 12 months by default"""
+        date_to = filters['date_to'] or fields.Date.context_today(self)
+        date_from = filters['date_from'] or date_to - timedelta(days=365)
+        filters = dict(filters, date_from=date_from, date_to=date_to)
         monthly_data = defaultdict(lambda: {'confirmed': 0, 'attended': 0, 'cancelled': 0})
-        for enrollment in enrollments:
-            month_key = enrollment.enrollment_date.strftime('%Y-%m')
-            if enrollment.state in monthly_data[month_key]:
-                monthly_data[month_key][enrollment.state] += 1
-        
+        for month, state, count in self.env['training.enrollment']._read_group(
+            self._get_dashboard_domain('training.enrollment', filters),
+            ['enrollment_date:month', 'state'], ['__count'],
+        ):
+            if state in monthly_data[month.strftime('%Y-%m')]:
+                monthly_data[month.strftime('%Y-%m')][state] += count
+
         enrollments_per_month = []
-        current_date = twelve_months_ago
-        while current_date <= today:
+        current_date = date_from.replace(day=1)
+        while current_date <= date_to:
             month_key = current_date.strftime('%Y-%m')
-            month_label = current_date.strftime('%b %Y')
-            
             enrollments_per_month.append({
-                'month': month_label,
-                'confirmed': monthly_data[month_key].get('confirmed', 0),
-                'attended': monthly_data[month_key].get('attended', 0),
-                'cancelled': monthly_data[month_key].get('cancelled', 0),
+                'month': current_date.strftime('%b %Y'),
+                'confirmed': monthly_data[month_key]['confirmed'],
+                'attended': monthly_data[month_key]['attended'],
+                'cancelled': monthly_data[month_key]['cancelled'],
             })
-            
             if current_date.month == 12:
                 current_date = current_date.replace(year=current_date.year + 1, month=1)
             else:
                 current_date = current_date.replace(month=current_date.month + 1)
-        
-        # Statistics
-        total_active_sessions = self.search_count([
-            ('state', 'in', ['scheduled', 'ongoing']),
-        ])
-        
-        total_enrollments_this_month = Enrollment.search_count([
-            ('enrollment_date', '>=', today.replace(day=1)),
-        ])
-        
-        certificates_expiring_soon = Certificate.search_count([
-            ('state', '=', 'expiring_soon'),
-        ])
-        
-        total_confirmed = Enrollment.search_count([
-            ('state', 'in', ['confirmed', 'attended']),
-        ])
-        attended = Enrollment.search_count([
-            ('state', '=', 'attended'),
-        ])
-        completion_rate = round((attended / total_confirmed) * 100, 1) if total_confirmed > 0 else 0
-        
-        return {
-            'upcoming_sessions': upcoming_sessions,
-            'expiring_certificates': expiring_certificates,
-            'top_courses': top_courses,
-            'enrollments_per_month': enrollments_per_month,
-            'statistics': {
-                'total_active_sessions': total_active_sessions,
-                'total_enrollments_this_month': total_enrollments_this_month,
-                'certificates_expiring_soon': certificates_expiring_soon,
-                'completion_rate': completion_rate,
-            }
-        }
+        return enrollments_per_month
+
+    @api.model
+    def _get_dashboard_expiry_forecast(self, filters):
+        return self.env['training.certificate'].with_context(
+            allowed_company_ids=[company_id for company_id in filters['company_ids'] if company_id]
+            or self.env.companies.ids
+        ).get_expiry_forecast(
+            months=6, course_ids=filters['course_ids'], department_ids=filters['department_ids'],
+        )
 
     @api.model
     def get_available_sessions(self):
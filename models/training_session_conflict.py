@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, tools
+
+
+class TrainingSessionConflict(models.Model):
+    _name = 'training.session.conflict'
+    _description = 'Training Session Booking Conflict'
+    _auto = False
+    _order = 'start_date, session_id'
+
+    session_id = fields.Many2one(
+        comodel_name='training.session',
+        string='Session',
+        readonly=True
+    )
+    conflicting_session_id = fields.Many2one(
+        comodel_name='training.session',
+        string='Conflicting Session',
+        readonly=True
+    )
+    conflict_type = fields.Selection([
+        ('instructor', 'Instructor'),
+        ('room', 'Room'),
+    ], string='Conflict', readonly=True)
+    instructor_id = fields.Many2one(
+        comodel_name='res.users',
+        string='Instructor',
+        readonly=True
+    )
+    location = fields.Char(
+        string='Location',
+        readonly=True
+    )
+    start_date = fields.Date(
+        string='Start Date',
+        readonly=True
+    )
+    end_date = fields.Date(
+        string='End Date',
+        readonly=True
+    )
+
+    def init(self):
+        """Every conflicting pair of sessions, listed once"""
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW {table} AS (
+                SELECT row_number() OVER (ORDER BY c.session_id, c.conflicting_session_id, c.conflict_type) AS id,
+                       c.session_id,
+                       c.conflicting_session_id,
+                       c.conflict_type,
+                       s.instructor_id,
+                       s.location,
+                       GREATEST(s.start_date, o.start_date) AS start_date,
+                       LEAST(s.end_date, o.end_date) AS end_date
+                  FROM ({conflicts}) AS c (session_id, conflicting_session_id, conflict_type)
+                  JOIN training_session s ON s.id = c.session_id
+                  JOIN training_session o ON o.id = c.conflicting_session_id
+            )
+        """.format(
+            table=self._table,
+            conflicts=self.env['training.session']._get_booking_conflicts_query(),
+        ))
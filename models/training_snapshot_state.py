@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+
+class TrainingSnapshotState(models.Model):
+    """Refresh bookkeeping of the precomputed training snapshots.
+
+    Kept out of ``ir.config_parameter``, whose writes clear the ormcache of
+    every worker, since snapshots are refreshed and invalidated often.
+    """
+    _name = 'training.snapshot.state'
+    _description = 'Training Snapshot State'
+    _log_access = False
+
+    name = fields.Char(
+        string='Snapshot',
+        required=True,
+        readonly=True
+    )
+    refresh_date = fields.Datetime(
+        string='Refreshed On',
+        readonly=True,
+        help='Watermark of the last refresh'
+    )
+    full_refresh_date = fields.Date(
+        string='Fully Rebuilt On',
+        readonly=True,
+        help='Day of the last full rebuild, empty to force the next refresh to rebuild'
+    )
+
+    _sql_constraints = [
+        ('name_unique', 'UNIQUE(name)', 'A snapshot has a single state.'),
+    ]
+
+    @api.model
+    def _get_state(self, name):
+        """Return ``(refresh_date, full_refresh_date)`` of a snapshot"""
+        self.env.cr.execute("""
+            SELECT refresh_date, full_refresh_date
+              FROM training_snapshot_state
+             WHERE name = %s
+        """, [name])
+        return self.env.cr.fetchone() or (None, None)
+
+    @api.model
+    def _set_state(self, name, **values):
+        """Store the given columns of a snapshot state, only when they change"""
+        columns = [column for column in ('refresh_date', 'full_refresh_date') if column in values]
+        self.env.cr.execute("""
+            INSERT INTO training_snapshot_state (name, {columns})
+            VALUES (%(name)s, {placeholders})
+                ON CONFLICT (name) DO UPDATE
+               SET ({columns}) = ROW({excluded})
+             WHERE ({current}) IS DISTINCT FROM ({excluded})
+        """.format(
+            columns=', '.join(columns),
+            placeholders=', '.join('%%(%s)s' % column for column in columns),
+            excluded=', '.join('EXCLUDED.%s' % column for column in columns),
+            current=', '.join('training_snapshot_state.%s' % column for column in columns),
+        ), dict(values, name=name))
@@ -1,10 +1,23 @@
 /** @odoo-module **/
 
-import { Component, onWillStart, useState } from "@odoo/owl";
+import { Component, onMounted, onWillUnmount, useState } from "@odoo/owl";
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
 import { _t } from "@web/core/l10n/translation";
 
+// Dashboard sections fetched in parallel, mapped to their state key
+const DASHBOARD_SECTIONS = {
+    statistics: "statistics",
+    upcoming_sessions: "upcomingSessions",
+    expiring_certificates: "expiringCertificates",
+    top_courses: "topCourses",
+    enrollments_per_month: "enrollmentsPerMonth",
+    expiry_forecast: "expiryForecast",
+};
+const DASHBOARD_CHANNEL = "employee_training.dashboard";
+const ACTIVE_SESSION_STATES = ["scheduled", "ongoing"];
+const OPEN_SESSION_STATES = ["draft", "scheduled"];
+
 export class TrainingDashboard extends Component {
     static template = "employee_training.TrainingDashboard";
 
@@ -12,51 +25,184 @@ export class TrainingDashboard extends Component {
         this.action = useService("action");
         this.orm = useService("orm");
         this.notification = useService("notification");
+        this.busService = useService("bus_service");
+        this.sectionRequests = {};
 
         this.state = useState({
             upcomingSessions: [],
             expiringCertificates: [],
             topCourses: [],
             enrollmentsPerMonth: [],
+            expiryForecast: { weeks: [], series: [], totals: [] },
             statistics: {},
-            isLoading: true,
+            isLoading: false,
+            loading: Object.fromEntries(Object.keys(DASHBOARD_SECTIONS).map((section) => [section, true])),
             showEnrollmentDialog: false,
             availableSessions: [],
             availableEmployees: [],
             selectedEmployee: null,
             selectedSession: null,
+            filters: { company_id: "", department_id: "", course_id: "", date_from: "", date_to: "" },
+            filterOptions: { companies: [], departments: [], courses: [] },
+        });
+
+        // Render the skeleton right away, sections fill in as they arrive
+        onMounted(() => {
+            this.loadFilterOptions();
+            this.loadDashboardData();
         });
 
-        onWillStart(async () => {
-            await this.loadDashboardData();
+        // Training changes are pushed as deltas and patched in place
+        this.onDashboardUpdate = this.onDashboardUpdate.bind(this);
+        this.busService.addChannel(DASHBOARD_CHANNEL);
+        this.busService.subscribe("training_dashboard/update", this.onDashboardUpdate);
+        onWillUnmount(() => {
+            this.busService.unsubscribe("training_dashboard/update", this.onDashboardUpdate);
+            this.busService.deleteChannel(DASHBOARD_CHANNEL);
         });
     }
 
+    get hasFilters() {
+        return Object.values(this.state.filters).some((value) => value);
+    }
+
+    getServerFilters() {
+        const filters = this.state.filters;
+        return {
+            company_ids: filters.company_id ? [parseInt(filters.company_id)] : [],
+            department_ids: filters.department_id ? [parseInt(filters.department_id)] : [],
+            course_ids: filters.course_id ? [parseInt(filters.course_id)] : [],
+            date_from: filters.date_from || false,
+            date_to: filters.date_to || false,
+        };
+    }
+
+    async loadFilterOptions() {
+        const [companies, departments, courses] = await Promise.all([
+            this.orm.searchRead("res.company", [], ["id", "name"], { order: "name" }),
+            this.orm.searchRead("hr.department", [], ["id", "complete_name"], { order: "complete_name" }),
+            this.orm.searchRead("training.course", [], ["id", "name"], { order: "name" }),
+        ]);
+        this.state.filterOptions = { companies, departments, courses };
+    }
+
+    onFilterChange(name, ev) {
+        this.state.filters[name] = ev.target.value;
+        this.loadDashboardData();
+    }
+
+    clearFilters() {
+        this.state.filters = { company_id: "", department_id: "", course_id: "", date_from: "", date_to: "" };
+        this.loadDashboardData();
+    }
+
+    onDashboardUpdate({ deltas }) {
+        // Deltas are global, a filtered view is refreshed by changing the filters
+        if (this.hasFilters) {
+            return;
+        }
+        const statistics = this.state.statistics;
+        let trendChanged = false;
+        for (const delta of deltas) {
+            switch (delta.type) {
+                case "enrollment": {
+                    const month = this.state.enrollmentsPerMonth.find((m) => m.month === delta.month);
+                    if (month && delta.state in month) {
+                        month[delta.state] += delta.delta;
+                        trendChanged = true;
+                    }
+                    if (["confirmed", "attended"].includes(delta.state)) {
+                        statistics.enrollments_confirmed += delta.delta;
+                    }
+                    if (delta.state === "attended") {
+                        statistics.enrollments_attended += delta.delta;
+                    }
+                    break;
+                }
+                case "enrollment_created":
+                    statistics.total_enrollments_this_month += delta.count;
+                    break;
+                case "seats":
+                    this.patchSessionSeats(delta);
+                    break;
+                case "session":
+                    statistics.total_active_sessions +=
+                        ACTIVE_SESSION_STATES.includes(delta.state) -
+                        ACTIVE_SESSION_STATES.includes(delta.previous_state);
+                    break;
+                case "certificate":
+                    this.patchCertificate(delta);
+                    break;
+            }
+        }
+        if (statistics.enrollments_confirmed !== undefined) {
+            statistics.completion_rate = statistics.enrollments_confirmed > 0
+                ? Math.round((statistics.enrollments_attended / statistics.enrollments_confirmed) * 1000) / 10
+                : 0;
+        }
+        if (trendChanged) {
+            this.renderChart();
+        }
+    }
+
+    patchSessionSeats(delta) {
+        const sessions = this.state.upcomingSessions;
+        const index = sessions.findIndex((session) => session.id === delta.session_id);
+        if (index === -1) {
+            return;
+        }
+        if (delta.available_seats <= 0 || !OPEN_SESSION_STATES.includes(delta.state)) {
+            sessions.splice(index, 1);
+        } else {
+            sessions[index].available_seats = delta.available_seats;
+            sessions[index].capacity = delta.capacity;
+        }
+    }
+
+    patchCertificate(delta) {
+        this.state.statistics.certificates_expiring_soon +=
+            (delta.state === "expiring_soon") - (delta.previous_state === "expiring_soon");
+        const certificates = this.state.expiringCertificates.filter((cert) => cert.id !== delta.id);
+        if (delta.line) {
+            certificates.push(delta.line);
+            certificates.sort((a, b) => a.expiry_date.localeCompare(b.expiry_date));
+        }
+        this.state.expiringCertificates = certificates.slice(0, 10);
+    }
+
     async loadDashboardData() {
-        this.state.isLoading = true;
+        await Promise.all(Object.keys(DASHBOARD_SECTIONS).map((section) => this.loadSection(section)));
+    }
+
+    async loadSection(section) {
+        // Ignore answers overtaken by a newer request, e.g. after a filter change
+        const requestId = (this.sectionRequests[section] || 0) + 1;
+        this.sectionRequests[section] = requestId;
+        this.state.loading[section] = true;
         try {
-            // Call the controller method directly using ORM execute_kw
             const data = await this.orm.call(
                 "training.session",
-                "get_dashboard_data",
-                []
+                "get_dashboard_section",
+                [section, this.getServerFilters()]
             );
-            
-            this.state.upcomingSessions = data.upcoming_sessions;
-            this.state.expiringCertificates = data.expiring_certificates;
-            this.state.topCourses = data.top_courses;
-            this.state.enrollmentsPerMonth = data.enrollments_per_month;
-            this.state.statistics = data.statistics;
-            
-            // Render chart after data is loaded
-            setTimeout(() => this.renderChart(), 100);
+            if (requestId !== this.sectionRequests[section]) {
+                return;
+            }
+            this.state[DASHBOARD_SECTIONS[section]] = data;
+            if (section === "enrollments_per_month") {
+                this.renderChart();
+            } else if (section === "expiry_forecast") {
+                this.renderForecastChart();
+            }
         } catch (error) {
-            console.error("Error loading dashboard data:", error);
+            console.error(`Error loading dashboard section ${section}:`, error);
             this.notification.add(_t("Error loading dashboard data"), {
                 type: "danger",
             });
         } finally {
-            this.state.isLoading = false;
+            if (requestId === this.sectionRequests[section]) {
+                this.state.loading[section] = false;
+            }
         }
     }
 
@@ -139,6 +285,66 @@ export class TrainingDashboard extends Component {
         });
     }
 
+    renderForecastChart() {
+        const canvas = document.getElementById("expiryForecastChart");
+        if (!canvas || typeof Chart === 'undefined') return;
+
+        if (this.forecastChart) {
+            this.forecastChart.destroy();
+        }
+
+        const palette = ["#667eea", "#f5576c", "#2ecc71", "#f39c12", "#3498db", "#9b59b6"];
+        const forecast = this.state.expiryForecast;
+        // Keep the chart readable: the busiest courses get their own series
+        const topSeries = forecast.series.slice(0, palette.length - 1);
+        const datasets = topSeries.map((serie, index) => ({
+            label: serie.course_name,
+            data: serie.counts,
+            backgroundColor: palette[index],
+        }));
+        if (forecast.series.length > topSeries.length) {
+            const others = forecast.totals.map((total, index) =>
+                total - topSeries.reduce((sum, serie) => sum + serie.counts[index], 0)
+            );
+            datasets.push({
+                label: _t("Other"),
+                data: others,
+                backgroundColor: palette[palette.length - 1],
+            });
+        }
+
+        this.forecastChart = new Chart(canvas.getContext("2d"), {
+            type: "bar",
+            data: {
+                labels: forecast.weeks,
+                datasets: datasets,
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: "top",
+                    },
+                    title: {
+                        display: true,
+                        text: "Certificate Expiries per Week (Next 6 Months)",
+                    },
+                },
+                scales: {
+                    x: { stacked: true },
+                    y: {
+                        stacked: true,
+                        beginAtZero: true,
+                        ticks: {
+                            stepSize: 1,
+                        },
+                    },
+                },
+            },
+        });
+    }
+
     async openSessionRecord(sessionId) {
         await this.action.doAction({
             type: "ir.actions.act_window",
@@ -242,8 +448,6 @@ export class TrainingDashboard extends Component {
             });
             
             this.closeEnrollmentDialog();
-            // Refresh dashboard data
-            await this.loadDashboardData();
         } catch (error) {
             this.notification.add(_t("Error creating enrollment: ") + error.message, {
                 type: "danger",
@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
 
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import quote_plus
 from datetime import date, timedelta
+from unittest.mock import patch
 from dateutil.relativedelta import relativedelta
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import ValidationError, UserError, AccessError
 from odoo import fields
+from odoo.addons.employee_training.controllers.export import stream_records_csv
+from odoo.addons.employee_training.wizard.training_renewal_planner import plan_renewal_sessions
 
 
 class TestTrainingCertificate(TransactionCase):
@@ -226,6 +234,167 @@ class TestTrainingCertificate(TransactionCase):
         self.assertFalse(new_certificate.expiry_notified, "New certificate should not be notified")
         self.assertNotEqual(new_certificate.id, old_certificate.id, "Should be a different record")
 
+    def test_10_expiry_forecast_buckets(self):
+        """Test expiry forecast buckets certificates per course and week"""
+        issue_date = date.today() - relativedelta(years=2) + timedelta(days=14)
+        self.Certificate.create([{
+            'employee_id': employee.id,
+            'course_id': self.course.id,
+            'issue_date': issue_date,
+        } for employee in (self.employee1, self.employee2)])
+
+        forecast = self.Certificate.get_expiry_forecast(months=6)
+        course_series = [s for s in forecast['series'] if s['course_id'] == self.course.id]
+
+        self.assertEqual(len(course_series), 1, "Should have one series for the course")
+        self.assertEqual(course_series[0]['total'], 2, "Both expiries should be counted")
+        self.assertEqual(len(course_series[0]['counts']), len(forecast['weeks']))
+        expiry = issue_date + relativedelta(years=2)
+        week = fields.Date.to_string(expiry - timedelta(days=expiry.weekday()))
+        self.assertEqual(course_series[0]['counts'][forecast['weeks'].index(week)], 2)
+
+    def test_11_expiry_forecast_cache_invalidated(self):
+        """Test the cached forecast is refreshed when certificates change"""
+        issue_date = date.today() - relativedelta(years=2) + timedelta(days=14)
+        before = self.Certificate.get_expiry_forecast(months=6)
+
+        self.Certificate.create({
+            'employee_id': self.employee1.id,
+            'course_id': self.course.id,
+            'issue_date': issue_date,
+        })
+
+        after = self.Certificate.get_expiry_forecast(months=6)
+        self.assertEqual(sum(after['totals']), sum(before['totals']) + 1)
+
+        department = self.env['hr.department'].create({'name': 'Forecast Department'})
+        forecast = self.Certificate.get_expiry_forecast(months=6, department_ids=[department.id])
+        self.assertEqual(sum(forecast['totals']), 0)
+        self.employee1.department_id = department
+        forecast = self.Certificate.get_expiry_forecast(months=6, department_ids=[department.id])
+        self.assertTrue(sum(forecast['totals']), "Moving an employee should refresh the department forecast")
+
+    def test_12_batch_renewal(self):
+        """Test renewing several certificates at once links and supersedes them"""
+        old_certificates = self.Certificate.create([{
+            'employee_id': employee.id,
+            'course_id': self.course.id,
+            'issue_date': date.today() - relativedelta(years=2, days=5),
+        } for employee in (self.employee1, self.employee2)])
+
+        action = old_certificates.action_renew_certificate()
+        renewals = self.Certificate.search(action['domain'])
+
+        self.assertEqual(len(renewals), 2, "One renewal per certificate")
+        self.assertEqual(renewals.previous_certificate_id, old_certificates, "Renewals should link to their predecessor")
+        self.assertEqual(len(set(renewals.mapped('name'))), 2, "Each renewal should get its own number")
+        for renewal in renewals:
+            self.assertEqual(renewal.employee_id, renewal.previous_certificate_id.employee_id)
+            self.assertEqual(renewal.issue_date, date.today())
+            self.assertEqual(renewal.state, 'valid')
+        self.assertTrue(all(old_certificates.mapped('is_superseded')))
+        self.assertEqual(set(old_certificates.mapped('state')), {'superseded'})
+
+        with self.assertRaises(UserError):
+            old_certificates.action_renew_certificate()
+
+    def test_13_stream_export_action(self):
+        """Test the streaming export action targets the export route"""
+        certificates = self.Certificate.create([{
+            'employee_id': employee.id,
+            'course_id': self.course.id,
+        } for employee in (self.employee1, self.employee2)])
+
+        action = certificates.action_stream_export()
+        self.assertEqual(action['type'], 'ir.actions.act_url')
+        self.assertTrue(action['url'].startswith('/training/export/training.certificate?domain='))
+
+        domain = [('id', 'in', certificates.ids)]
+        action = certificates.with_context(active_domain=domain).action_stream_export()
+        self.assertIn(quote_plus(json.dumps(domain)), action['url'], "Whole selections export their domain")
+        self.assertFalse(hasattr(self.course, 'action_stream_export'), "Only exportable models get the action")
+
+    def test_14_expiry_digest(self):
+        """Test digest mode sends one notification per recipient and no activities"""
+        self.env['ir.config_parameter'].sudo().set_param('employee_training.expiry_notification_mode', 'digest')
+        employee3 = self.Employee.create({'name': 'Test Employee 3'})
+        (self.employee2 | employee3).write({'parent_id': self.employee1.id})
+        issue_date = date.today() - relativedelta(years=2) + timedelta(days=15)
+        certificates = self.Certificate.create([{
+            'employee_id': employee.id,
+            'course_id': course.id,
+            'issue_date': issue_date,
+        } for employee in (self.employee2, employee3) for course in (self.course, self.course.copy())])
+
+        self.Certificate._cron_check_expiring_certificates()
+
+        def notifications(user):
+            return self.env['mail.message'].search_count([
+                ('partner_ids', 'in', user.partner_id.ids),
+                ('message_type', '=', 'user_notification'),
+            ])
+        self.assertEqual(notifications(self.user1), 1, "The manager should get a single digest")
+        self.assertEqual(notifications(self.user2), 1, "The employee should get a single digest")
+        self.assertFalse(certificates.activity_ids, "Digest mode should not schedule activities")
+        self.assertTrue(all(certificates.mapped('expiry_notified')))
+
+    def test_15_expiry_emails_batched_and_throttled(self):
+        """Test expiry emails are queued in batches within the per-run limit"""
+        self.env['ir.config_parameter'].sudo().set_param('employee_training.expiry_mail_limit', 2)
+        employees = self.Employee.create([{
+            'name': f'Mail Employee {index}',
+            'work_email': f'mail.employee{index}@test.com',
+        } for index in range(3)])
+        issue_date = date.today() - relativedelta(years=2) + timedelta(days=15)
+        certificates = self.Certificate.create([{
+            'employee_id': employee.id,
+            'course_id': self.course.id,
+            'issue_date': issue_date,
+        } for employee in employees])
+        self.Certificate._cron_check_expiring_certificates()
+
+        def queued_mails():
+            return self.env['mail.mail'].search([
+                ('model', '=', 'training.certificate'),
+                ('res_id', 'in', certificates.ids),
+            ])
+        cron = self.env.ref('employee_training.ir_cron_send_expiry_emails')
+        self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)]).unlink()
+        self.Certificate._cron_send_expiry_emails()
+        self.assertEqual(len(queued_mails()), 2, "A run should queue at most the configured limit")
+        self.assertEqual(set(queued_mails().mapped('state')), {'outgoing'}, "Mails should be queued, not sent")
+        triggers = self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)])
+        self.assertTrue(triggers, "The rest should be scheduled")
+        self.assertGreaterEqual(min(triggers.mapped('call_at')), fields.Datetime.now() + timedelta(minutes=9),
+                                "The next run should wait for the configured interval")
+
+        self.Certificate._cron_send_expiry_emails()
+        self.assertEqual(len(queued_mails()), 3)
+        self.assertTrue(all(certificates.mapped('expiry_mail_sent')))
+        self.Certificate._cron_send_expiry_emails()
+        self.assertEqual(len(queued_mails()), 3, "Each certificate is emailed once")
+
+    def test_16_stream_records_csv(self):
+        """Test the CSV stream always starts with the header row"""
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+        certificates = self.Certificate.create([{
+            'employee_id': employee.id,
+            'course_id': self.course.id,
+        } for employee in (self.employee1, self.employee2)])
+
+        def export(domain):
+            return ''.join(stream_records_csv(
+                self.registry, self.env.uid, {}, 'training.certificate', domain, ['name', 'employee_id'],
+                chunk_size=1,
+            )).splitlines()
+
+        self.assertEqual(export([('id', '=', 0)]), ['Certificate Number,Employee'],
+                         "An empty export should still hold the header")
+        lines = export([('id', 'in', certificates.ids)])
+        self.assertEqual(lines[0], 'Certificate Number,Employee')
+        self.assertEqual(lines[1:], [f'{c.name},{c.employee_id.name}' for c in certificates.sorted('id')])
+
 
 class TestTrainingCourse(TransactionCase):
     """Test cases for training.course model"""
@@ -303,6 +472,44 @@ class TestTrainingCourse(TransactionCase):
         course.invalidate_recordset()
         self.assertEqual(course.certificate_count, 1, "Should have 1 certificate")
 
+    def test_04_validity_change_recomputes_certificates(self):
+        """Test changing the validity period recomputes existing certificates in bulk"""
+        course = self.Course.create({
+            'name': 'Validity Course',
+            'is_certification': True,
+            'validity_months': 24,
+        })
+        employee = self.env['hr.employee'].create({'name': 'Validity Employee'})
+        issue_date = date.today() - relativedelta(months=12) + timedelta(days=10)
+        certificate = self.env['training.certificate'].create({
+            'employee_id': employee.id,
+            'course_id': course.id,
+            'issue_date': issue_date,
+        })
+        self.assertEqual(certificate.state, 'valid')
+
+        course.write({'validity_months': 12})
+
+        self.assertEqual(certificate.expiry_date, issue_date + relativedelta(months=12))
+        self.assertEqual(certificate.days_until_expiry, (certificate.expiry_date - date.today()).days)
+        self.assertEqual(certificate.state, 'expiring_soon', "Shorter validity should bring expiry closer")
+        self.assertTrue(certificate.expiry_notified, "Recomputed certificates should be re-evaluated for notification")
+
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE training_certificate SET expiry_date = %s WHERE id = %s",
+            [issue_date + relativedelta(months=18), certificate.id]
+        )
+        certificate.invalidate_recordset(['expiry_date'])
+        course.write({'validity_months': 12, 'description': 'Same validity'})
+        self.assertEqual(certificate.expiry_date, issue_date + relativedelta(months=18),
+                         "An unchanged validity should not recompute the certificates")
+
+        course.write({'validity_months': 0})
+        self.assertFalse(certificate.expiry_date, "Zero validity means the certificate never expires")
+        self.assertEqual(certificate.state, 'valid')
+        self.assertFalse(certificate.expiry_notified, "Notification flag should reset outside the window")
+
 
 class TestTrainingSession(TransactionCase):
     """Test cases for training.session model"""
@@ -407,6 +614,261 @@ class TestTrainingSession(TransactionCase):
         session.action_cancel_session()
         self.assertEqual(session.state, 'cancelled', "Should be in cancelled state")
 
+    def test_07_bulk_reschedule(self):
+        """Test rescheduling shifts sessions and their enrollments in bulk"""
+        start = date.today() + timedelta(days=10)
+        sessions = self.Session.create([{
+            'course_id': self.course.id,
+            'start_date': start + timedelta(days=offset),
+            'end_date': start + timedelta(days=offset + 1),
+            'capacity': 10,
+        } for offset in (0, 3)])
+        employees = self.env['hr.employee'].create([
+            {'name': 'Reschedule Employee 1'},
+            {'name': 'Reschedule Employee 2'},
+        ])
+        enrollments = self.env['training.enrollment'].create([{
+            'employee_id': employee.id,
+            'session_id': sessions[0].id,
+        } for employee in employees])
+        message_count = len(sessions[0].message_ids)
+
+        sessions.action_reschedule(14)
+
+        new_start = start + timedelta(days=14)
+        self.assertEqual(sessions[0].start_date, new_start)
+        self.assertEqual(sessions[0].end_date, new_start + timedelta(days=1))
+        self.assertEqual(sessions[1].start_date, new_start + timedelta(days=3))
+        self.assertEqual(sessions[0].name, f"{self.course.name} - {new_start}")
+        for enrollment in enrollments:
+            self.assertEqual(enrollment.start_date, sessions[0].start_date, "Enrollment dates should follow the session")
+            self.assertEqual(enrollment.end_date, sessions[0].end_date)
+        self.assertEqual(
+            len(sessions[0].message_ids), message_count + 1,
+            "A single summary message should be logged per session"
+        )
+
+        user = self.User.create({
+            'name': 'Reschedule User',
+            'login': 'reschedule_user@test.com',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        with self.assertRaises(AccessError):
+            sessions.with_user(user).action_reschedule(7)
+
+    def test_08_reschedule_completed_session_blocked(self):
+        """Test completed sessions cannot be rescheduled"""
+        session = self.Session.create({
+            'course_id': self.course.id,
+            'start_date': date.today(),
+            'end_date': date.today(),
+            'capacity': 10,
+        })
+        session.action_complete_session()
+
+        with self.assertRaises(UserError):
+            session.action_reschedule(7)
+
+    def test_09_dashboard_sections(self):
+        """Test dashboard sections load independently"""
+        self.env['ir.config_parameter'].sudo().set_param('employee_training.dashboard_cache_ttl', 0)
+        session = self.Session.create({
+            'course_id': self.course.id,
+            'start_date': date.today() + timedelta(days=5),
+            'end_date': date.today() + timedelta(days=5),
+            'capacity': 10,
+        })
+        employee = self.env['hr.employee'].create({'name': 'Dashboard Employee'})
+        self.env['training.enrollment'].create({
+            'employee_id': employee.id,
+            'session_id': session.id,
+        }).action_confirm()
+
+        upcoming = self.Session.get_dashboard_section('upcoming_sessions')
+        self.assertIn(session.id, [line['id'] for line in upcoming])
+        trend = self.Session.get_dashboard_section('enrollments_per_month')
+        self.assertEqual(trend[-1]['month'], date.today().strftime('%b %Y'))
+        self.assertGreaterEqual(trend[-1]['confirmed'], 1, "The confirmed enrollment should be counted")
+        statistics = self.Session.get_dashboard_section('statistics')
+        self.assertGreaterEqual(statistics['total_enrollments_this_month'], 1)
+
+        self.assertEqual(
+            set(self.Session.get_dashboard_data()),
+            {'statistics', 'upcoming_sessions', 'expiring_certificates', 'top_courses',
+             'enrollments_per_month', 'expiry_forecast'},
+        )
+        with self.assertRaises(UserError):
+            self.Session.get_dashboard_section('unlink')
+
+    def test_10_dashboard_bus_deltas(self):
+        """Test workflow changes publish one compact delta message per transaction"""
+        session = self.Session.create({
+            'course_id': self.course.id,
+            'start_date': date.today() + timedelta(days=5),
+            'end_date': date.today() + timedelta(days=5),
+            'capacity': 10,
+        })
+        employees = self.env['hr.employee'].create([
+            {'name': 'Bus Employee 1'},
+            {'name': 'Bus Employee 2'},
+        ])
+        self.env.cr.precommit.run()
+        enrollments = self.env['training.enrollment'].create([{
+            'employee_id': employee.id,
+            'session_id': session.id,
+        } for employee in employees])
+        enrollments.action_confirm()
+        bus_count = self.env['bus.bus'].search_count([])
+        self.env.cr.precommit.run()
+
+        messages = self.env['bus.bus'].search([], order='id')[bus_count:]
+        self.assertEqual(len(messages), 1, "Deltas should be sent as a single bus message")
+        deltas = json.loads(messages.message)['payload']['deltas']
+        month = date.today().strftime('%b %Y')
+        self.assertIn({'type': 'enrollment', 'month': month, 'state': 'confirmed', 'delta': 2}, deltas)
+        self.assertIn({'type': 'enrollment_created', 'count': 2}, deltas)
+        self.assertIn({
+            'type': 'seats', 'session_id': session.id, 'available_seats': 8, 'capacity': 10, 'state': 'draft',
+        }, deltas)
+
+    def test_11_dashboard_filters_and_cache(self):
+        """Test dashboard filters are applied and results cached per filter combination"""
+        self.env['ir.config_parameter'].sudo().set_param('employee_training.dashboard_cache_ttl', 3600)
+        parent = self.env['hr.department'].create({'name': 'Dashboard Operations'})
+        child = self.env['hr.department'].create({'name': 'Dashboard Field', 'parent_id': parent.id})
+        other = self.env['hr.department'].create({'name': 'Dashboard Sales'})
+        session = self.Session.create({
+            'course_id': self.course.id,
+            'start_date': date.today() - timedelta(days=2),
+            'end_date': date.today() - timedelta(days=1),
+            'capacity': 10,
+        })
+        employees = self.env['hr.employee'].create([
+            {'name': 'Filter Employee 1', 'department_id': child.id},
+            {'name': 'Filter Employee 2', 'department_id': child.id},
+            {'name': 'Filter Employee 3', 'department_id': other.id},
+        ])
+        enrollments = self.env['training.enrollment'].create([{
+            'employee_id': employee.id,
+            'session_id': session.id,
+        } for employee in employees])
+        enrollments.action_confirm()
+        enrollments[:2].action_mark_attended()
+
+        filters = {'department_ids': [parent.id], 'course_ids': [self.course.id]}
+        top_courses = self.Session.get_dashboard_section('top_courses', filters)
+        self.assertEqual(top_courses[0]['count'], 2, "Sub-departments should be included")
+        statistics = self.Session.get_dashboard_section('statistics', {'department_ids': [other.id]})
+        self.assertEqual(statistics['enrollments_attended'], 0)
+        self.assertEqual(statistics['enrollments_confirmed'], 1)
+        trend = self.Session.get_dashboard_section('enrollments_per_month', {
+            'date_from': fields.Date.to_string(date.today() - relativedelta(months=2)),
+            'date_to': fields.Date.to_string(date.today()),
+        })
+        self.assertEqual(len(trend), 3, "The trend should cover the requested range")
+
+        # Confirmed figures count attended enrollments too
+        scope = {'department_ids': [parent.id]}
+        with patch('odoo.addons.employee_training.models.training_session.time') as clock:
+            clock.perf_counter.return_value = 0.0
+            clock.time.return_value = 3600 * 1000
+            self.assertEqual(self.Session.get_dashboard_section('statistics', scope)['enrollments_confirmed'], 2)
+            newcomer = self.env['hr.employee'].create({'name': 'Filter Employee 4', 'department_id': child.id})
+            self.env['training.enrollment'].create({
+                'employee_id': newcomer.id,
+                'session_id': session.id,
+            }).action_confirm()
+
+            clock.time.return_value = 3600 * 1000 + 3599
+            self.assertEqual(
+                self.Session.get_dashboard_section('statistics', scope)['enrollments_confirmed'], 2,
+                "The cached figure is served until the time to live expires"
+            )
+            statistics = self.Session.get_dashboard_section('statistics', {'department_ids': [other.id, child.id]})
+            self.assertEqual(statistics['enrollments_confirmed'], 4, "Other filters should be computed afresh")
+
+            clock.time.return_value = 3600 * 1001
+            self.assertEqual(
+                self.Session.get_dashboard_section('statistics', scope)['enrollments_confirmed'], 3,
+                "The figure is refreshed once the time to live has expired"
+            )
+
+        with self.assertRaises(UserError):
+            self.Session.get_dashboard_section('statistics', {'date_from': 'yesterday'})
+
+    def test_12_booking_conflicts(self):
+        """Test instructors and rooms cannot be double-booked"""
+        start = date.today() + timedelta(days=30)
+        session = self.Session.create({
+            'course_id': self.course.id,
+            'instructor_id': self.instructor.id,
+            'location': 'Room 202',
+            'start_date': start,
+            'end_date': start + timedelta(days=2),
+        })
+        with self.assertRaises(ValidationError):
+            self.Session.create({
+                'course_id': self.course.id,
+                'instructor_id': self.instructor.id,
+                'start_date': start + timedelta(days=2),
+                'end_date': start + timedelta(days=3),
+            })
+        with self.assertRaises(ValidationError):
+            self.Session.create({
+                'course_id': self.course.id,
+                'location': ' room 202',
+                'start_date': start + timedelta(days=1),
+                'end_date': start + timedelta(days=1),
+            })
+
+        online = self.Session.create({
+            'course_id': self.course.id,
+            'location': 'Room 202',
+            'is_online': True,
+            'start_date': start,
+            'end_date': start,
+        })
+        self.assertTrue(online, "Online sessions should not book the room")
+        next_session = self.Session.create({
+            'course_id': self.course.id,
+            'instructor_id': self.instructor.id,
+            'location': 'Room 202',
+            'start_date': start + timedelta(days=3),
+            'end_date': start + timedelta(days=4),
+        })
+        session.action_cancel_session()
+        next_session.write({'start_date': start + timedelta(days=1)})
+        self.assertEqual(next_session.start_date, start + timedelta(days=1),
+                         "Cancelled sessions should free the instructor and the room")
+
+    def test_13_cron_updates_session_states(self):
+        """Test sessions move to ongoing and completed from their dates"""
+        today = date.today()
+        sessions = self.Session.create([{
+            'course_id': self.course.id,
+            'start_date': start,
+            'end_date': end,
+        } for start, end in [
+            (today - timedelta(days=1), today + timedelta(days=1)),
+            (today - timedelta(days=3), today - timedelta(days=2)),
+            (today + timedelta(days=5), today + timedelta(days=6)),
+            (today - timedelta(days=1), today),
+        ]])
+        sessions[:3].action_confirm_schedule()
+        course_messages = self.course.message_ids
+
+        self.Session._cron_update_session_states()
+        self.assertEqual(
+            sessions.mapped('state'), ['ongoing', 'completed', 'scheduled', 'draft'],
+            "Only scheduled sessions should follow their dates"
+        )
+        self.assertEqual(len(self.course.message_ids - course_messages), 2,
+                         "One summary per course and transition")
+
+        sessions[0].write({'end_date': today - timedelta(days=1)})
+        self.Session._cron_update_session_states()
+        self.assertEqual(sessions[0].state, 'completed', "Ongoing sessions should complete once ended")
+
 
 class TestTrainingEnrollment(TransactionCase):
     """Test cases for training.enrollment model"""
@@ -633,6 +1095,151 @@ class TestTrainingEnrollment(TransactionCase):
         
         self.assertEqual(len(certificates), 1, "Should not create duplicate certificates")
 
+    def test_11_bulk_mode_logs_one_summary(self):
+        """Test bulk operations skip per-record chatter and log one summary per session"""
+        enrollments = self.Enrollment.bulk_create([
+            {'employee_id': employee.id, 'session_id': self.session.id}
+            for employee in (self.employee1, self.employee2)
+        ])
+        session_messages = self.session.message_ids
+        enrollments.bulk_action('action_confirm')
+
+        self.assertEqual(set(enrollments.mapped('state')), {'confirmed'})
+        for enrollment in enrollments:
+            self.assertFalse(
+                enrollment.message_ids, "No per-record messages or tracking in bulk mode"
+            )
+        summaries = self.session.message_ids - session_messages
+        self.assertEqual(len(summaries), 1, "One audit summary per session")
+        self.assertIn(f'{min(enrollments.ids)}-{max(enrollments.ids)}', summaries.body)
+
+    def test_12_bulk_action_rejects_private_methods(self):
+        """Test bulk_action only runs workflow actions"""
+        with self.assertRaises(UserError):
+            self.Enrollment.bulk_action('_generate_certificate')
+
+    def test_13_schedule_conflicts(self):
+        """Test an employee cannot be confirmed in overlapping sessions"""
+        booked = self.Enrollment.create({
+            'employee_id': self.employee1.id,
+            'session_id': self.session.id,
+        })
+        booked.action_confirm()
+        overlapping = self.Enrollment.create({
+            'employee_id': self.employee1.id,
+            'session_id': self.non_cert_session.id,
+        })
+        self.assertTrue(overlapping.has_schedule_conflict, "The draft enrollment should be flagged")
+        with self.assertRaises(UserError):
+            overlapping.action_confirm()
+        with self.assertRaises(ValidationError):
+            overlapping.write({'state': 'confirmed'})
+
+        other = self.Enrollment.create({
+            'employee_id': self.employee2.id,
+            'session_id': self.non_cert_session.id,
+        })
+        result = (overlapping | other).bulk_action('action_confirm')
+        self.assertEqual(overlapping.state, 'draft', "Conflicting enrollments should be left in draft")
+        self.assertEqual(other.state, 'confirmed', "The rest of the batch should be confirmed")
+        self.assertEqual(result['params']['type'], 'warning', "Skipped enrollments should be reported")
+
+        cancelled = self.Enrollment.create({
+            'employee_id': self.employee2.id,
+            'session_id': self.session.id,
+        })
+        cancelled.action_cancel()
+        self.assertFalse(cancelled.has_schedule_conflict, "A cancelled enrollment never conflicts")
+        booked.action_cancel()
+        overlapping.invalidate_recordset(['has_schedule_conflict'])
+        self.assertFalse(overlapping.has_schedule_conflict, "A cancelled booking no longer conflicts")
+        overlapping.action_confirm()
+        self.assertEqual(overlapping.state, 'confirmed')
+
+    def test_14_session_close_out(self):
+        """Test closing out a session marks attendance, no-shows and issues certificates"""
+        self.session.action_confirm_schedule()
+        with self.assertRaises(UserError):
+            self.session.action_close_out()
+        self.session.write({
+            'start_date': date.today() - timedelta(days=1),
+            'end_date': date.today() - timedelta(days=1),
+        })
+        attendee, absentee = self.Enrollment.create([{
+            'employee_id': employee.id,
+            'session_id': self.session.id,
+        } for employee in (self.employee1, self.employee2)])
+        (attendee | absentee).action_confirm()
+        pending = self.Enrollment.create({
+            'employee_id': self.employee3.id,
+            'session_id': self.session.id,
+        })
+
+        self.session.action_close_out([attendee.id])
+        self.assertEqual(attendee.state, 'attended')
+        self.assertEqual(absentee.state, 'no_show', "Confirmed enrollments not attending are no-shows")
+        self.assertEqual(pending.state, 'cancelled', "Draft enrollments should be cancelled")
+        self.assertEqual(self.session.state, 'completed')
+        self.assertEqual(self.session.enrolled_count, 1, "No-shows no longer hold a seat")
+        certificates = self.Certificate.search([('enrollment_id', 'in', (attendee | absentee).ids)])
+        self.assertEqual(certificates.enrollment_id, attendee, "Only attendees should get a certificate")
+
+        attendee._issue_certificates()
+        self.assertEqual(
+            self.Certificate.search_count([('enrollment_id', '=', attendee.id)]), 1,
+            "Certificates should not be issued twice"
+        )
+
+        user = self.env['res.users'].create({
+            'name': 'Close Out User',
+            'login': 'close_out_user@test.com',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        with self.assertRaises(AccessError):
+            self.session.with_user(user).action_close_out()
+
+    def test_15_session_cancellation_cascades(self):
+        """Test cancelling a session cancels its enrollments and offers the next session"""
+        next_session = self.Session.create({
+            'course_id': self.course.id,
+            'start_date': date.today() + timedelta(days=14),
+            'end_date': date.today() + timedelta(days=14),
+            'capacity': 5,
+        })
+        confirmed, draft = self.Enrollment.create([{
+            'employee_id': employee.id,
+            'session_id': self.session.id,
+        } for employee in (self.employee1, self.employee2)])
+        confirmed.action_confirm()
+        self.employee1.work_contact_id.email = 'cancelled.session@test.com'
+        messages = self.env['mail.message'].search([])
+
+        user = self.env['res.users'].create({
+            'name': 'Cancel User',
+            'login': 'cancel_user@test.com',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        with self.assertRaises(AccessError):
+            self.session.with_user(user).action_cancel_session()
+        self.assertTrue(self.Session.browse().action_cancel_session(), "Nothing to cancel")
+
+        self.session.action_cancel_session(reenroll=True)
+        self.assertEqual(self.session.state, 'cancelled')
+        self.assertEqual(set((confirmed | draft).mapped('state')), {'cancelled'})
+        self.assertEqual(self.session.enrolled_count, 0, "Cancelled enrollments should free their seats")
+        reenrolled = self.Enrollment.search([('session_id', '=', next_session.id)])
+        self.assertEqual(reenrolled.employee_id, self.employee1 | self.employee2)
+        self.assertEqual(set(reenrolled.mapped('state')), {'draft'}, "Re-enrollments await confirmation")
+        notices = (self.env['mail.message'].search([]) - messages).filtered(
+            lambda m: m.subject == 'Training Sessions Cancelled'
+        )
+        self.assertEqual(len(notices), len(self.employee1.work_contact_id | self.employee2.work_contact_id),
+                         "One notification per employee with a contact")
+        self.assertIn(next_session.name, notices[0].body)
+        mails = self.env['mail.mail'].search([('mail_message_id', 'in', notices.ids)])
+        self.assertTrue(mails, "Notices to contacts with an email should be mailed")
+        self.assertEqual(set(mails.mapped('state')), {'outgoing'}, "Notices should be queued, not sent")
+
 
 class TestSecurity(TransactionCase):
     """Security test cases - employee cannot access another's certificate"""
@@ -725,6 +1332,24 @@ class TestSecurity(TransactionCase):
         except AccessError:
             self.fail("Admin should have access to all certificates")
 
+    def test_05_owner_follows_employee_user(self):
+        """Test record rules follow the user of the employee when it changes"""
+        self.assertEqual(self.certificate2.owner_user_id, self.user2)
+        user3 = self.User.create({
+            'name': 'Test User 3',
+            'login': 'user3@test.com',
+            'email': 'user3@test.com',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        self.employee2.user_id = user3
+        self.assertEqual(self.certificate2.owner_user_id, user3, "The owner should follow the employee user")
+        self.assertEqual(
+            self.Certificate.with_user(user3).search([]), self.certificate2,
+            "The new user should see the employee certificates"
+        )
+        self.assertFalse(self.Certificate.with_user(self.user2).search([]),
+                         "The former user should lose access")
+
 
 class TestIntegration(TransactionCase):
     """Integration tests for complete workflows"""
@@ -835,3 +1460,736 @@ class TestIntegration(TransactionCase):
         
         with self.assertRaises(UserError):
             enrollment4.action_confirm()
+
+
+class TestComplianceGap(TransactionCase):
+    """Test cases for the required training compliance matrix"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Gap = cls.env['training.compliance.gap']
+        cls.Certificate = cls.env['training.certificate']
+        cls.Employee = cls.env['hr.employee']
+
+        cls.course = cls.env['training.course'].create({
+            'name': 'Forklift Safety',
+            'is_certification': True,
+        })
+        cls.department_course = cls.env['training.course'].create({
+            'name': 'Data Protection',
+            'is_certification': True,
+        })
+        cls.job = cls.env['hr.job'].create({
+            'name': 'Forklift Operator',
+            'required_course_ids': [(6, 0, [cls.course.id])],
+        })
+        cls.parent_department = cls.env['hr.department'].create({
+            'name': 'Operations',
+            'required_course_ids': [(6, 0, [cls.department_course.id])],
+        })
+        cls.child_department = cls.env['hr.department'].create({
+            'name': 'Warehouse',
+            'parent_id': cls.parent_department.id,
+        })
+
+        cls.employee_missing = cls.Employee.create({
+            'name': 'Operator Missing',
+            'job_id': cls.job.id,
+        })
+        cls.employee_expiring = cls.Employee.create({
+            'name': 'Operator Expiring',
+            'job_id': cls.job.id,
+        })
+        cls.employee_valid = cls.Employee.create({
+            'name': 'Operator Valid',
+            'job_id': cls.job.id,
+            'department_id': cls.child_department.id,
+        })
+
+        cls.Certificate.create({
+            'employee_id': cls.employee_expiring.id,
+            'course_id': cls.course.id,
+            'issue_date': date.today() - relativedelta(years=2) + timedelta(days=10),
+        })
+        cls.Certificate.create({
+            'employee_id': cls.employee_valid.id,
+            'course_id': cls.course.id,
+            'issue_date': date.today(),
+        })
+
+    def _status(self, employee, course):
+        gap = self.Gap.search([
+            ('employee_id', '=', employee.id),
+            ('course_id', '=', course.id),
+        ])
+        return gap.status
+
+    def test_01_matrix_statuses(self):
+        """Test coverage status is computed per employee and required course"""
+        self.Gap._refresh_matrix(force=True)
+
+        self.assertEqual(self._status(self.employee_missing, self.course), 'missing')
+        self.assertEqual(self._status(self.employee_expiring, self.course), 'expiring')
+        self.assertEqual(self._status(self.employee_valid, self.course), 'valid')
+
+    def test_02_department_rules_apply_to_sub_departments(self):
+        """Test department requirements are inherited by sub-departments"""
+        self.Gap._refresh_matrix(force=True)
+
+        self.assertEqual(
+            self._status(self.employee_valid, self.department_course), 'missing',
+            "Sub-department employees should inherit parent department requirements"
+        )
+        self.assertFalse(
+            self._status(self.employee_missing, self.department_course),
+            "Employees outside the department should not get its requirements"
+        )
+
+    def test_03_matrix_cached_per_day(self):
+        """Test the matrix is only rebuilt once per day unless invalidated"""
+        self.Gap._refresh_matrix(force=True)
+        self.assertFalse(self.Gap._refresh_matrix(), "Matrix should be served from today's snapshot")
+
+        self.job.write({'required_course_ids': [(5, 0, 0)]})
+        self.assertTrue(self.Gap._refresh_matrix(), "Changing requirements should invalidate the snapshot")
+        self.assertFalse(self._status(self.employee_missing, self.course))
+
+
+class TestRenewalPlanner(TransactionCase):
+    """Test cases for the renewal session planner"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Certificate = cls.env['training.certificate']
+        cls.Planner = cls.env['training.renewal.planner']
+
+        cls.course = cls.env['training.course'].create({
+            'name': 'First Aid',
+            'duration_days': 2,
+            'is_certification': True,
+        })
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': f'Renewal Employee {index}'} for index in range(5)
+        ])
+        cls.certificates = cls.Certificate.create([{
+            'employee_id': employee.id,
+            'course_id': cls.course.id,
+            'issue_date': date.today() - relativedelta(years=2) + timedelta(days=40 + index * 5),
+        } for index, employee in enumerate(cls.employees)])
+
+    def test_01_solver_packs_by_deadline(self):
+        """Test the solver opens the minimal number of sessions before each deadline"""
+        plan_start = date(2030, 1, 7)
+        demands = [(plan_start + timedelta(days=days), days) for days in (30, 10, 20, 40, 50)]
+
+        sessions = plan_renewal_sessions(demands, 2, 1, plan_start, avoid_weekends=False)
+
+        self.assertEqual(len(sessions), 3, "Five participants with two seats need three sessions")
+        self.assertEqual(sessions[0]['payloads'], [10, 20], "Earliest deadlines are packed first")
+        for session in sessions:
+            self.assertFalse(session['late'])
+
+    def test_02_solver_respects_instructor_bookings(self):
+        """Test a busy instructor moves the session earlier"""
+        plan_start = date(2030, 1, 7)
+        deadline = plan_start + timedelta(days=10)
+        bookings = {1: [(deadline - timedelta(days=1), deadline)]}
+
+        sessions = plan_renewal_sessions([(deadline, 'a')], 5, 1, plan_start,
+                                         instructor_bookings=bookings, avoid_weekends=False)
+
+        self.assertEqual(sessions[0]['instructor_id'], 1)
+        self.assertEqual(sessions[0]['start_date'], deadline - timedelta(days=2))
+        self.assertEqual(len(bookings[1]), 2, "Planned session should be booked for the instructor")
+
+    def test_03_plan_and_create_sessions(self):
+        """Test the wizard plans and bulk-creates sessions and enrollments"""
+        planner = self.Planner.create({
+            'horizon_months': 6,
+            'lead_days': 3,
+            'capacity': 2,
+            'course_ids': [(6, 0, [self.course.id])],
+        })
+        planner.action_compute_plan()
+
+        self.assertEqual(planner.session_count, 3)
+        self.assertEqual(planner.certificate_count, 5)
+        for line in planner.line_ids:
+            for certificate in line.certificate_ids:
+                self.assertLess(line.end_date, certificate.expiry_date, "Session must end before expiry")
+
+        action = planner.action_create_sessions()
+        sessions = self.env['training.session'].search(action['domain'])
+        self.assertEqual(len(sessions), 3)
+        self.assertEqual(
+            set(sessions.enrollment_ids.employee_id.ids), set(self.employees.ids),
+            "Every planned employee should be enrolled"
+        )
+
+    def test_04_plan_avoids_room_bookings(self):
+        """Test sessions planned in one room never overlap its bookings"""
+        self.env['training.session'].create({
+            'course_id': self.course.id,
+            'location': 'Renewal Room',
+            'start_date': date.today() + timedelta(days=1),
+            'end_date': date.today() + timedelta(days=50),
+        })
+        planner = self.Planner.create({
+            'horizon_months': 6,
+            'lead_days': 3,
+            'capacity': 1,
+            'avoid_weekends': False,
+            'location': 'renewal room ',
+            'course_ids': [(6, 0, [self.course.id])],
+        })
+        planner.action_compute_plan()
+        self.assertEqual(planner.session_count, 5)
+        action = planner.action_create_sessions()
+
+        sessions = self.env['training.session'].search(action['domain'], order='start_date')
+        booked = sessions.filtered('location')
+        self.assertTrue(booked, "Sessions should be planned in the room")
+        self.assertEqual(len(booked), 5, "A free day should be found for every session")
+        self.assertFalse(booked.filtered(lambda s: s.start_date <= date.today() + timedelta(days=50)),
+                         "Planned sessions should avoid the existing booking")
+        for previous, session in zip(booked, booked[1:]):
+            self.assertLess(previous.end_date, session.start_date, "Planned sessions should not share the room")
+
+
+class TestTrainingArchive(TransactionCase):
+    """Test cases for the enrollment and certificate archive"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Archive = cls.env['training.archive']
+        cls.Certificate = cls.env['training.certificate']
+        cls.env['ir.config_parameter'].sudo().set_param('employee_training.archive_retention_months', 12)
+
+        cls.course = cls.env['training.course'].create({
+            'name': 'Archived Course',
+            'is_certification': True,
+            'validity_months': 12,
+        })
+        cls.employee = cls.env['hr.employee'].create({'name': 'Archive Employee'})
+        cls.old_session = cls.env['training.session'].create({
+            'course_id': cls.course.id,
+            'start_date': date.today() - relativedelta(years=3),
+            'end_date': date.today() - relativedelta(years=3),
+        })
+        cls.recent_session = cls.env['training.session'].create({
+            'course_id': cls.course.id,
+            'start_date': date.today() - timedelta(days=30),
+            'end_date': date.today() - timedelta(days=30),
+        })
+        cls.old_enrollment = cls.env['training.enrollment'].create({
+            'employee_id': cls.employee.id,
+            'session_id': cls.old_session.id,
+            'state': 'attended',
+        })
+        cls.recent_enrollment = cls.env['training.enrollment'].create({
+            'employee_id': cls.employee.id,
+            'session_id': cls.recent_session.id,
+            'state': 'attended',
+        })
+        cls.old_certificate = cls.Certificate.create({
+            'employee_id': cls.employee.id,
+            'course_id': cls.course.id,
+            'issue_date': date.today() - relativedelta(years=3),
+        })
+        cls.recent_certificate = cls.Certificate.create({
+            'employee_id': cls.employee.id,
+            'course_id': cls.course.id,
+            'issue_date': date.today() - timedelta(days=30),
+        })
+
+    def test_01_cron_moves_old_records(self):
+        """Test old enrollments and certificates are moved to the archive"""
+        old_enrollment_id = self.old_enrollment.id
+        old_certificate_name = self.old_certificate.name
+        self.old_enrollment.message_post(body='Attended the legacy session')
+        self.assertEqual(self.old_session.enrolled_count, 1)
+        self.Archive._cron_archive_history()
+
+        self.env.cr.execute(
+            "SELECT enrolled_count, available_seats FROM training_session WHERE id = %s", [self.old_session.id]
+        )
+        self.assertEqual(self.env.cr.fetchone(), (0, self.old_session.capacity),
+                         "Seat counters of the sessions should follow the moved enrollments")
+
+        self.assertFalse(self.old_enrollment.exists(), "Old enrollment should leave the hot table")
+        self.assertFalse(self.old_certificate.exists(), "Long-expired certificate should leave the hot table")
+        self.assertTrue(self.recent_enrollment.exists())
+        self.assertTrue(self.recent_certificate.exists())
+
+        archived_enrollment = self.env['training.enrollment.archive'].search([
+            ('original_id', '=', old_enrollment_id),
+        ])
+        self.assertEqual(archived_enrollment.employee_id, self.employee)
+        self.assertEqual(archived_enrollment.session_name, self.old_session.name)
+        self.assertFalse(self.env['mail.message'].search_count([
+            ('model', '=', 'training.enrollment'), ('res_id', '=', old_enrollment_id),
+        ]), "The chatter of moved records should be dropped")
+        archived_certificate = self.env['training.certificate.archive'].search([
+            ('name', '=', old_certificate_name),
+        ])
+        self.assertEqual(archived_certificate.course_id, self.course)
+
+    def test_02_archive_runs_in_batches(self):
+        """Test each batch moves at most the batch size"""
+        self.env.flush_all()
+        cutoff = date.today() - relativedelta(months=12)
+        moved = self.env['training.enrollment.archive']._archive_enrollments(cutoff, 1)
+        self.assertEqual(moved, 1)
+        moved = self.env['training.enrollment.archive']._archive_enrollments(cutoff, 1)
+        self.assertEqual(moved, 0, "Nothing left to archive")
+
+
+class TestHistoryImport(TransactionCase):
+    """Test cases for the streaming training history import"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Import = cls.env['training.history.import']
+        cls.course = cls.env['training.course'].create({
+            'name': 'Legacy Course',
+            'is_certification': True,
+            'validity_months': 12,
+        })
+        cls.employee = cls.env['hr.employee'].create({
+            'name': 'Legacy Employee',
+            'barcode': 'LEG001',
+        })
+
+    def _run_import(self, import_type, content):
+        wizard = self.Import.create({
+            'import_type': import_type,
+            'file': base64.b64encode(content.encode()),
+            'filename': 'history.csv',
+        })
+        wizard.action_import()
+        self.Import._cron_process_imports()
+        return wizard
+
+    def test_01_import_certificates(self):
+        """Test certificates keep their number and bad rows are reported"""
+        wizard = self._run_import('certificate', (
+            "employee,course,certificate_number,issue_date,expiry_date\n"
+            "LEG001,Legacy Course,OLD-0001,2020-01-15,\n"
+            "Unknown Person,Legacy Course,OLD-0002,2020-01-15,\n"
+            "legacy employee,Legacy Course,,2024-03-01,2030-03-01\n"
+        ))
+
+        self.assertEqual(wizard.imported_count, 2)
+        self.assertEqual(wizard.rejected_count, 1)
+        self.assertIn(b'Unknown Person', base64.b64decode(wizard.rejected_file))
+
+        certificate = self.env['training.certificate'].search([('name', '=', 'OLD-0001')])
+        self.assertEqual(certificate.employee_id, self.employee)
+        self.assertEqual(certificate.expiry_date, date(2021, 1, 15), "Expiry derived from course validity")
+        self.assertEqual(certificate.state, 'expired')
+        generated = self.env['training.certificate'].search([
+            ('employee_id', '=', self.employee.id),
+            ('issue_date', '=', date(2024, 3, 1)),
+        ])
+        self.assertEqual(generated.expiry_date, date(2030, 3, 1), "Expiry from the file is kept")
+        self.assertNotEqual(generated.name, 'New')
+
+    def test_02_import_enrollments_creates_sessions(self):
+        """Test enrollments are attached to historical sessions created on the fly"""
+        wizard = self._run_import('enrollment', (
+            "employee,course,start_date,end_date,state\n"
+            "LEG001,Legacy Course,2019-05-06,2019-05-07,attended\n"
+            "LEG001,Legacy Course,2019-05-06,2019-05-07,attended\n"
+        ))
+
+        self.assertEqual(wizard.imported_count, 1)
+        self.assertEqual(wizard.rejected_count, 1, "Duplicate enrollment is rejected")
+        enrollment = self.env['training.enrollment'].search([('employee_id', '=', self.employee.id)])
+        self.assertEqual(enrollment.session_id.state, 'completed')
+        self.assertEqual(enrollment.session_id.enrolled_count, 1)
+        self.assertEqual(enrollment.name, f'{self.employee.name} - {enrollment.session_id.name}')
+
+    def test_03_import_resumes_after_processed_line(self):
+        """Test an import run stopped after a batch resumes at the next line"""
+        wizard = self.Import.create({
+            'import_type': 'certificate',
+            'file': base64.b64encode((
+                "employee,course,certificate_number,issue_date\n"
+                "LEG001,Legacy Course,OLD-0101,2020-01-15\n"
+                "Unknown Person,Legacy Course,OLD-0102,2020-01-15\n"
+                "LEG001,Legacy Course,OLD-0103,2021-01-15\n"
+            ).encode()),
+            'filename': 'history.csv',
+            'batch_size': 1,
+        })
+        wizard.action_import()
+        self.assertEqual(wizard.state, 'running')
+
+        self.assertFalse(wizard._process_batches(1), "One batch out of three")
+        self.assertEqual(wizard.state, 'running')
+        self.assertEqual(wizard.processed_line, 2)
+        self.assertEqual(wizard.processed_offset, len(
+            "employee,course,certificate_number,issue_date\n"
+            "LEG001,Legacy Course,OLD-0101,2020-01-15\n"
+        ), "The next run should resume from the byte offset of line 3")
+        self.assertEqual(wizard.imported_count, 1)
+
+        self.Import._cron_process_imports()
+        self.assertEqual(wizard.state, 'done')
+        self.assertEqual(wizard.processed_line, 4)
+        self.assertEqual((wizard.imported_count, wizard.rejected_count), (2, 1))
+        self.assertEqual(self.env['training.certificate'].search_count([
+            ('name', 'in', ['OLD-0101', 'OLD-0103']),
+        ]), 2, "Rows of the first run are not imported twice")
+        self.assertIn(b'Unknown Person', base64.b64decode(wizard.rejected_file))
+
+    def test_04_import_no_show_enrollments(self):
+        """Test no-show history is imported like the other final states"""
+        wizard = self._run_import('enrollment', (
+            "employee,course,start_date,end_date,state\n"
+            "LEG001,Legacy Course,2018-02-05,2018-02-06,no_show\n"
+        ))
+
+        self.assertEqual((wizard.imported_count, wizard.rejected_count), (1, 0))
+        enrollment = self.env['training.enrollment'].search([('employee_id', '=', self.employee.id)])
+        self.assertEqual(enrollment.state, 'no_show')
+
+
+class TestTrainingTranscripts(TransactionCase):
+    """Test cases for the batched employee transcript API"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.course = cls.env['training.course'].create({
+            'name': 'Transcript Course',
+            'is_certification': True,
+        })
+        cls.session = cls.env['training.session'].create({
+            'course_id': cls.course.id,
+            'start_date': date.today() + timedelta(days=10),
+            'end_date': date.today() + timedelta(days=10),
+        })
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': f'Transcript Employee {index}'} for index in range(3)
+        ])
+        cls.env['training.enrollment'].create([{
+            'employee_id': employee.id,
+            'session_id': cls.session.id,
+        } for employee in cls.employees])
+        cls.certificate = cls.env['training.certificate'].create({
+            'employee_id': cls.employees[0].id,
+            'course_id': cls.course.id,
+        })
+
+    def test_01_transcripts_fixed_queries(self):
+        """Test transcripts are complete and built from a fixed number of queries"""
+        Employee = self.env['hr.employee']
+        Employee.get_training_transcripts(self.employees[:1].ids)
+        with self.assertQueryCount(3):
+            transcripts = Employee.get_training_transcripts(self.employees.ids)
+
+        self.assertEqual([t['employee_id'] for t in transcripts], self.employees.ids)
+        first = transcripts[0]
+        self.assertEqual(len(first['enrollments']), 1)
+        self.assertEqual(first['enrollments'][0]['session_id'], self.session.id)
+        self.assertEqual(first['certificates'][0]['number'], self.certificate.name)
+        self.assertEqual(first['status']['upcoming_sessions'], 1)
+        self.assertEqual(first['status']['certifications'][0]['state'], 'valid')
+        self.assertFalse(transcripts[1]['certificates'])
+
+    def test_02_transcripts_require_manager(self):
+        """Test regular users cannot read transcripts"""
+        user = self.env['res.users'].create({
+            'name': 'Transcript User',
+            'login': 'transcript_user',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        with self.assertRaises(AccessError):
+            self.env['hr.employee'].with_user(user).get_training_transcripts(self.employees.ids)
+
+
+class TestChangeFeed(TransactionCase):
+    """Test cases for the incremental change feed"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('employee_training.change_feed_lag', 0)
+        cls.course = cls.env['training.course'].create({'name': 'Feed Course'})
+        cls.session = cls.env['training.session'].create({
+            'course_id': cls.course.id,
+            'start_date': date.today() + timedelta(days=5),
+            'end_date': date.today() + timedelta(days=5),
+        })
+        cls.enrollment = cls.env['training.enrollment'].create({
+            'employee_id': cls.env['hr.employee'].create({'name': 'Feed Employee'}).id,
+            'session_id': cls.session.id,
+        })
+        # Everything happens in one transaction: move the initial rows back
+        # in time so later writes are seen as newer changes.
+        cls.env.flush_all()
+        for record in (cls.course, cls.session, cls.enrollment):
+            cls.env.cr.execute(
+                "UPDATE %s SET write_date = write_date - interval '1 hour' WHERE id = %%s" % record._table,
+                [record.id]
+            )
+        cls.env.invalidate_all()
+
+    def _sync(self, model, cursor=None):
+        records, deleted = [], []
+        while True:
+            page = self.env[model].get_changes(cursor=cursor, limit=50)
+            records += page['records']
+            deleted += page['deleted']
+            cursor = page['cursor']
+            if not page['has_more']:
+                return records, deleted, cursor
+
+    def test_01_incremental_sync(self):
+        """Test a sync returns only rows changed since the cursor"""
+        records, __, cursor = self._sync('training.session')
+        self.assertIn(self.session.id, [record['id'] for record in records])
+
+        records, deleted, __ = self._sync('training.session', cursor)
+        self.assertFalse(records, "Nothing changed since the last sync")
+        self.assertFalse(deleted)
+
+        self.session.write({'location': 'Room 2'})
+        records, __, __ = self._sync('training.session', cursor)
+        self.assertEqual([record['id'] for record in records], [self.session.id])
+        self.assertEqual(records[0]['location'], 'Room 2')
+
+    def test_02_deletions_are_reported(self):
+        """Test deleted rows come back as tombstones"""
+        __, __, cursor = self._sync('training.enrollment')
+        enrollment_id = self.enrollment.id
+        self.enrollment.unlink()
+
+        records, deleted, __ = self._sync('training.enrollment', cursor)
+        self.assertEqual(deleted, [enrollment_id])
+        self.assertNotIn(enrollment_id, [record['id'] for record in records])
+
+    def test_03_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        with self.assertRaises(UserError):
+            self.env['training.course'].get_changes(cursor='not-a-cursor')
+
+
+class _WebhookStubHandler(BaseHTTPRequestHandler):
+    """Local webhook receiver recording the posted batches"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.received.append(json.loads(body))
+        self.send_response(self.server.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestOutbox(TransactionCase):
+    """Test cases for the transactional outbox and webhook delivery"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), _WebhookStubHandler)
+        cls.server.received = []
+        cls.server.status = 200
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+        cls.Delivery = cls.env['training.outbox.delivery']
+        cls.webhook = cls.env['training.webhook'].create({
+            'name': 'Badge Access',
+            'url': 'http://127.0.0.1:%s/hook' % cls.server.server_port,
+        })
+        cls.course = cls.env['training.course'].create({
+            'name': 'Outbox Course',
+            'is_certification': True,
+        })
+        cls.session = cls.env['training.session'].create({
+            'course_id': cls.course.id,
+            'start_date': date.today() + timedelta(days=3),
+            'end_date': date.today() + timedelta(days=3),
+        })
+        cls.employees = cls.env['hr.employee'].create([
+            {'name': f'Outbox Employee {index}'} for index in range(2)
+        ])
+
+    def setUp(self):
+        super().setUp()
+        self.server.received.clear()
+        self.server.status = 200
+
+    def _received_events(self):
+        return [event for batch in self.server.received for event in batch['events']]
+
+    def test_01_events_delivered_in_one_batch(self):
+        """Test confirmations are written to the outbox and posted together"""
+        enrollments = self.env['training.enrollment'].create([{
+            'employee_id': employee.id,
+            'session_id': self.session.id,
+        } for employee in self.employees])
+        enrollments.action_confirm()
+        self.assertEqual(
+            self.Delivery.search_count([('webhook_id', '=', self.webhook.id), ('state', '=', 'pending')]), 2,
+            "One pending delivery per event and webhook"
+        )
+
+        self.Delivery._cron_deliver_outbox()
+
+        self.assertEqual(len(self.server.received), 1, "Events should be posted as one batch")
+        events = self._received_events()
+        self.assertEqual([event['type'] for event in events], ['enrollment.confirmed'] * 2)
+        self.assertEqual({event['payload']['id'] for event in events}, set(enrollments.ids))
+        self.assertFalse(self.Delivery.search_count([('webhook_id', '=', self.webhook.id), ('state', '=', 'pending')]))
+
+    def test_02_failed_batch_is_retried_in_order(self):
+        """Test failures back off and hold later events of the same aggregate"""
+        enrollment = self.env['training.enrollment'].create({
+            'employee_id': self.employees[0].id,
+            'session_id': self.session.id,
+        })
+        enrollment.action_confirm()
+        self.server.status = 500
+        self.Delivery._deliver_pending(self.webhook)
+
+        delivery = self.Delivery.search([('webhook_id', '=', self.webhook.id)], order='id desc', limit=1)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertEqual(delivery.state, 'pending')
+        self.assertGreater(delivery.next_attempt, fields.Datetime.now(), "Retry should be delayed")
+
+        self.server.received.clear()
+        self.server.status = 200
+        enrollment.action_mark_attended()
+        self.Delivery._deliver_pending(self.webhook)
+        self.assertNotIn(
+            'enrollment.attended', [event['type'] for event in self._received_events()],
+            "A later event must wait for the earlier one of the same enrollment"
+        )
+
+    def test_03_certificate_transitions_published(self):
+        """Test issued certificates and SQL status refreshes are published"""
+        certificate = self.env['training.certificate'].create({
+            'employee_id': self.employees[0].id,
+            'course_id': self.course.id,
+            'issue_date': date.today() - relativedelta(years=3),
+        })
+        self.assertEqual(certificate.state, 'expired')
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE training_certificate SET state = 'valid' WHERE id = %s", [certificate.id]
+        )
+        certificate._sql_refresh_expiry_status(certificate.ids)
+        self.Delivery._deliver_pending(self.webhook)
+
+        events = [event for event in self._received_events() if event['payload']['id'] == certificate.id]
+        self.assertEqual([event['type'] for event in events], ['certificate.issued', 'certificate.state_changed'])
+        self.assertEqual(events[1]['payload']['previous_state'], 'valid')
+        self.assertEqual(events[1]['payload']['state'], 'expired')
+
+    def test_04_webhooks_managed_by_administrators(self):
+        """Test only administrators configure where training data is posted"""
+        manager = self.env['res.users'].create({
+            'name': 'Webhook Manager',
+            'login': 'webhook_manager@test.com',
+            'groups_id': [(6, 0, [self.env.ref('hr.group_hr_manager').id])],
+        })
+        with self.assertRaises(AccessError):
+            self.env['training.webhook'].with_user(manager).create({
+                'name': 'Exfiltration',
+                'url': 'https://example.com/hook',
+            })
+        with self.assertRaises(AccessError):
+            self.webhook.with_user(manager).write({'url': 'https://example.com/hook'})
+        with self.assertRaises(ValidationError):
+            self.webhook.write({'url': 'file:///etc/passwd'})
+
+
+
+class TestDepartmentKpi(TransactionCase):
+    """Test cases for the department KPI rollup"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Kpi = cls.env['training.department.kpi']
+        cls.root = cls.env['hr.department'].create({'name': 'KPI Operations'})
+        cls.child = cls.env['hr.department'].create({'name': 'KPI Field', 'parent_id': cls.root.id})
+        cls.manager = cls.env['hr.employee'].create({'name': 'KPI Manager', 'department_id': cls.root.id})
+        cls.technicians = cls.env['hr.employee'].create([
+            {'name': f'KPI Technician {index}', 'department_id': cls.child.id} for index in range(2)
+        ])
+        course = cls.env['training.course'].create({'name': 'KPI Course', 'duration_days': 2})
+        session = cls.env['training.session'].create({
+            'course_id': course.id,
+            'start_date': date.today() - timedelta(days=3),
+            'end_date': date.today() - timedelta(days=2),
+        })
+        cls.enrollments = cls.env['training.enrollment'].create([{
+            'employee_id': employee.id,
+            'session_id': session.id,
+        } for employee in cls.technicians])
+        cls.enrollments.action_confirm()
+        cls.enrollments[0].action_mark_attended()
+        certification = cls.env['training.course'].create({
+            'name': 'KPI Certification',
+            'is_certification': True,
+        })
+        cls.env['training.certificate'].create({
+            'employee_id': cls.manager.id,
+            'course_id': certification.id,
+            'issue_date': date.today() - relativedelta(years=3),
+        })
+
+    def _kpi(self, department):
+        return self.Kpi.search([('department_id', '=', department.id)])
+
+    def test_01_direct_and_rollup_kpis(self):
+        """Test direct figures and their rollup along the department tree"""
+        self.Kpi._refresh_kpis(full=True)
+        child, root = self._kpi(self.child), self._kpi(self.root)
+
+        self.assertEqual(child.parent_id, root, "Snapshot rows should follow the department tree")
+        self.assertEqual(child.direct_employee_count, 2)
+        self.assertEqual(child.direct_enrolled_count, 2)
+        self.assertEqual(child.direct_completion_rate, 50.0)
+        self.assertEqual(child.direct_training_hours, 16.0, "Two attended days at 8 hours a day")
+        self.assertEqual(root.direct_employee_count, 1)
+        self.assertEqual(root.direct_overdue_count, 1)
+        self.assertEqual(root.total_employee_count, 3)
+        self.assertEqual(root.total_overdue_count, 1)
+        self.assertEqual(root.total_completion_rate, 50.0)
+        self.assertEqual(root.total_training_hours, 16.0)
+
+    def test_02_incremental_refresh(self):
+        """Test changed departments and their ancestors are refreshed incrementally"""
+        self.Kpi._refresh_kpis(full=True)
+        self.enrollments[1].action_mark_attended()
+
+        self.assertTrue(self.Kpi._refresh_kpis(), "The enrollment change should be picked up")
+        self.assertEqual(self._kpi(self.child).direct_completion_rate, 100.0)
+        self.assertEqual(self._kpi(self.root).total_attended_count, 2)
+        self.assertEqual(self._kpi(self.root).total_training_hours, 32.0)
+
+    def test_03_departments_left_are_refreshed(self):
+        """Test departments employees moved out of and deleted records are refreshed"""
+        self.Kpi._refresh_kpis(full=True)
+        self.technicians[1].department_id = self.root
+
+        self.assertTrue(self.Kpi._refresh_kpis())
+        self.assertEqual(self._kpi(self.child).direct_employee_count, 1, "The department left is refreshed")
+        self.assertEqual(self._kpi(self.root).direct_employee_count, 2)
+        self.assertEqual(self._kpi(self.root).total_employee_count, 3)
+
+        self.env['training.certificate'].search([('employee_id', '=', self.manager.id)]).unlink()
+        self.assertTrue(self.Kpi._refresh_kpis())
+        self.assertEqual(self._kpi(self.root).direct_overdue_count, 0, "Deleted certificates are dropped")
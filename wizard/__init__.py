@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+from . import training_session_reschedule
+from . import training_session_close_out
+from . import training_renewal_planner
+from . import training_history_import
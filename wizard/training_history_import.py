@@ -0,0 +1,567 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import csv
+import io
+import threading
+from datetime import date, datetime
+
+from odoo import models, fields, api, exceptions, _
+from odoo.tools import split_every
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+IMPORT_COLUMNS = {
+    'certificate': ['employee', 'course', 'certificate_number', 'issue_date', 'expiry_date'],
+    'enrollment': ['employee', 'course', 'start_date', 'end_date', 'state', 'enrollment_date'],
+}
+REQUIRED_COLUMNS = {
+    'certificate': {'employee', 'course', 'issue_date'},
+    'enrollment': {'employee', 'course', 'start_date'},
+}
+ENROLLMENT_STATES = {'draft', 'confirmed', 'attended', 'no_show', 'cancelled'}
+# Batches committed per cron run before the cron triggers itself again
+IMPORT_BATCHES_PER_RUN = 10
+
+
+def _normalize_header(header):
+    return str(header or '').strip().lower().replace(' ', '_')
+
+
+def _parse_date(value):
+    """Parse an ISO date or a spreadsheet date cell, None when empty"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return fields.Date.to_date(str(value).strip()[:10])
+
+
+class TrainingHistoryImport(models.Model):
+    _name = 'training.history.import'
+    _description = 'Import Training History'
+    _order = 'id desc'
+
+    import_type = fields.Selection([
+        ('certificate', 'Certificates'),
+        ('enrollment', 'Enrollments'),
+    ], string='Import', default='certificate', required=True)
+    file = fields.Binary(
+        string='File',
+        required=True,
+        help='CSV (UTF-8) or XLSX file. Employees are matched on badge ID, '
+             'work email or name, courses on their name.'
+    )
+    filename = fields.Char(
+        string='File Name'
+    )
+    source_file = fields.Binary(
+        string='CSV Source',
+        readonly=True,
+        help='XLSX files are converted once to CSV, which is read by byte offset'
+    )
+    batch_size = fields.Integer(
+        string='Batch Size',
+        default=5000,
+        required=True
+    )
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ], default='draft')
+    processed_line = fields.Integer(
+        string='Processed Lines',
+        readonly=True,
+        help='Last line of the file committed, the import resumes after it'
+    )
+    processed_offset = fields.Integer(
+        string='Processed Bytes',
+        readonly=True,
+        help='Byte offset of the CSV source after the last committed line'
+    )
+    imported_count = fields.Integer(
+        string='Imported Rows',
+        readonly=True
+    )
+    rejected_count = fields.Integer(
+        string='Rejected Rows',
+        readonly=True
+    )
+    rejected_file = fields.Binary(
+        string='Rejected Rows',
+        readonly=True
+    )
+    rejected_data = fields.Text(
+        readonly=True,
+        help='Rejected rows in CSV, appended batch by batch'
+    )
+    rejected_filename = fields.Char(
+        string='Rejected File Name',
+        readonly=True
+    )
+
+    @api.constrains('batch_size')
+    def _check_batch_size(self):
+        for wizard in self:
+            if wizard.batch_size < 1:
+                raise exceptions.ValidationError(
+                    'Batch size must be at least 1.'
+                )
+
+    # ------------------------------------------------------------------
+    # Parsing
+    # ------------------------------------------------------------------
+
+    def _open_file(self, field_name='file'):
+        """Open a file of the import from its attachment, without decoding it in memory"""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', field_name),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not attachment:
+            raise exceptions.UserError(_('The file to import is missing.'))
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+
+    def _is_xlsx(self):
+        return (self.filename or '').lower().endswith('.xlsx')
+
+    def _check_headers(self, headers):
+        headers = [_normalize_header(header) for header in headers or []]
+        missing = REQUIRED_COLUMNS[self.import_type] - set(headers)
+        if missing:
+            raise exceptions.UserError(_(
+                'Missing required column(s): %s', ', '.join(sorted(missing))
+            ))
+        return headers
+
+    def _iter_xlsx_rows(self):
+        if openpyxl is None:
+            raise exceptions.UserError(_('Reading XLSX files requires the openpyxl library.'))
+        with self._open_file() as stream:
+            workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+            yield from workbook.active.iter_rows(values_only=True)
+
+    def _validate_file(self):
+        """Check the columns of the uploaded file, reading its first row only"""
+        if self._is_xlsx():
+            rows = self._iter_xlsx_rows()
+            self._check_headers(next(rows, None))
+            rows.close()
+        else:
+            with self._open_file() as stream:
+                self._check_headers(next(csv.reader(self._iter_lines(stream)), None))
+
+    def _prepare_source(self):
+        """Convert an XLSX upload to the CSV source once, before the first batch.
+
+        Workbooks cannot be read from an offset, so reopening one per batch
+        would parse it from the start every time.
+        """
+        if not self._is_xlsx() or self.source_file:
+            return
+        data = io.StringIO()
+        writer = csv.writer(data)
+        for values in self._iter_xlsx_rows():
+            writer.writerow(['' if value is None else (
+                value.date().isoformat() if isinstance(value, datetime) else value
+            ) for value in values])
+        self.source_file = base64.b64encode(data.getvalue().encode())
+
+    @staticmethod
+    def _iter_lines(stream):
+        """Decoded lines of a binary stream, leaving its position after the last line read"""
+        for line in iter(stream.readline, b''):
+            yield line.decode('utf-8-sig')
+
+    def _iter_rows(self, offset=0, after_line=1):
+        """Yield ``(line_number, row_dict, end_offset)`` from the CSV source lazily.
+
+        The CSV reader pulls lines one record at a time, so the position of
+        the stream after a record is where the next one starts: a run resumes
+        by seeking to the offset committed by the previous one instead of
+        parsing the file from the start again.
+
+        :param offset: byte offset to resume from, 0 for the first record
+        :param after_line: line number of the record before that offset
+        """
+        with self._open_file('source_file' if self._is_xlsx() else 'file') as stream:
+            rows = csv.reader(self._iter_lines(stream))
+            headers = self._check_headers(next(rows, None))
+            if offset:
+                stream.seek(offset)
+            for line_number, values in enumerate(rows, start=after_line + 1):
+                if not any(value not in (None, '') for value in values):
+                    continue
+                yield line_number, dict(zip(headers, values)), stream.tell()
+
+    # ------------------------------------------------------------------
+    # Lookup maps, built once per run
+    # ------------------------------------------------------------------
+
+    def _build_employee_map(self):
+        """Map badge IDs, work emails and names to employee ids.
+
+        Keys shared by several employees map to None so that ambiguous rows
+        get rejected instead of silently attached to the wrong person.
+        """
+        employee_map = {}
+
+        def add(key, value):
+            if key:
+                key = key.strip().lower()
+                employee_map[key] = value if employee_map.get(key, value) == value else None
+
+        self.env['hr.employee'].flush_model(['name', 'barcode', 'work_email', 'company_id'])
+        self.env.cr.execute("SELECT id, name, barcode, work_email, company_id FROM hr_employee")
+        for employee_id, name, barcode, work_email, company_id in self.env.cr.fetchall():
+            for key in (barcode, work_email, name):
+                add(key, (employee_id, company_id))
+        return employee_map
+
+    def _build_course_map(self):
+        self.env['training.course'].flush_model(['name'])
+        self.env.cr.execute("SELECT id, name FROM training_course")
+        return {name.strip().lower(): course_id for course_id, name in self.env.cr.fetchall()}
+
+    def _build_session_map(self):
+        self.env['training.session'].flush_model(['course_id', 'start_date'])
+        self.env.cr.execute("SELECT id, course_id, start_date FROM training_session")
+        return {(course_id, start_date): session_id for session_id, course_id, start_date in self.env.cr.fetchall()}
+
+    # ------------------------------------------------------------------
+    # Row validation
+    # ------------------------------------------------------------------
+
+    def _resolve_common(self, row, maps):
+        employee = maps['employee'].get(str(row.get('employee') or '').strip().lower())
+        if not employee:
+            raise ValueError(_('Unknown or ambiguous employee "%s"', row.get('employee') or ''))
+        course_id = maps['course'].get(str(row.get('course') or '').strip().lower())
+        if not course_id:
+            raise ValueError(_('Unknown course "%s"', row.get('course') or ''))
+        return employee, course_id
+
+    def _validate_certificate_row(self, row, maps):
+        (employee_id, company_id), course_id = self._resolve_common(row, maps)
+        issue_date = _parse_date(row.get('issue_date'))
+        if not issue_date:
+            raise ValueError(_('Missing issue date'))
+        number = str(row.get('certificate_number') or '').strip() or None
+        if number:
+            if number in maps['seen_numbers']:
+                raise ValueError(_('Duplicate certificate number "%s"', number))
+            maps['seen_numbers'].add(number)
+        return {
+            'name': number,
+            'employee_id': employee_id,
+            'course_id': course_id,
+            'company_id': company_id or self.env.company.id,
+            'issue_date': issue_date,
+            'expiry_date': _parse_date(row.get('expiry_date')),
+        }
+
+    def _validate_enrollment_row(self, row, maps):
+        (employee_id, company_id), course_id = self._resolve_common(row, maps)
+        start_date = _parse_date(row.get('start_date'))
+        if not start_date:
+            raise ValueError(_('Missing start date'))
+        end_date = _parse_date(row.get('end_date')) or start_date
+        if end_date < start_date:
+            raise ValueError(_('End date must be after start date'))
+        state = str(row.get('state') or 'attended').strip().lower()
+        if state not in ENROLLMENT_STATES:
+            raise ValueError(_('Invalid status "%s"', state))
+        return {
+            'employee_id': employee_id,
+            'course_id': course_id,
+            'company_id': company_id or self.env.company.id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'state': state,
+            'enrollment_date': _parse_date(row.get('enrollment_date')) or start_date,
+        }
+
+    # ------------------------------------------------------------------
+    # Bulk inserts
+    # ------------------------------------------------------------------
+
+    def _insert_certificates(self, batch, maps):
+        """Insert a batch of certificates, keeping their original numbers"""
+        Certificate = self.env['training.certificate']
+        existing = {
+            name for (name,) in self._fetch(
+                "SELECT name FROM training_certificate WHERE name IN %s",
+                [tuple(vals['name'] for vals in batch.values() if vals['name']) or (None,)]
+            )
+        }
+        rejected = [(line, _('Certificate number "%s" already exists', vals['name']))
+                    for line, vals in batch.items() if vals['name'] in existing]
+        rows = {line: vals for line, vals in batch.items() if vals['name'] not in existing}
+        if not rows:
+            return 0, rejected
+
+        numbers = iter(Certificate._reserve_certificate_numbers(
+            sum(1 for vals in rows.values() if not vals['name'])
+        ))
+        now = fields.Datetime.now()
+        values = [(
+            vals['name'] or next(numbers), vals['employee_id'], vals['course_id'], vals['company_id'],
+            vals['issue_date'], vals['expiry_date'], self.env.uid, now, self.env.uid, now,
+        ) for vals in rows.values()]
+        inserted = self._fetch("""
+            INSERT INTO training_certificate
+                   (name, employee_id, owner_user_id, course_id, company_id, issue_date, expiry_date,
+                    is_superseded, expiry_notified, create_uid, create_date, write_uid, write_date)
+            SELECT v.name, e.id, e.user_id, v.course_id::int, v.company_id::int,
+                   v.issue_date::date, v.expiry_date::date, false, false,
+                   v.create_uid::int, v.create_date::timestamp, v.write_uid::int, v.write_date::timestamp
+              FROM (VALUES %s) AS v(name, employee_id, course_id, company_id, issue_date,
+                                    expiry_date, create_uid, create_date, write_uid, write_date)
+              JOIN hr_employee e ON e.id = v.employee_id::int
+         RETURNING id, expiry_date IS NULL
+        """ % ', '.join(['%s'] * len(values)), values)
+
+        # Expiry dates missing from the file are derived from the course validity
+        Certificate._sql_recompute_expiry([cert_id for cert_id, computed in inserted if computed])
+        Certificate._sql_refresh_expiry_status([cert_id for cert_id, computed in inserted if not computed])
+        return len(inserted), rejected
+
+    def _insert_enrollments(self, batch, maps):
+        """Insert a batch of enrollments, creating missing historical sessions.
+
+        The shared lookup maps are only updated once the batch went through,
+        so a batch rolled back to its savepoint leaves them untouched.
+        """
+        Session = self.env['training.session']
+        today = fields.Date.context_today(self)
+        missing_sessions = {}
+        for vals in batch.values():
+            key = (vals['course_id'], vals['start_date'])
+            if key in maps['session']:
+                continue
+            if key not in missing_sessions:
+                missing_sessions[key] = {
+                    'course_id': vals['course_id'],
+                    'start_date': vals['start_date'],
+                    'end_date': vals['end_date'],
+                    'capacity': 0,
+                    'state': 'completed' if vals['end_date'] < today else 'scheduled',
+                }
+            missing_sessions[key]['capacity'] += 1
+        new_sessions = {}
+        if missing_sessions:
+            for session_vals in missing_sessions.values():
+                session_vals['capacity'] = max(session_vals['capacity'], 20)
+            sessions = Session.with_bulk_mode().create(list(missing_sessions.values()))
+            new_sessions = dict(zip(missing_sessions, sessions.ids))
+            sessions.flush_recordset()
+
+        rejected, values, seen = [], [], set()
+        now = fields.Datetime.now()
+        for line, vals in batch.items():
+            key = (vals['course_id'], vals['start_date'])
+            session_id = maps['session'].get(key) or new_sessions[key]
+            if vals['state'] != 'cancelled':
+                pair = (vals['employee_id'], session_id)
+                if pair in maps['seen_enrollments'] or pair in seen:
+                    rejected.append((line, _('Employee is already enrolled in this session')))
+                    continue
+                seen.add(pair)
+            values.append((
+                vals['employee_id'], session_id, vals['state'], vals['enrollment_date'],
+                vals['company_id'], self.env.uid, now,
+            ))
+        if not values:
+            return 0, rejected
+
+        inserted = self._fetch("""
+            INSERT INTO training_enrollment
+                   (name, employee_id, owner_user_id, session_id, course_id, state, enrollment_date,
+                    start_date, end_date, company_id, create_uid, create_date, write_uid, write_date)
+            SELECT e.name || ' - ' || s.name, e.id, e.user_id, s.id, s.course_id, v.state,
+                   v.enrollment_date::date, s.start_date, s.end_date, v.company_id::int,
+                   v.uid::int, v.now::timestamp, v.uid::int, v.now::timestamp
+              FROM (VALUES %s) AS v(employee_id, session_id, state, enrollment_date, company_id, uid, now)
+              JOIN hr_employee e ON e.id = v.employee_id::int
+              JOIN training_session s ON s.id = v.session_id::int
+         RETURNING session_id
+        """ % ', '.join(['%s'] * len(values)), values)
+
+        sessions = Session.browse({session_id for (session_id,) in inserted})
+        sessions.invalidate_recordset(['enrollment_ids'])
+        sessions.modified(['enrollment_ids'])
+        sessions.flush_recordset()
+
+        maps['session'].update(new_sessions)
+        maps['seen_enrollments'].update(seen)
+        return len(inserted), rejected
+
+    def _fetch(self, query, params):
+        self.env.cr.execute(query, params)
+        return self.env.cr.fetchall()
+
+    def _load_existing_enrollments(self):
+        self.env['training.enrollment'].flush_model(['employee_id', 'session_id', 'state'])
+        self.env.cr.execute("""
+            SELECT employee_id, session_id FROM training_enrollment WHERE state != 'cancelled'
+        """)
+        return set(self.env.cr.fetchall())
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def action_import(self):
+        """Queue the import, processed in committed batches by a cron job"""
+        self.ensure_one()
+        # Check the columns right away rather than in the background
+        self._validate_file()
+        self.write({
+            'state': 'running',
+            'source_file': False,
+            'processed_line': 0,
+            'processed_offset': 0,
+            'imported_count': 0,
+            'rejected_count': 0,
+            'rejected_data': False,
+            'rejected_file': False,
+        })
+        self.env.ref('employee_training.ir_cron_process_history_imports')._trigger()
+        return self._action_reopen()
+
+    def action_refresh(self):
+        return self._action_reopen()
+
+    def _action_reopen(self):
+        return {
+            'name': _('Import Training History'),
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    @api.model
+    def _cron_process_imports(self):
+        """Cron job running the queued imports, a bounded number of batches per run"""
+        for wizard in self.search([('state', '=', 'running')], order='id'):
+            if not wizard._process_batches(IMPORT_BATCHES_PER_RUN):
+                self.env.ref('employee_training.ir_cron_process_history_imports')._trigger()
+                break
+        return True
+
+    def _process_batches(self, max_batches):
+        """Stream the file through validation and bulk inserts batch by batch.
+
+        Each batch runs in its own savepoint: a database error rejects the
+        rows of that batch and the import carries on with the next one.
+        Progress is committed after every batch, so a run stopped by the
+        worker limits resumes after the last committed line instead of
+        rolling back the whole import.
+
+        :return: whether the import is finished
+        """
+        self.ensure_one()
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        maps = {
+            'employee': self._build_employee_map(),
+            'course': self._build_course_map(),
+        }
+        if self.import_type == 'certificate':
+            maps['seen_numbers'] = set()
+            validate = self._validate_certificate_row
+            insert = self._insert_certificates
+        else:
+            maps['session'] = self._build_session_map()
+            maps['seen_enrollments'] = self._load_existing_enrollments()
+            validate = self._validate_enrollment_row
+            insert = self._insert_enrollments
+
+        self._prepare_source()
+        chunks = split_every(self.batch_size, self._iter_rows(self.processed_offset, self.processed_line or 1))
+        for __ in range(max_batches):
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            raw_rows = {line: row for line, row, _offset in chunk}
+            batch = {}
+            rejected = []
+            for line, row in raw_rows.items():
+                try:
+                    batch[line] = validate(row, maps)
+                except ValueError as error:
+                    rejected.append((line, str(error)))
+            imported = 0
+            if batch:
+                try:
+                    with self.env.cr.savepoint():
+                        imported, batch_rejected = insert(batch, maps)
+                    rejected += batch_rejected
+                except Exception as error:
+                    rejected += [(line, str(error)) for line in batch]
+
+            report = io.StringIO()
+            writer = csv.writer(report)
+            for line, error in sorted(rejected):
+                row = raw_rows[line]
+                writer.writerow([line] + [row.get(column) or '' for column in IMPORT_COLUMNS[self.import_type]] + [error])
+            self.env.cr.execute("""
+                UPDATE training_history_import
+                   SET processed_line = %(line)s,
+                       processed_offset = %(offset)s,
+                       imported_count = imported_count + %(imported)s,
+                       rejected_count = rejected_count + %(rejected)s,
+                       rejected_data = COALESCE(rejected_data, '') || %(report)s,
+                       write_uid = %(uid)s,
+                       write_date = (now() at time zone 'UTC')
+                 WHERE id = %(id)s
+            """, {
+                'line': chunk[-1][0],
+                'offset': chunk[-1][2],
+                'imported': imported,
+                'rejected': len(rejected),
+                'report': report.getvalue(),
+                'uid': self.env.uid,
+                'id': self.id,
+            })
+            self.invalidate_recordset()
+            if auto_commit:
+                self.env.cr.commit()
+        else:
+            return False
+
+        self._finish_import()
+        if auto_commit:
+            self.env.cr.commit()
+        return True
+
+    def _finish_import(self):
+        if self.import_type == 'certificate':
+            Certificate = self.env['training.certificate']
+            Certificate.invalidate_model()
+            Certificate._invalidate_expiry_forecast()
+        else:
+            self.env['training.enrollment'].invalidate_model()
+        self.env['training.compliance.gap']._invalidate_matrix()
+
+        header = io.StringIO()
+        csv.writer(header).writerow(['line'] + IMPORT_COLUMNS[self.import_type] + ['error'])
+        self.write({
+            'state': 'done',
+            'rejected_file': base64.b64encode(
+                (header.getvalue() + self.rejected_data).encode()
+            ) if self.rejected_count else False,
+            'rejected_filename': 'rejected_%s.csv' % self.import_type if self.rejected_count else False,
+            'rejected_data': False,
+            'source_file': False,
+        })
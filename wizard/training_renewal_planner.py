@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+from collections import defaultdict
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from odoo import models, fields, api, exceptions, _
+
+# How far past the deadline the planner may look for a free instructor
+LATE_SEARCH_DAYS = 90
+
+
+def _is_free(bookings, start, end):
+    """Check a sorted list of (start, end) bookings against a new interval"""
+    index = bisect.bisect_left(bookings, (start, start))
+    if index < len(bookings) and bookings[index][0] <= end:
+        return False
+    if index > 0 and bookings[index - 1][1] >= start:
+        return False
+    return True
+
+
+def plan_renewal_sessions(demands, capacity, duration_days, plan_start,
+                          instructor_bookings=None, avoid_weekends=True, room_bookings=None):
+    """Greedy earliest-deadline-first packing of renewals into sessions.
+
+    :param demands: list of ``(deadline, payload)`` where ``deadline`` is the
+        latest date a session may start for that participant
+    :param capacity: maximum participants per session
+    :param duration_days: length of one session in days
+    :param plan_start: first date a session may start
+    :param instructor_bookings: dict ``{instructor_id: [(start, end), ...]}``
+        of existing bookings; updated in place with the planned sessions.
+        When empty or None, sessions are planned without an instructor.
+    :param room_bookings: list ``[(start, end), ...]`` of existing bookings of
+        the room, updated in place with the planned sessions. None when the
+        sessions do not book a room.
+    :return: list of dicts with ``start_date``, ``end_date``,
+        ``instructor_id``, ``payloads``, ``late`` and ``room`` keys, ``room``
+        being False when no day with the room free was found
+
+    Sorting by deadline and opening each session as late as the earliest
+    pending deadline allows, filled with the next ``capacity`` deadlines,
+    yields the minimal number of sessions for a uniform capacity. Instructor
+    availability only moves a session earlier (or, when nobody is free in
+    time, later and flagged as late).
+    """
+    capacity = max(capacity, 1)
+    length = timedelta(days=max(duration_days, 1) - 1)
+    bookings = instructor_bookings if instructor_bookings is not None else {}
+    for intervals in bookings.values():
+        intervals.sort()
+    if room_bookings is not None:
+        room_bookings.sort()
+
+    def find_slot(start):
+        if avoid_weekends and start.weekday() >= 5:
+            return False
+        end = start + length
+        if room_bookings is not None and not _is_free(room_bookings, start, end):
+            return False
+        if not bookings:
+            return None
+        for instructor_id, intervals in bookings.items():
+            if _is_free(intervals, start, end):
+                return instructor_id
+        return False
+
+    sessions = []
+    ordered = sorted(demands, key=lambda demand: demand[0])
+    for index in range(0, len(ordered), capacity):
+        group = ordered[index:index + capacity]
+        latest = max(group[0][0], plan_start)
+
+        start, instructor_id, late, room = None, False, False, room_bookings is not None
+        day = latest
+        while day >= plan_start:
+            found = find_slot(day)
+            if found is not False:
+                start, instructor_id = day, found
+                break
+            day -= timedelta(days=1)
+        if start is None:
+            late = True
+            day = latest + timedelta(days=1)
+            while day <= latest + timedelta(days=LATE_SEARCH_DAYS):
+                found = find_slot(day)
+                if found is not False:
+                    start, instructor_id = day, found
+                    break
+                day += timedelta(days=1)
+            if start is None:
+                start, instructor_id, room = latest, False, False
+
+        end = start + length
+        if instructor_id:
+            bisect.insort(bookings[instructor_id], (start, end))
+        if room:
+            bisect.insort(room_bookings, (start, end))
+        sessions.append({
+            'start_date': start,
+            'end_date': end,
+            'instructor_id': instructor_id or False,
+            'payloads': [payload for __, payload in group],
+            'late': late or group[0][0] < plan_start,
+            'room': room,
+        })
+    return sessions
+
+
+class TrainingRenewalPlanner(models.TransientModel):
+    _name = 'training.renewal.planner'
+    _description = 'Renewal Session Planner'
+
+    horizon_months = fields.Integer(
+        string='Horizon (Months)',
+        default=6,
+        required=True,
+        help='Plan renewals for certificates expiring within this many months'
+    )
+    lead_days = fields.Integer(
+        string='Safety Margin (Days)',
+        default=7,
+        help='Sessions must end at least this many days before the certificate expires'
+    )
+    capacity = fields.Integer(
+        string='Seats per Session',
+        default=20,
+        required=True
+    )
+    avoid_weekends = fields.Boolean(
+        string='Avoid Weekends',
+        default=True
+    )
+    location = fields.Char(
+        string='Location'
+    )
+    is_online = fields.Boolean(
+        string='Online',
+        help='Online sessions do not book the location, they may run in parallel'
+    )
+    course_ids = fields.Many2many(
+        comodel_name='training.course',
+        string='Courses',
+        domain=[('is_certification', '=', True)],
+        help='Leave empty to plan every certification course'
+    )
+    instructor_ids = fields.Many2many(
+        comodel_name='res.users',
+        string='Instructors',
+        help='Instructors available to run the renewal sessions'
+    )
+    create_enrollments = fields.Boolean(
+        string='Enroll Employees',
+        default=True,
+        help='Create draft enrollments for the planned participants'
+    )
+    line_ids = fields.One2many(
+        comodel_name='training.renewal.planner.line',
+        inverse_name='planner_id',
+        string='Proposed Sessions'
+    )
+    certificate_count = fields.Integer(
+        string='Certificates Covered',
+        compute='_compute_plan_stats'
+    )
+    session_count = fields.Integer(
+        string='Sessions Proposed',
+        compute='_compute_plan_stats'
+    )
+    late_count = fields.Integer(
+        string='Late Sessions',
+        compute='_compute_plan_stats'
+    )
+
+    @api.depends('line_ids', 'line_ids.participant_count', 'line_ids.late')
+    def _compute_plan_stats(self):
+        for planner in self:
+            planner.session_count = len(planner.line_ids)
+            planner.certificate_count = sum(planner.line_ids.mapped('participant_count'))
+            planner.late_count = len(planner.line_ids.filtered('late'))
+
+    @api.constrains('capacity', 'horizon_months')
+    def _check_parameters(self):
+        for planner in self:
+            if planner.capacity < 1 or planner.horizon_months < 1:
+                raise exceptions.ValidationError(
+                    'Capacity and horizon must be at least 1.'
+                )
+
+    def _get_renewal_demands(self, today):
+        """Latest certificate per employee and course expiring in the horizon.
+
+        Employees already enrolled in an upcoming session of the course are
+        left out, they are covered already.
+        """
+        courses = self.course_ids or self.env['training.course'].search([
+            ('is_certification', '=', True),
+        ])
+        if not courses:
+            return []
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT latest.id, latest.employee_id, latest.course_id, latest.expiry_date
+              FROM (
+                    SELECT DISTINCT ON (c.employee_id, c.course_id)
+                           c.id, c.employee_id, c.course_id, c.expiry_date
+                      FROM training_certificate c
+                      JOIN hr_employee e ON e.id = c.employee_id AND e.active
+                     WHERE c.course_id IN %(course_ids)s
+                  ORDER BY c.employee_id, c.course_id, c.expiry_date DESC NULLS FIRST, c.id DESC
+                   ) latest
+             WHERE latest.expiry_date >= %(today)s
+               AND latest.expiry_date < %(horizon)s
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM training_enrollment en
+                     WHERE en.employee_id = latest.employee_id
+                       AND en.course_id = latest.course_id
+                       AND en.state IN ('draft', 'confirmed')
+                       AND en.start_date >= %(today)s
+               )
+        """, {
+            'course_ids': tuple(courses.ids),
+            'today': today,
+            'horizon': today + relativedelta(months=self.horizon_months),
+        })
+        return self.env.cr.fetchall()
+
+    def _get_instructor_bookings(self, today):
+        """Existing bookings of the selected instructors, one query"""
+        bookings = {instructor.id: [] for instructor in self.instructor_ids}
+        if not bookings:
+            return bookings
+        self.env.cr.execute("""
+            SELECT instructor_id, start_date, end_date
+              FROM training_session
+             WHERE instructor_id IN %s
+               AND state != 'cancelled'
+               AND end_date >= %s
+        """, (tuple(bookings), today))
+        for instructor_id, start_date, end_date in self.env.cr.fetchall():
+            bookings[instructor_id].append((start_date, end_date))
+        return bookings
+
+    def _get_room_bookings(self, today):
+        """Existing bookings of the location, None when no room is booked"""
+        if self.is_online or not (self.location or '').strip():
+            return None
+        self.env['training.session'].flush_model(['location', 'is_online', 'start_date', 'end_date', 'state'])
+        self.env.cr.execute("""
+            SELECT start_date, end_date
+              FROM training_session
+             WHERE lower(btrim(location)) = lower(btrim(%s))
+               AND NOT is_online
+               AND state != 'cancelled'
+               AND end_date >= %s
+        """, (self.location, today))
+        return self.env.cr.fetchall()
+
+    def action_compute_plan(self):
+        """Propose the minimal set of renewal sessions"""
+        self.ensure_one()
+        today = fields.Date.context_today(self)
+        plan_start = today + timedelta(days=1)
+
+        demands_per_course = defaultdict(list)
+        for certificate_id, employee_id, course_id, expiry_date in self._get_renewal_demands(today):
+            demands_per_course[course_id].append((expiry_date, (employee_id, certificate_id)))
+
+        bookings = self._get_instructor_bookings(today)
+        room_bookings = self._get_room_bookings(today)
+        courses = self.env['training.course'].browse(list(demands_per_course))
+        line_vals = []
+        for course in courses:
+            duration = max(course.duration_days, 1)
+            # Latest start date that still ends the session before expiry
+            demands = [
+                (expiry_date - timedelta(days=self.lead_days + duration), payload)
+                for expiry_date, payload in demands_per_course[course.id]
+            ]
+            for session in plan_renewal_sessions(
+                demands,
+                self.capacity,
+                duration,
+                plan_start,
+                instructor_bookings=bookings,
+                avoid_weekends=self.avoid_weekends,
+                room_bookings=room_bookings,
+            ):
+                line_vals.append({
+                    'planner_id': self.id,
+                    'course_id': course.id,
+                    'start_date': session['start_date'],
+                    'end_date': session['end_date'],
+                    'instructor_id': session['instructor_id'],
+                    'location': self.location if room_bookings is None or session['room'] else False,
+                    'late': session['late'],
+                    'employee_ids': [(6, 0, [employee_id for employee_id, __ in session['payloads']])],
+                    'certificate_ids': [(6, 0, [cert_id for __, cert_id in session['payloads']])],
+                })
+
+        self.line_ids.unlink()
+        self.env['training.renewal.planner.line'].create(line_vals)
+        return {
+            'name': _('Renewal Plan'),
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_create_sessions(self):
+        """Create the accepted plan with one bulk create per model"""
+        self.ensure_one()
+        if not self.line_ids:
+            raise exceptions.UserError(_('Compute a plan before creating sessions.'))
+
+        lines = self.line_ids.sorted(lambda line: (line.course_id.id, line.start_date))
+        sessions = self.env['training.session'].create([{
+            'course_id': line.course_id.id,
+            'start_date': line.start_date,
+            'end_date': line.end_date,
+            'instructor_id': line.instructor_id.id,
+            'capacity': self.capacity,
+            'location': line.location,
+            'is_online': self.is_online,
+        } for line in lines])
+
+        if self.create_enrollments:
+            self.env['training.enrollment'].create([
+                {
+                    'employee_id': employee.id,
+                    'session_id': session.id,
+                }
+                for line, session in zip(lines, sessions)
+                for employee in line.employee_ids
+            ])
+
+        return {
+            'name': _('Planned Renewal Sessions'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'training.session',
+            'view_mode': 'list,form,calendar',
+            'domain': [('id', 'in', sessions.ids)],
+            'target': 'current',
+        }
+
+
+class TrainingRenewalPlannerLine(models.TransientModel):
+    _name = 'training.renewal.planner.line'
+    _description = 'Proposed Renewal Session'
+    _order = 'course_id, start_date'
+
+    planner_id = fields.Many2one(
+        comodel_name='training.renewal.planner',
+        required=True,
+        ondelete='cascade'
+    )
+    course_id = fields.Many2one(
+        comodel_name='training.course',
+        string='Course',
+        required=True
+    )
+    start_date = fields.Date(
+        string='Start Date',
+        required=True
+    )
+    end_date = fields.Date(
+        string='End Date',
+        required=True
+    )
+    instructor_id = fields.Many2one(
+        comodel_name='res.users',
+        string='Instructor'
+    )
+    location = fields.Char(
+        string='Location',
+        help='Left empty when the room is already booked on every possible day'
+    )
+    employee_ids = fields.Many2many(
+        comodel_name='hr.employee',
+        string='Participants'
+    )
+    certificate_ids = fields.Many2many(
+        comodel_name='training.certificate',
+        string='Certificates to Renew'
+    )
+    participant_count = fields.Integer(
+        string='Participants',
+        compute='_compute_participant_count'
+    )
+    late = fields.Boolean(
+        string='Late',
+        help='Some participants cannot be trained before their certificate expires'
+    )
+
+    @api.depends('employee_ids')
+    def _compute_participant_count(self):
+        for line in self:
+            line.participant_count = len(line.employee_ids)
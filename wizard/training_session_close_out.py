@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+
+class TrainingSessionCloseOut(models.TransientModel):
+    _name = 'training.session.close.out'
+    _description = 'Close Out Training Session'
+
+    session_id = fields.Many2one(
+        comodel_name='training.session',
+        string='Session',
+        default=lambda self: self.env.context.get('active_id'),
+        required=True
+    )
+    attendance = fields.Selection([
+        ('all', 'All confirmed enrollments attended'),
+        ('selected', 'Only the selected attendees'),
+    ], string='Attendance', default='all', required=True)
+    attendee_ids = fields.Many2many(
+        comodel_name='training.enrollment',
+        string='Attendees',
+        domain="[('session_id', '=', session_id), ('state', '=', 'confirmed')]",
+        help='Confirmed enrollments not selected are marked as no-show'
+    )
+    confirmed_count = fields.Integer(
+        string='Confirmed Enrollments',
+        compute='_compute_confirmed_count'
+    )
+
+    @api.depends('session_id')
+    def _compute_confirmed_count(self):
+        for wizard in self:
+            wizard.confirmed_count = self.env['training.enrollment'].search_count([
+                ('session_id', '=', wizard.session_id.id),
+                ('state', '=', 'confirmed'),
+            ])
+
+    def action_close_out(self):
+        """Close out the session with the chosen attendance"""
+        self.ensure_one()
+        attendee_ids = None if self.attendance == 'all' else self.attendee_ids.ids
+        self.session_id.action_close_out(attendee_ids)
+        return {'type': 'ir.actions.act_window_close'}
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+
+class TrainingSessionReschedule(models.TransientModel):
+    _name = 'training.session.reschedule'
+    _description = 'Reschedule Training Sessions'
+
+    session_ids = fields.Many2many(
+        comodel_name='training.session',
+        string='Sessions',
+        default=lambda self: self.env['training.session'].browse(
+            self.env.context.get('active_ids', [])
+        ),
+        required=True
+    )
+    days = fields.Integer(
+        string='Shift (Days)',
+        default=7,
+        required=True,
+        help='Number of days to move the sessions by (negative values move them earlier)'
+    )
+
+    def action_reschedule(self):
+        """Shift all selected sessions at once"""
+        self.ensure_one()
+        self.session_ids.action_reschedule(self.days)
+        return {'type': 'ir.actions.act_window_close'}